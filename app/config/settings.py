@@ -247,6 +247,14 @@ CLOUDFRONT_PRIVATE_KEY_BASE64 = os.environ.get(
 CLOUDFRONT_URL_EXPIRY_SECONDS = int(
     os.environ.get("CLOUDFRONT_URL_EXPIRY_SECONDS", "300")  # 5 mins
 )
+# Signed urls are reused within this period, so the urls are valid for
+# between CLOUDFRONT_URL_EXPIRY_SECONDS minus this and the full expiry
+CLOUDFRONT_URL_CACHE_SECONDS = int(
+    os.environ.get("CLOUDFRONT_URL_CACHE_SECONDS", "60")
+)
+CLOUDFRONT_URL_CACHE_SIZE = int(
+    os.environ.get("CLOUDFRONT_URL_CACHE_SIZE", "10000")
+)
 
 ##############################################################################
 #
@@ -267,6 +275,13 @@ CACHES = {
     },
 }
 
+# How long granted object permissions are cached for, the cache is
+# invalidated when permissions are removed from an object or a user
+# is removed from a group
+CACHED_PERMISSIONS_TIMEOUT = int(
+    os.environ.get("CACHED_PERMISSIONS_TIMEOUT", "300")
+)
+
 ROOT_URLCONF = "config.urls.root"
 CHALLENGE_SUBDOMAIN_URL_CONF = "config.urls.challenge_subdomain"
 RENDERING_SUBDOMAIN_URL_CONF = "config.urls.rendering_subdomain"
@@ -943,6 +958,14 @@ CORS_ALLOW_CREDENTIALS = True
 #
 ###############################################################################
 
+# Download counts are buffered in the cache and written to the database
+# every interval, counts that are not flushed before the buffer timeout
+# (e.g. if the workers are down) are dropped
+DOWNLOAD_COUNTS_FLUSH_INTERVAL_SECONDS = int(
+    os.environ.get("DOWNLOAD_COUNTS_FLUSH_INTERVAL_SECONDS", "60")
+)
+DOWNLOAD_COUNTS_BUFFER_TIMEOUT = 10 * DOWNLOAD_COUNTS_FLUSH_INTERVAL_SECONDS
+
 CELERY_TASK_DECORATOR_KWARGS = {
     "acks-late-2xlarge": {
         # For idempotent tasks that take a long time (<7200s)
@@ -1017,6 +1040,19 @@ COMPONENTS_DEFAULT_BACKEND = os.environ.get(
     "COMPONENTS_DEFAULT_BACKEND",
     "grandchallenge.components.backends.amazon_sagemaker_batch.AmazonSageMakerBatchExecutor",
 )
+# Execute jobs and parse their outputs in the provisioning task rather than
+# in separate tasks, which saves queueing and fetching the job for each step
+COMPONENTS_JOB_PIPELINE = strtobool(
+    os.environ.get("COMPONENTS_JOB_PIPELINE", "False")
+)
+# The stage timings of the jobs that completed in the last window are
+# aggregated, and the result is cached for this many seconds
+COMPONENTS_STAGE_TIMINGS_WINDOW = int(
+    os.environ.get("COMPONENTS_STAGE_TIMINGS_WINDOW", "86400")
+)
+COMPONENTS_STAGE_TIMINGS_CACHE_TIMEOUT = int(
+    os.environ.get("COMPONENTS_STAGE_TIMINGS_CACHE_TIMEOUT", "300")
+)
 COMPONENTS_REGISTRY_URL = os.environ.get(
     "COMPONENTS_REGISTRY_URL", "registry:5000"
 )
@@ -1055,9 +1091,32 @@ COMPONENTS_AMAZON_SAGEMAKER_SECURITY_GROUP_ID = os.environ.get(
 COMPONENTS_AMAZON_SAGEMAKER_SUBNETS = os.environ.get(
     "COMPONENTS_AMAZON_SAGEMAKER_SUBNETS", ""
 ).split(",")
+# The number of jobs for the same container image and instance type that
+# are run in one SageMaker transform job, 1 disables batching. The jobs in a
+# batch wait for at most COMPONENTS_AMAZON_SAGEMAKER_BATCH_WAIT seconds for
+# the batch to fill up.
+COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE = int(
+    os.environ.get("COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE", "1")
+)
+COMPONENTS_AMAZON_SAGEMAKER_BATCH_WAIT = int(
+    os.environ.get("COMPONENTS_AMAZON_SAGEMAKER_BATCH_WAIT", "60")
+)
 COMPONENTS_S3_ENDPOINT_URL = os.environ.get(
     "COMPONENTS_S3_ENDPOINT_URL", AWS_S3_ENDPOINT_URL
 )
+# The number of concurrent S3 transfers used when provisioning the inputs
+# and collecting the outputs of a job
+COMPONENTS_S3_TRANSFER_CONCURRENCY = int(
+    os.environ.get("COMPONENTS_S3_TRANSFER_CONCURRENCY", "10")
+)
+# JSON files that are larger than this are validated in parts, the items of
+# the large arrays must each be smaller than the max item size
+COMPONENTS_JSON_STREAMING_MIN_BYTES = int(
+    os.environ.get("COMPONENTS_JSON_STREAMING_MIN_BYTES", 10 * MEGABYTE)
+)
+COMPONENTS_JSON_STREAMING_MAX_ITEM_SIZE = int(
+    os.environ.get("COMPONENTS_JSON_STREAMING_MAX_ITEM_SIZE", 100 * MEGABYTE)
+)
 COMPONENTS_DOCKER_NETWORK_NAME = os.environ.get(
     "COMPONENTS_DOCKER_NETWORK_NAME", "grand-challengeorg_components"
 )
@@ -1070,6 +1129,31 @@ COMPONENTS_DOCKER_TASK_AWS_ACCESS_KEY_ID = os.environ.get(
 COMPONENTS_DOCKER_TASK_AWS_SECRET_ACCESS_KEY = os.environ.get(
     "COMPONENTS_DOCKER_TASK_AWS_SECRET_ACCESS_KEY", "componentstask123"
 )
+# Invoke the containers of the docker backend with an HTTP client rather
+# than with curl containers. The workers must then either be attached to the
+# components network or reach it through the COMPONENTS_DOCKER_HTTP_PROXY.
+COMPONENTS_DOCKER_HTTP_CLIENT = strtobool(
+    os.environ.get("COMPONENTS_DOCKER_HTTP_CLIENT", "False")
+)
+COMPONENTS_DOCKER_HTTP_PROXY = os.environ.get(
+    "COMPONENTS_DOCKER_HTTP_PROXY", ""
+)
+COMPONENTS_DOCKER_READY_TIMEOUT = int(
+    os.environ.get("COMPONENTS_DOCKER_READY_TIMEOUT", "60")
+)
+# The number of warm containers the docker backend keeps for each container
+# image, 0 disables the pool. The pooled containers are shared between jobs
+# and require COMPONENTS_DOCKER_HTTP_CLIENT.
+COMPONENTS_DOCKER_POOL_SIZE = int(
+    os.environ.get("COMPONENTS_DOCKER_POOL_SIZE", "0")
+)
+# The total memory in GB that the pooled containers can use
+COMPONENTS_DOCKER_POOL_MEMORY_LIMIT = int(
+    os.environ.get("COMPONENTS_DOCKER_POOL_MEMORY_LIMIT", "16")
+)
+COMPONENTS_DOCKER_POOL_IDLE_TIMEOUT = int(
+    os.environ.get("COMPONENTS_DOCKER_POOL_IDLE_TIMEOUT", "600")
+)
 COMPONENTS_PUBLISH_PORTS = strtobool(
     os.environ.get("COMPONENTS_PUBLISH_PORTS", "False")
 )
@@ -1100,6 +1184,10 @@ MESSAGE_TAGS = {messages.ERROR: "danger"}
 
 # The name of the group whose members will be able to create reader studies
 READER_STUDY_CREATORS_GROUP_NAME = "reader_study_creators"
+# The number of answers that can be created in one request
+READER_STUDY_BULK_ANSWERS_LIMIT = int(
+    os.environ.get("READER_STUDY_BULK_ANSWERS_LIMIT", "1000")
+)
 
 ###############################################################################
 #
@@ -1204,6 +1292,14 @@ CELERY_BEAT_SCHEDULE = {
         "task": "grandchallenge.uploads.tasks.delete_old_user_uploads",
         "schedule": crontab(hour=2, minute=0),
     },
+    "reconcile_user_upload_quotas": {
+        "task": "grandchallenge.uploads.tasks.reconcile_user_upload_quotas",
+        "schedule": crontab(hour=2, minute=15),
+    },
+    "reconcile_display_set_answer_counts": {
+        "task": "grandchallenge.reader_studies.tasks.reconcile_display_set_answer_counts",
+        "schedule": crontab(hour=2, minute=20),
+    },
     "remove_inactive_container_images": {
         "task": "grandchallenge.components.tasks.remove_inactive_container_images",
         "schedule": crontab(hour=2, minute=30),
@@ -1232,6 +1328,14 @@ CELERY_BEAT_SCHEDULE = {
         "task": "grandchallenge.statistics.tasks.update_site_statistics_cache",
         "schedule": crontab(hour=5, minute=30),
     },
+    "dispatch_algorithm_jobs": {
+        "task": "grandchallenge.algorithms.tasks.dispatch_algorithm_jobs",
+        "schedule": timedelta(seconds=10),
+    },
+    "flush_download_counts": {
+        "task": "grandchallenge.serving.tasks.flush_download_counts",
+        "schedule": timedelta(seconds=DOWNLOAD_COUNTS_FLUSH_INTERVAL_SECONDS),
+    },
     "update_challenge_results_cache": {
         "task": "grandchallenge.challenges.tasks.update_challenge_results_cache",
         "schedule": crontab(minute="*/5"),
@@ -1251,6 +1355,22 @@ CELERY_BEAT_SCHEDULE = {
     },
 }
 
+if COMPONENTS_DOCKER_HTTP_CLIENT and COMPONENTS_DOCKER_POOL_SIZE > 0:
+    CELERY_BEAT_SCHEDULE["evict_idle_pooled_containers"] = {
+        "task": "grandchallenge.components.tasks.evict_idle_pooled_containers",
+        "schedule": timedelta(seconds=COMPONENTS_DOCKER_POOL_IDLE_TIMEOUT),
+    }
+
+if COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE > 1:
+    CELERY_BEAT_SCHEDULE["submit_pending_sagemaker_batches"] = {
+        "task": "grandchallenge.components.tasks.submit_pending_sagemaker_batches",
+        "schedule": timedelta(seconds=COMPONENTS_AMAZON_SAGEMAKER_BATCH_WAIT),
+    }
+    CELERY_BEAT_SCHEDULE["fail_lost_sagemaker_batch_jobs"] = {
+        "task": "grandchallenge.components.tasks.fail_lost_sagemaker_batch_jobs",
+        "schedule": timedelta(hours=1),
+    }
+
 if strtobool(os.environ.get("PUSH_CLOUDWATCH_METRICS", "False")):
     CELERY_BEAT_SCHEDULE["push_metrics_to_cloudwatch"] = {
         "task": "grandchallenge.core.tasks.put_cloudwatch_metrics",
@@ -1260,9 +1380,12 @@ if strtobool(os.environ.get("PUSH_CLOUDWATCH_METRICS", "False")):
 # The name of the group whose members will be able to create algorithms
 ALGORITHMS_CREATORS_GROUP_NAME = "algorithm_creators"
 # Number of jobs that can be scheduled in one task
+# The number of jobs that are created in bulk by each fan-out task
 ALGORITHMS_JOB_BATCH_LIMIT = int(
-    os.environ.get("ALGORITHMS_JOB_BATCH_LIMIT", "32")
+    os.environ.get("ALGORITHMS_JOB_BATCH_LIMIT", "1000")
 )
+# The number of algorithm jobs that can hold an execution slot at once,
+# further jobs are queued until dispatch_algorithm_jobs admits them
 ALGORITHMS_MAX_ACTIVE_JOBS = int(
     os.environ.get("ALGORITHMS_MAX_ACTIVE_JOBS", "128")
 )
@@ -1367,6 +1490,11 @@ CASES_POST_PROCESSORS = os.environ.get(
     "CASES_POST_PROCESSORS", "panimg.post_processors.tiff_to_dzi"
 ).split(",")
 
+# The number of threads used to download and store the files of an image
+# import, and the number of processes used to convert the directories
+CASES_IMPORT_THREADS = int(os.environ.get("CASES_IMPORT_THREADS", "8"))
+CASES_IMPORT_PROCESSES = int(os.environ.get("CASES_IMPORT_PROCESSES", "4"))
+
 # Maximum file size in bytes to be opened by SimpleITK.ReadImage in cases_tests.utils.get_sitk_image()
 MAX_SITK_FILE_SIZE = 256 * MEGABYTE
 
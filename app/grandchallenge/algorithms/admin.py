@@ -91,6 +91,9 @@ class JobAdmin(GuardedModelAdmin):
         "task_on_success",
         "task_on_failure",
         "runtime_metrics",
+        "stage_timings",
+        "provisioning_bytes_per_second",
+        "instrumentation",
     )
     search_fields = (
         "creator__username",
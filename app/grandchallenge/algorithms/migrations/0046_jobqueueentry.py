@@ -0,0 +1,53 @@
+# Generated by Django 4.1.10 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("algorithms", "0045_optionalhangingprotocolalgorithm_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobQueueEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "tenant",
+                    models.CharField(
+                        db_index=True, editable=False, max_length=64
+                    ),
+                ),
+                (
+                    "admitted_at",
+                    models.DateTimeField(
+                        db_index=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "job",
+                    models.OneToOneField(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="queue_entry",
+                        to="algorithms.job",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("created",),
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.1.10 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("algorithms", "0046_jobqueueentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="inputs_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="The fingerprint of the inputs of this job, used to find jobs that were run with the same inputs",
+                max_length=64,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["algorithm_image", "inputs_hash"],
+                name="algorithms__algorit_141cd3_idx",
+            ),
+        ),
+    ]
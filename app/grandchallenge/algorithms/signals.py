@@ -110,3 +110,28 @@ def update_group_permissions(
         component_interface_values=component_interface_values,
         exclude_jobs=action == "pre_clear",
     )
+
+
+@receiver(m2m_changed, sender=Job.inputs.through)
+def update_inputs_hash(*_, instance, action, reverse, model, pk_set, **__):
+    """Keep the fingerprint of the job inputs up to date"""
+    if reverse:
+        if action == "pre_clear":
+            # The jobs cannot be found after the inputs are cleared
+            instance._cleared_input_of_jobs = [
+                *instance.algorithms_jobs_as_input.all()
+            ]
+            return
+        elif action == "post_clear":
+            jobs = instance._cleared_input_of_jobs
+        elif action in ["post_add", "post_remove"]:
+            jobs = model.objects.filter(pk__in=pk_set)
+        else:
+            return
+    elif action in ["post_add", "post_remove", "post_clear"]:
+        jobs = [instance]
+    else:
+        return
+
+    for job in jobs:
+        job.update_inputs_hash()
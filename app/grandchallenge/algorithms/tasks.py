@@ -1,4 +1,6 @@
+import heapq
 import logging
+from collections import deque
 from tempfile import TemporaryDirectory
 from typing import NamedTuple
 
@@ -9,13 +11,20 @@ from django.conf import settings
 from django.core.cache import cache
 from django.core.files.base import File
 from django.db import transaction
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.db.transaction import on_commit
 from django.utils._os import safe_join
+from django.utils.timezone import now
 from redis.exceptions import LockError
 
 from grandchallenge.algorithms.exceptions import TooManyJobsScheduled
-from grandchallenge.algorithms.models import Algorithm, AlgorithmImage, Job
+from grandchallenge.algorithms.models import (
+    Algorithm,
+    AlgorithmImage,
+    Job,
+    JobQueueEntry,
+    get_inputs_hash,
+)
 from grandchallenge.archives.models import Archive
 from grandchallenge.cases.tasks import build_images
 from grandchallenge.components.tasks import (
@@ -111,38 +120,100 @@ def execute_algorithm_job_for_inputs(*, job_pk):
         else:
             job.task_on_success = linked_task
             job.save()
-            on_commit(
-                execute_algorithm_job.signature(
-                    kwargs={"job_pk": job_pk}, immutable=True
-                ).apply_async
-            )
+            job.enqueue()
 
 
-@shared_task(
-    **settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"],
-    throws=(TooManyJobsScheduled,),
-)
+@shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
 def execute_algorithm_job(*, job_pk, retries=0):
-    def retry_with_delay():
-        _retry(
-            task=execute_algorithm_job,
-            signature_kwargs={
-                "kwargs": {
-                    "job_pk": job_pk,
-                },
-                "immutable": True,
-            },
-            retries=retries,
+    """
+    Queue a job that was scheduled before the job queue was introduced
+
+    Kept so that the messages that are already on the broker are handled,
+    can be removed in the next release.
+    """
+    with transaction.atomic():
+        job = Job.objects.select_for_update().get(pk=job_pk)
+
+        if (
+            job.status == job.PENDING
+            and not JobQueueEntry.objects.filter(job=job).exists()
+        ):
+            job.enqueue()
+
+
+@shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
+def dispatch_algorithm_jobs():
+    """
+    Executes queued algorithm jobs while there are free slots
+
+    At most ALGORITHMS_MAX_ACTIVE_JOBS jobs hold a slot at once. Free slots
+    go to the tenants that hold the fewest slots, then to the tenant whose
+    job has been queued for the longest, so that a large fan-out cannot
+    starve the jobs of other tenants.
+    """
+    try:
+        with cache.lock(
+            _cache_key_from_method(dispatch_algorithm_jobs),
+            timeout=settings.CELERY_TASK_SOFT_TIME_LIMIT,
+            blocking_timeout=10,
+        ):
+            _dispatch_algorithm_jobs()
+    except LockError as error:
+        # The jobs will be dispatched on the next run
+        logger.info(f"Could not dispatch jobs: {error}")
+
+
+def _dispatch_algorithm_jobs():
+    # Release the slots of finished jobs, and remove those that were
+    # cancelled while queued
+    JobQueueEntry.objects.filter(
+        job__status__in=[Job.SUCCESS, Job.CANCELLED, Job.FAILURE]
+    ).delete()
+
+    admitted = dict(
+        JobQueueEntry.objects.filter(admitted_at__isnull=False)
+        .order_by()
+        .values("tenant")
+        .annotate(n_admitted=Count("pk"))
+        .values_list("tenant", "n_admitted")
+    )
+    free_slots = settings.ALGORITHMS_MAX_ACTIVE_JOBS - sum(admitted.values())
+
+    if free_slots <= 0:
+        return
+
+    queued = JobQueueEntry.objects.filter(admitted_at__isnull=True)
+    candidates = {
+        tenant: deque(
+            queued.filter(tenant=tenant).values_list("pk", "created")[
+                :free_slots
+            ]
         )
+        for tenant in queued.order_by()
+        .values_list("tenant", flat=True)
+        .distinct()
+    }
+    tenants = [
+        (admitted.get(tenant, 0), entries[0][1], tenant)
+        for tenant, entries in candidates.items()
+    ]
+    heapq.heapify(tenants)
+
+    to_admit = []
+
+    while tenants and len(to_admit) < free_slots:
+        n_admitted, _, tenant = heapq.heappop(tenants)
+        entries = candidates[tenant]
+        to_admit.append(entries.popleft()[0])
+
+        if entries:
+            heapq.heappush(tenants, (n_admitted + 1, entries[0][1], tenant))
 
     with transaction.atomic():
-        if Job.objects.active().count() >= settings.ALGORITHMS_MAX_ACTIVE_JOBS:
-            logger.info("Retrying task as too many jobs scheduled")
-            retry_with_delay()
-            raise TooManyJobsScheduled
+        JobQueueEntry.objects.filter(pk__in=to_admit).update(admitted_at=now())
 
-        job = Job.objects.get(pk=job_pk)
-        on_commit(job.execute)
+        for job in Job.objects.filter(queue_entry__pk__in=to_admit):
+            on_commit(job.execute)
 
 
 @shared_task(
@@ -169,11 +240,6 @@ def create_algorithm_jobs_for_archive(
             retries=retries,
         )
 
-    if Job.objects.active().count() >= settings.ALGORITHMS_MAX_ACTIVE_JOBS:
-        logger.info("Retrying task as too many jobs scheduled")
-        retry_with_delay()
-        raise TooManyJobsScheduled
-
     for archive in Archive.objects.filter(pk__in=archive_pks).all():
         # Only the archive groups should be able to view the job
         # Can be shared with the algorithm editor if needed
@@ -195,24 +261,19 @@ def create_algorithm_jobs_for_archive(
 
         for algorithm in algorithms:
             try:
-                with cache.lock(
-                    _cache_key_from_method(create_algorithm_jobs),
-                    timeout=settings.CELERY_TASK_TIME_LIMIT,
-                    blocking_timeout=10,
-                ):
-                    create_algorithm_jobs(
-                        algorithm_image=algorithm.active_image,
-                        civ_sets=[
-                            {*ai.values.all()}
-                            for ai in archive_items.prefetch_related(
-                                "values__interface"
-                            )
-                        ],
-                        extra_viewer_groups=archive_groups,
-                        # NOTE: no emails in case the logs leak data
-                        # to the algorithm editors
-                        task_on_success=None,
-                    )
+                create_algorithm_jobs(
+                    algorithm_image=algorithm.active_image,
+                    civ_sets=[
+                        {*ai.values.all()}
+                        for ai in archive_items.prefetch_related(
+                            "values__interface"
+                        )
+                    ],
+                    extra_viewer_groups=archive_groups,
+                    # NOTE: no emails in case the logs leak data
+                    # to the algorithm editors
+                    task_on_success=None,
+                )
             except (TooManyJobsScheduled, LockError) as error:
                 logger.info(f"Retrying task due to: {error}")
                 retry_with_delay()
@@ -229,6 +290,7 @@ def create_algorithm_jobs(
     task_on_success=None,
     task_on_failure=None,
     time_limit=None,
+    tenant=None,
 ):
     """
     Creates algorithm jobs for sets of component interface values
@@ -254,38 +316,41 @@ def create_algorithm_jobs(
         Celery task that is run on job failure
     time_limit
         The time limit for the Job
+    tenant
+        Who the jobs are run for, defaults to the algorithm
     """
-    civ_sets = filter_civs_for_algorithm(
-        civ_sets=civ_sets, algorithm_image=algorithm_image
-    )
-
-    if max_jobs is not None:
-        civ_sets = civ_sets[:max_jobs]
-
-    if time_limit is None:
-        time_limit = settings.ALGORITHMS_JOB_TIME_LIMIT_SECONDS
-
-    jobs = []
+    # Only one process at a time can create the jobs for an algorithm
+    # image, otherwise the same job could be created twice
+    with cache.lock(
+        f"{_cache_key_from_method(create_algorithm_jobs)}.{algorithm_image.pk}",
+        timeout=settings.CELERY_TASK_TIME_LIMIT,
+        blocking_timeout=10,
+    ):
+        civ_sets = filter_civs_for_algorithm(
+            civ_sets=civ_sets, algorithm_image=algorithm_image
+        )
 
-    for civ_set in civ_sets:
+        if max_jobs is not None:
+            civ_sets = civ_sets[:max_jobs]
 
-        if len(jobs) >= settings.ALGORITHMS_JOB_BATCH_LIMIT:
-            raise TooManyJobsScheduled
+        if time_limit is None:
+            time_limit = settings.ALGORITHMS_JOB_TIME_LIMIT_SECONDS
 
         with transaction.atomic():
-            job = Job.objects.create(
-                creator=None,  # System jobs, so no creator
+            jobs = Job.objects.bulk_create_system_jobs(
                 algorithm_image=algorithm_image,
+                civ_sets=civ_sets[: settings.ALGORITHMS_JOB_BATCH_LIMIT],
                 task_on_success=task_on_success,
                 task_on_failure=task_on_failure,
                 time_limit=time_limit,
                 extra_viewer_groups=extra_viewer_groups,
                 extra_logs_viewer_groups=extra_logs_viewer_groups,
-                input_civ_set=civ_set,
+                tenant=tenant,
             )
-            on_commit(job.execute)
 
-            jobs.append(job)
+    if len(civ_sets) > settings.ALGORITHMS_JOB_BATCH_LIMIT:
+        # The remaining jobs are created when the task is retried
+        raise TooManyJobsScheduled
 
     return jobs
 
@@ -308,22 +373,7 @@ def filter_civs_for_algorithm(*, civ_sets, algorithm_image):
     """
     input_interfaces = {*algorithm_image.algorithm.inputs.all()}
 
-    existing_jobs = {
-        frozenset(j.inputs.all())
-        for j in Job.objects.filter(algorithm_image=algorithm_image)
-        .annotate(
-            inputs_match_count=Count(
-                "inputs",
-                filter=Q(
-                    inputs__in={civ for civ_set in civ_sets for civ in civ_set}
-                ),
-            )
-        )
-        .filter(inputs_match_count=len(input_interfaces))
-        .prefetch_related("inputs")
-    }
-
-    valid_job_inputs = []
+    candidate_job_inputs = []
 
     for civ_set in civ_sets:
         # Check interfaces are complete
@@ -337,13 +387,55 @@ def filter_civs_for_algorithm(*, civ_sets, algorithm_image):
         else:
             continue
 
-        # Check job has not been run
-        if frozenset(valid_input) in existing_jobs:
-            continue
+        candidate_job_inputs.append(
+            (
+                get_inputs_hash(civ_pks=[civ.pk for civ in valid_input]),
+                valid_input,
+            )
+        )
 
-        valid_job_inputs.append(valid_input)
+    _backfill_inputs_hashes(algorithm_image=algorithm_image)
 
-    return valid_job_inputs
+    # Check job has not been run
+    candidate_hashes = [
+        *{inputs_hash for inputs_hash, _ in candidate_job_inputs}
+    ]
+    existing_hashes = set()
+
+    for idx in range(0, len(candidate_hashes), 1000):
+        existing_hashes.update(
+            Job.objects.filter(
+                algorithm_image=algorithm_image,
+                inputs_hash__in=candidate_hashes[idx : idx + 1000],
+            ).values_list("inputs_hash", flat=True)
+        )
+
+    return [
+        valid_input
+        for inputs_hash, valid_input in candidate_job_inputs
+        if inputs_hash not in existing_hashes
+    ]
+
+
+def _backfill_inputs_hashes(*, algorithm_image):
+    """Set the fingerprint of jobs that were created before it was stored"""
+    job_inputs = {}
+
+    for job_pk, civ_pk in Job.objects.filter(
+        algorithm_image=algorithm_image, inputs_hash=""
+    ).values_list("pk", "inputs__pk"):
+        job_inputs.setdefault(job_pk, set())
+        if civ_pk is not None:
+            job_inputs[job_pk].add(civ_pk)
+
+    Job.objects.bulk_update(
+        [
+            Job(pk=job_pk, inputs_hash=get_inputs_hash(civ_pks=civ_pks))
+            for job_pk, civ_pks in job_inputs.items()
+        ],
+        ["inputs_hash"],
+        batch_size=1000,
+    )
 
 
 @shared_task
@@ -12,7 +12,10 @@ from grandchallenge.cases.views import (
     ImageViewSet,
     RawImageUploadSessionViewSet,
 )
-from grandchallenge.components.views import ComponentInterfaceViewSet
+from grandchallenge.components.views import (
+    ComponentInterfaceViewSet,
+    JobStageTimingsAPIView,
+)
 from grandchallenge.evaluation.views.api import EvaluationViewSet
 from grandchallenge.github.views import github_webhook
 from grandchallenge.notifications.views import (
@@ -191,6 +194,11 @@ urlpatterns = [
     path("v1/", include(router.urls)),
     path("v1/github/", github_webhook, name="github-webhook"),
     path("v1/timezone/", TimezoneAPIView.as_view(), name="timezone"),
+    path(
+        "v1/components/stage-timings/",
+        JobStageTimingsAPIView.as_view(),
+        name="components-stage-timings",
+    ),
     path(
         "",
         SpectacularSwaggerView.as_view(url_name="api:schema"),
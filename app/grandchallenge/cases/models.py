@@ -4,12 +4,11 @@ from actstream.actions import follow
 from actstream.models import Follow
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import ObjectDoesNotExist, SuspiciousFileOperation
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.db.models.signals import post_delete, pre_delete
 from django.db.transaction import on_commit
 from django.dispatch import receiver
-from django.utils._os import safe_join
 from django.utils.text import get_valid_filename
 from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
 from guardian.shortcuts import assign_perm, get_groups_with_perms, remove_perm
@@ -21,6 +20,7 @@ from panimg.models import (
 )
 from storages.utils import clean_name
 
+from grandchallenge.core.cache import invalidate_cached_permissions
 from grandchallenge.core.models import FieldChangeMixin, UUIDModel
 from grandchallenge.core.storage import protected_s3_storage
 from grandchallenge.core.validators import JSONValidator
@@ -488,6 +488,9 @@ class Image(UUIDModel):
         for g in groups_with_extra_perms:
             remove_perm("view_image", g, self)
 
+        if groups_with_extra_perms:
+            invalidate_cached_permissions(objs=[self])
+
     def assign_view_perm_to_creator(self):
         for answer in self.answer_set.all():
             assign_perm("view_image", answer.creator, self)
@@ -548,6 +551,7 @@ class ImageFile(FieldChangeMixin, UUIDModel):
                 raise ValueError(f"{directory} is not a directory")
 
         self._directory = directory
+        self._directory_size = None
 
     def save(self, *args, **kwargs):
         adding = self._state.adding
@@ -563,28 +567,34 @@ class ImageFile(FieldChangeMixin, UUIDModel):
 
         super().save(*args, **kwargs)
 
-    def _directory_file_destination(self, *, file):
-        base = self.file.field.upload_to(
-            instance=self, filename=f"{self._directory.stem}"
-        )
-        return safe_join(f"/{base}", file.relative_to(self._directory))[1:]
+    def save_to_storage(self):
+        """
+        Saves the file, and its directory, to storage without saving this
+        model, which is required before using bulk_create
+        """
+        if not self._state.adding:
+            raise RuntimeError("The image file has already been saved")
+
+        if self._directory is not None:
+            self.save_directory()
+
+        self.file.save(self.file.name, self.file.file, save=False)
+        self.update_size_in_storage()
 
     def save_directory(self):
         # Saves all the files in the directory associated with this file
         if self._directory is None:
             raise ValueError("Directory is unset")
 
-        for file in self._directory.rglob("**/*"):
-            if not file.is_file():
-                continue
-
-            if file.is_symlink() or file.absolute() != file.resolve():
-                raise SuspiciousFileOperation
+        base = self.file.field.upload_to(
+            instance=self, filename=f"{self._directory.stem}"
+        )
 
-            with open(file, "rb") as f:
-                self.file.field.storage.save(
-                    name=self._directory_file_destination(file=file), content=f
-                )
+        self._directory_size = self.file.field.storage.save_directory(
+            directory=self._directory,
+            name=base,
+            max_workers=settings.CASES_IMPORT_THREADS,
+        )
 
     def update_size_in_storage(self):
         if not self.file:
@@ -594,6 +604,11 @@ class ImageFile(FieldChangeMixin, UUIDModel):
         stored_bytes = self.file.size
 
         if self.image_type == self.IMAGE_TYPE_DZI:
+            if self._directory_size is not None:
+                # Counted when the directory was saved
+                self.size_in_storage = stored_bytes + self._directory_size
+                return
+
             paginator = self.file.storage.connection.meta.client.get_paginator(
                 "list_objects"
             )
@@ -1,7 +1,9 @@
 import logging
 import zipfile
 from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import asdict, dataclass
+from functools import partial
 from pathlib import Path
 from shutil import rmtree
 from tempfile import TemporaryDirectory
@@ -38,26 +40,45 @@ class DuplicateFilesException(ValueError):
 def _populate_tmp_dir(tmp_dir, upload_session):
     session_files = [*upload_session.user_uploads.all()]
 
-    populate_provisioning_directory(session_files, tmp_dir)
-    extract_files(source_path=tmp_dir)
+    populate_provisioning_directory(session_files, tmp_dir, extract=True)
 
 
 def populate_provisioning_directory(
-    input_files: Sequence[UserUpload], provisioning_dir: Path
+    input_files: Sequence[UserUpload],
+    provisioning_dir: Path,
+    *,
+    extract: bool = False,
 ):
     """
     Provisions provisioning_dir with the files associated using the given
     list of uploaded files.
+
+    The files are downloaded concurrently. If extract is set, each file is
+    extracted as soon as it has been downloaded.
     """
-    for input_file in input_files:
-        dest = Path(safe_join(provisioning_dir, input_file.filename))
+    destinations = [
+        Path(safe_join(provisioning_dir, input_file.filename))
+        for input_file in input_files
+    ]
 
-        if dest.exists():
-            raise DuplicateFilesException("Duplicate files uploaded")
+    if len({*destinations}) != len(destinations) or any(
+        dest.exists() for dest in destinations
+    ):
+        raise DuplicateFilesException("Duplicate files uploaded")
 
+    def provision(input_file, dest):
         with open(dest, "wb") as f:
             input_file.download_fileobj(fileobj=f)
 
+        if extract:
+            check_compressed_and_extract(src_path=dest, checked_paths=set())
+
+    with ThreadPoolExecutor(
+        max_workers=settings.CASES_IMPORT_THREADS
+    ) as executor:
+        # Consume the results to raise any exceptions
+        list(executor.map(provision, input_files, destinations))
+
 
 def check_compressed_and_extract(*, src_path: Path, checked_paths: set[Path]):
     """Checks if `src_path` is a zip file and if so, extracts it."""
@@ -66,6 +87,9 @@ def check_compressed_and_extract(*, src_path: Path, checked_paths: set[Path]):
 
     checked_paths.add(src_path)
 
+    if src_path.is_dir():
+        return
+
     extracted_dir = src_path.parent / f"{src_path.name}_extracted"
     extracted_dir.mkdir()
 
@@ -83,7 +107,9 @@ def extract_files(*, source_path: Path, checked_paths=None):
     if checked_paths is None:
         checked_paths = set()
 
-    for src_path in source_path.rglob("*"):
+    # Listed up front as the extracted files are checked by the
+    # recursive call, rather than being walked again here
+    for src_path in [*source_path.rglob("*")]:
         check_compressed_and_extract(
             src_path=src_path, checked_paths=checked_paths
         )
@@ -120,17 +146,10 @@ def build_images(*, upload_session_pk):
         upload_session.save()
 
     try:
-        with transaction.atomic():
-            # Acquire locks
-            upload_session = session_queryset.get()
-
-            with TemporaryDirectory() as tmp_dir:
-                tmp_dir = Path(tmp_dir).resolve()
-                _populate_tmp_dir(tmp_dir, upload_session)
-                _handle_raw_image_files(tmp_dir, upload_session)
-
-            upload_session.status = upload_session.SUCCESS
-            upload_session.save()
+        with TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir).resolve()
+            _populate_tmp_dir(tmp_dir, upload_session)
+            _handle_raw_image_files(tmp_dir, session_queryset)
     except OperationalError:
         # Could not acquire locks
         raise
@@ -151,19 +170,41 @@ def build_images(*, upload_session_pk):
         raise
 
 
-def _handle_raw_image_files(tmp_dir, upload_session):
-    importer_result = import_images(
-        input_directory=tmp_dir, origin=upload_session
-    )
+def _handle_raw_image_files(tmp_dir, session_queryset):
+    with TemporaryDirectory() as output_directory:
+        panimg_result, conversion_result = _convert_images(
+            input_directory=tmp_dir, output_directory=Path(output_directory)
+        )
 
-    _handle_raw_files(
-        consumed_files=importer_result.consumed_files,
-        file_errors=importer_result.file_errors,
-        base_directory=tmp_dir,
-        upload_session=upload_session,
-    )
+        # Lock the session before anything is uploaded so that a duplicate
+        # or retried task does not leave orphaned files in storage
+        with transaction.atomic():
+            upload_session = session_queryset.get()
 
-    _delete_session_files(upload_session=upload_session)
+            if upload_session.status != upload_session.STARTED:
+                logger.info(
+                    "Nothing to do: session is "
+                    f"{upload_session.get_status_display()}."
+                )
+                return
+
+            _upload_image_files(image_files=conversion_result.new_image_files)
+
+            _save_images(
+                origin=upload_session, conversion_result=conversion_result
+            )
+
+            _handle_raw_files(
+                consumed_files=panimg_result.consumed_files,
+                file_errors=panimg_result.file_errors,
+                base_directory=tmp_dir,
+                upload_session=upload_session,
+            )
+
+            _delete_session_files(upload_session=upload_session)
+
+            upload_session.status = upload_session.SUCCESS
+            upload_session.save()
 
 
 @dataclass
@@ -199,41 +240,109 @@ def import_images(
 
     """
     with TemporaryDirectory() as output_directory:
-        panimg_result = convert(
+        panimg_result, conversion_result = _convert_images(
             input_directory=input_directory,
-            output_directory=output_directory,
+            output_directory=Path(output_directory),
             builders=builders,
-            post_processors=[],  # Do the post-processing later
             recurse_subdirectories=recurse_subdirectories,
         )
 
-        _check_all_ids(panimg_result=panimg_result)
-
-        django_result = _convert_panimg_to_internal(
-            new_images=panimg_result.new_images,
-            new_image_files=panimg_result.new_image_files,
-        )
-
-        _store_images(
-            origin=origin,
-            images=django_result.new_images,
-            image_files=django_result.new_image_files,
-        )
+        _upload_image_files(image_files=conversion_result.new_image_files)
 
-        for image in django_result.new_images:
-            on_commit(
-                post_process_image.signature(
-                    kwargs={"image_pk": image.pk}
-                ).apply_async
-            )
+    _save_images(origin=origin, conversion_result=conversion_result)
 
     return ImporterResult(
-        new_images=django_result.new_images,
+        new_images=conversion_result.new_images,
         consumed_files=panimg_result.consumed_files,
         file_errors=panimg_result.file_errors,
     )
 
 
+def _convert_images(
+    *,
+    input_directory: Path,
+    output_directory: Path,
+    builders: Sequence[Callable] | None = None,
+    recurse_subdirectories: bool = True,
+):
+    """Converts the files to new images and image files"""
+    panimg_result = _convert_directories(
+        input_directory=input_directory,
+        output_directory=output_directory,
+        builders=builders,
+        recurse_subdirectories=recurse_subdirectories,
+    )
+
+    _check_all_ids(panimg_result=panimg_result)
+
+    conversion_result = _convert_panimg_to_internal(
+        new_images=panimg_result.new_images,
+        new_image_files=panimg_result.new_image_files,
+    )
+
+    return panimg_result, conversion_result
+
+
+def _convert_directories(
+    *,
+    input_directory: Path,
+    output_directory: Path,
+    builders: Sequence[Callable] | None,
+    recurse_subdirectories: bool,
+) -> PanImgResult:
+    """
+    Converts the files in each directory in a separate process
+
+    panimg only forms images from the files within one directory, so the
+    directories are converted independently and the results combined.
+    """
+    input_directory = Path(input_directory).resolve()
+
+    directories = [input_directory]
+    if recurse_subdirectories:
+        directories += [p for p in input_directory.rglob("*") if p.is_dir()]
+
+    directories = [
+        d for d in directories if any(p.is_file() for p in d.iterdir())
+    ]
+
+    output_directories = []
+    for idx in range(len(directories)):
+        output_directories.append(output_directory / str(idx))
+        output_directories[-1].mkdir()
+
+    convert_directory = partial(_convert_directory, builders=builders)
+
+    if len(directories) > 1 and settings.CASES_IMPORT_PROCESSES > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(settings.CASES_IMPORT_PROCESSES, len(directories))
+        ) as executor:
+            results = [
+                *executor.map(
+                    convert_directory, directories, output_directories
+                )
+            ]
+    else:
+        results = [*map(convert_directory, directories, output_directories)]
+
+    return PanImgResult(
+        new_images={i for r in results for i in r.new_images},
+        new_image_files={f for r in results for f in r.new_image_files},
+        consumed_files={f for r in results for f in r.consumed_files},
+        file_errors={k: v for r in results for k, v in r.file_errors.items()},
+    )
+
+
+def _convert_directory(input_directory, output_directory, *, builders):
+    return convert(
+        input_directory=input_directory,
+        output_directory=output_directory,
+        builders=builders,
+        post_processors=[],  # Do the post-processing later
+        recurse_subdirectories=False,
+    )
+
+
 def _check_all_ids(*, panimg_result: PanImgResult):
     """
     Check the integrity of the conversion job.
@@ -285,20 +394,56 @@ def _convert_panimg_to_internal(
     )
 
 
+def _upload_image_files(*, image_files: set[ImageFile]):
+    """Concurrently save the image files to storage, before they are stored"""
+
+    def upload(image_file):
+        with image_file.file.file:
+            image_file.save_to_storage()
+
+    with ThreadPoolExecutor(
+        max_workers=settings.CASES_IMPORT_THREADS
+    ) as executor:
+        # Consume the results to raise any exceptions
+        list(executor.map(upload, image_files))
+
+
+def _save_images(
+    *,
+    origin: RawImageUploadSession | None,
+    conversion_result: ConversionResult,
+):
+    _store_images(
+        origin=origin,
+        images=conversion_result.new_images,
+        image_files=conversion_result.new_image_files,
+    )
+
+    for image in conversion_result.new_images:
+        on_commit(
+            post_process_image.signature(
+                kwargs={"image_pk": image.pk}
+            ).apply_async
+        )
+
+
 def _store_images(
     *,
     origin: RawImageUploadSession | None,
     images: set[Image],
     image_files: set[ImageFile],
 ):
+    """Bulk insert the images and their files, which must be uploaded"""
     for image in images:
         image.origin = origin
-        image.full_clean()
-        image.save()
+        image.full_clean(exclude=["origin"], validate_unique=False)
 
     for obj in image_files:
-        obj.full_clean()
-        obj.save()
+        # The images do not exist yet
+        obj.full_clean(exclude=["image"], validate_unique=False)
+
+    Image.objects.bulk_create(images, batch_size=1000)
+    ImageFile.objects.bulk_create(image_files, batch_size=1000)
 
 
 def _handle_raw_files(
@@ -414,8 +559,12 @@ def _store_post_processed_images(*, image_files, new_image_files):
     """Save the post processed files"""
     for im_file in image_files:
         im_file.post_processed = True
-        im_file.save(update_fields=["post_processed"])
+
+    ImageFile.objects.bulk_update(image_files, ["post_processed"])
+
+    _upload_image_files(image_files=new_image_files)
 
     for obj in new_image_files:
-        obj.full_clean()
-        obj.save()
+        obj.full_clean(validate_unique=False)
+
+    ImageFile.objects.bulk_create(new_image_files)
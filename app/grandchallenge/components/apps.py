@@ -25,6 +25,8 @@ def init_default_interfaces(*_, **__):
             "title": "Predictions JSON File",
             "kind": ComponentInterface.Kind.ANY,
             "relative_path": "predictions.json",
+            # The predictions of every job of an evaluation can be large
+            "store_in_database": False,
         },
         {
             "title": "Predictions CSV File",
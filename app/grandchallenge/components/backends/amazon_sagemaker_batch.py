@@ -2,19 +2,24 @@ import io
 import json
 import logging
 import re
+from collections import defaultdict, deque
 from datetime import timedelta
+from hashlib import sha256
 from json import JSONDecodeError
 from typing import NamedTuple
+from uuid import uuid4
 
 import boto3
 import botocore
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import TextChoices
 from django.utils._os import safe_join
 from django.utils.functional import cached_property
 
 from grandchallenge.components.backends.base import Executor, JobParams
 from grandchallenge.components.backends.exceptions import (
+    BatchNotSubmitted,
     ComponentException,
     RetryStep,
     RetryTask,
@@ -277,6 +282,114 @@ class ModelChoices(TextChoices):
     EVALUATION_EVALUATION = "E", "evaluation-evaluation"
 
 
+# Used in the transform job names of batches of jobs, must not be one of the
+# ModelChoices values
+BATCH_KEY = "B"
+PENDING_BATCH_KEY_PREFIX = "components.sagemaker_batch.pending"
+# Hardcoded by AWS
+LOG_GROUP_NAME = "/aws/sagemaker/TransformJobs"
+
+
+def _get_transform_job_name(*, job_id):
+    # SageMaker requires job names to be less than 63 chars
+    job_name = f"{settings.COMPONENTS_REGISTRY_PREFIX}-{job_id}"
+
+    for value, label in ModelChoices.choices:
+        job_name = job_name.replace(label, value)
+
+    return job_name
+
+
+def _get_batch_id(*, transform_job_name):
+    """The id of the batch for batch transform jobs, otherwise None"""
+    prefix_regex = re.escape(settings.COMPONENTS_REGISTRY_PREFIX)
+    pattern = rf"^{prefix_regex}\-{BATCH_KEY}\-(?P<batch_id>{UUID4_REGEX})$"
+
+    result = re.match(pattern, transform_job_name)
+
+    return None if result is None else result.group("batch_id")
+
+
+def _get_batch_prefix(*, batch_id):
+    return safe_join("/invocations", "batches", str(batch_id))
+
+
+def _get_batch_invocation_key(*, batch_id):
+    return safe_join(_get_batch_prefix(batch_id=batch_id), "invocation.jsonl")
+
+
+def _get_pending_batch_key(*, group):
+    return f"{PENDING_BATCH_KEY_PREFIX}.{group}"
+
+
+def _get_pending_batch_lock(*, group):
+    return cache.lock(f"lock.{PENDING_BATCH_KEY_PREFIX}.{group}", timeout=60)
+
+
+def _get_batch_task_logs(*, transform_job_name):
+    """
+    Get the log events of a batch transform job grouped by their task
+
+    The stream of the batch is paged through once, rather than by each of
+    its jobs, so that every job gets its last LOGLINES lines however many
+    lines the other jobs in the batch logged.
+    """
+    logs_client = boto3.client(
+        "logs", region_name=settings.COMPONENTS_AMAZON_ECR_REGION
+    )
+    response = logs_client.describe_log_streams(
+        logGroupName=LOG_GROUP_NAME, logStreamNamePrefix=transform_job_name
+    )
+    log_stream_names = [
+        s["logStreamName"]
+        for s in response["logStreams"]
+        if not s["logStreamName"].endswith("/data-log")
+    ]
+
+    task_logs = defaultdict(lambda: deque(maxlen=LOGLINES))
+
+    for log_stream_name in log_stream_names:
+        kwargs = {}
+
+        while True:
+            response = logs_client.get_log_events(
+                logGroupName=LOG_GROUP_NAME,
+                logStreamName=log_stream_name,
+                startFromHead=True,
+                **kwargs,
+            )
+
+            for event in response["events"]:
+                try:
+                    parsed_log = parse_structured_log(
+                        log=event["message"].replace("\x00", "")
+                    )
+                except (JSONDecodeError, KeyError, ValueError):
+                    continue
+
+                if parsed_log is not None:
+                    task_logs[parsed_log.task].append(
+                        {
+                            "message": event["message"],
+                            "timestamp": event["timestamp"],
+                        }
+                    )
+
+            # The end of the stream is reached when the token is unchanged
+            if response["nextForwardToken"] == kwargs.get("nextToken"):
+                break
+
+            kwargs["nextToken"] = response["nextForwardToken"]
+
+    return {task: [*events] for task, events in task_logs.items()}
+
+
+def _read_lines(*, s3_client, bucket, key):
+    with io.BytesIO() as fileobj:
+        s3_client.download_fileobj(Fileobj=fileobj, Bucket=bucket, Key=key)
+        return fileobj.getvalue().decode("utf-8").splitlines()
+
+
 class AmazonSageMakerBatchExecutor(Executor):
     IS_EVENT_DRIVEN = True
 
@@ -286,6 +399,12 @@ class AmazonSageMakerBatchExecutor(Executor):
         self.__duration = None
         self.__runtime_metrics = {}
 
+        # Set when the job was run as part of a batch
+        self.__batch_transform_job_name = None
+        self.__batch_size = 1
+        self.__batch_result = None
+        self.__batch_logs = []
+
         self.__sagemaker_client = None
         self.__logs_client = None
         self.__cloudwatch_client = None
@@ -314,6 +433,93 @@ class AmazonSageMakerBatchExecutor(Executor):
                 attempt=attempt,
             )
 
+    @staticmethod
+    def get_batched_job_events(*, event):
+        """
+        Split the event of a batch transform job into events for its jobs
+
+        The events of the jobs are the event of the batch with the transform
+        job name of the job, and the result of the job's invocation if the
+        batch completed. The objects of the batch are deleted by
+        delete_batch once the events are sent, so if the objects no longer
+        exist the event has already been handled.
+        """
+        job_name = event["TransformJobName"]
+        batch_id = _get_batch_id(transform_job_name=job_name)
+
+        if batch_id is None:
+            return None
+
+        s3_client = boto3.client(
+            "s3", endpoint_url=settings.AWS_S3_ENDPOINT_URL
+        )
+        invocation_key = _get_batch_invocation_key(batch_id=batch_id)
+
+        try:
+            job_ids = [
+                json.loads(line)["pk"]
+                for line in _read_lines(
+                    s3_client=s3_client,
+                    bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
+                    key=invocation_key,
+                )
+            ]
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] in {"404", "NoSuchKey"}:
+                logger.info(f"Batch {batch_id} was already handled")
+                return []
+            else:
+                raise error
+
+        if event["TransformJobStatus"] == "Completed":
+            # Assembled in the same order as the invocations
+            results = _read_lines(
+                s3_client=s3_client,
+                bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+                key=f"{invocation_key}.out",
+            )
+        else:
+            results = []
+
+        # Missing results are handled by each job
+        results += [None] * (len(job_ids) - len(results))
+
+        task_logs = _get_batch_task_logs(transform_job_name=job_name)
+
+        return [
+            {
+                **event,
+                "TransformJobName": _get_transform_job_name(job_id=job_id),
+                "BatchTransformJobName": job_name,
+                "BatchSize": len(job_ids),
+                "BatchResult": batch_result,
+                "BatchLogs": task_logs.get(job_id, []),
+            }
+            for job_id, batch_result in zip(
+                job_ids, results[: len(job_ids)], strict=True
+            )
+        ]
+
+    @staticmethod
+    def delete_batch(*, event):
+        batch_id = _get_batch_id(transform_job_name=event["TransformJobName"])
+
+        if batch_id is None:
+            return
+
+        s3_client = boto3.client(
+            "s3", endpoint_url=settings.AWS_S3_ENDPOINT_URL
+        )
+        invocation_key = _get_batch_invocation_key(batch_id=batch_id)
+
+        s3_client.delete_object(
+            Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME, Key=invocation_key
+        )
+        s3_client.delete_object(
+            Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+            Key=f"{invocation_key}.out",
+        )
+
     @property
     def _sagemaker_client(self):
         if self.__sagemaker_client is None:
@@ -358,18 +564,30 @@ class AmazonSageMakerBatchExecutor(Executor):
 
     @property
     def _transform_job_name(self):
-        # SageMaker requires job names to be less than 63 chars
-        job_name = f"{settings.COMPONENTS_REGISTRY_PREFIX}-{self._job_id}"
+        return _get_transform_job_name(job_id=self._job_id)
 
-        for value, label in ModelChoices.choices:
-            job_name = job_name.replace(label, value)
+    @property
+    def _event_transform_job_name(self):
+        """The name of the transform job that ran this job"""
+        return self.__batch_transform_job_name or self._transform_job_name
 
-        return job_name
+    @property
+    def _attempt(self):
+        result = re.search(r"\-(?P<attempt>\d{2})$", self._job_id)
+        return 0 if result is None else int(result.group("attempt"))
+
+    @property
+    def _batch_group(self):
+        """Jobs in the same group can be run in the same transform job"""
+        app_label, model_name, _ = self.job_path_parts
+        return sha256(
+            f"{app_label}:{model_name}:{self._exec_image_repo_tag}:"
+            f"{self._instance_type.name}:{self._time_limit}".encode()
+        ).hexdigest()[:16]
 
     @property
     def _log_group_name(self):
-        # Hardcoded by AWS
-        return "/aws/sagemaker/TransformJobs"
+        return LOG_GROUP_NAME
 
     @cached_property
     def _instance_type(self):
@@ -403,12 +621,34 @@ class AmazonSageMakerBatchExecutor(Executor):
         return self._instance_type.usd_cents_per_hour
 
     def execute(self, *, input_civs, input_prefixes):
-        self._create_invocation_json(
-            input_civs=input_civs, input_prefixes=input_prefixes
-        )
-        self._create_transform_job()
+        if (
+            settings.COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE > 1
+            and self._attempt == 0
+        ):
+            # Retries are not batched, so that a job that fails a batch
+            # cannot fail the retried jobs again
+            self._add_to_batch(
+                invocation=self._get_invocation_json(
+                    input_civs=input_civs, input_prefixes=input_prefixes
+                )
+            )
+        else:
+            self._create_invocation_json(
+                input_civs=input_civs, input_prefixes=input_prefixes
+            )
+            self._create_transform_job(
+                transform_job_name=self._transform_job_name,
+                input_key=self._invocation_key,
+                output_prefix=self._invocation_prefix,
+            )
 
     def handle_event(self, *, event):
+        if "BatchTransformJobName" in event:
+            self.__batch_transform_job_name = event["BatchTransformJobName"]
+            self.__batch_size = event["BatchSize"]
+            self.__batch_result = event["BatchResult"]
+            self.__batch_logs = event.get("BatchLogs", [])
+
         job_status = event["TransformJobStatus"]
 
         if job_status == "Stopped":
@@ -450,24 +690,134 @@ class AmazonSageMakerBatchExecutor(Executor):
             f, settings.COMPONENTS_INPUT_BUCKET_NAME, self._invocation_key
         )
 
-    def _create_transform_job(self):
+    def _new_pending_batch(self):
+        return {
+            # Used to recreate an executor that submits the batch
+            "executor_kwargs": {
+                "exec_image_repo_tag": self._exec_image_repo_tag,
+                "memory_limit": self._memory_limit,
+                "time_limit": self._time_limit,
+                "requires_gpu": self._requires_gpu,
+            },
+            "invocations": [],
+        }
+
+    def _add_to_batch(self, *, invocation):
+        """
+        Add the invocation of this job to the pending batch of its group
+
+        The batch is submitted once it is full, otherwise it is submitted by
+        submit_pending_batches.
+        """
+        group = self._batch_group
+        key = _get_pending_batch_key(group=group)
+
+        with _get_pending_batch_lock(group=group):
+            batch = cache.get(key) or self._new_pending_batch()
+            batch["invocations"].append(invocation)
+
+            if (
+                len(batch["invocations"])
+                < settings.COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE
+            ):
+                cache.set(key, batch, timeout=None)
+                return
+
+            cache.delete(key)
+
+        try:
+            self._submit_batch(invocations=batch["invocations"])
+        except RetryStep as error:
+            # The batch was returned, so is submitted later
+            logger.info(f"Batch not submitted, will retry: {error}")
+
+    def _return_to_batch(self, *, invocations):
+        group = self._batch_group
+        key = _get_pending_batch_key(group=group)
+
+        with _get_pending_batch_lock(group=group):
+            batch = cache.get(key) or self._new_pending_batch()
+            batch["invocations"] = [*invocations, *batch["invocations"]]
+            cache.set(key, batch, timeout=None)
+
+    def _submit_batch(self, *, invocations):
+        """Run many invocations in one transform job, one per line"""
+        batch_id = uuid4()
+        invocation_key = _get_batch_invocation_key(batch_id=batch_id)
+
+        try:
+            with io.BytesIO() as f:
+                for invocation in invocations:
+                    f.write(json.dumps(invocation).encode("utf-8") + b"\n")
+                f.seek(0)
+
+                self._s3_client.upload_fileobj(
+                    f, settings.COMPONENTS_INPUT_BUCKET_NAME, invocation_key
+                )
+
+            self._create_transform_job(
+                transform_job_name=f"{settings.COMPONENTS_REGISTRY_PREFIX}-{BATCH_KEY}-{batch_id}",
+                input_key=invocation_key,
+                output_prefix=_get_batch_prefix(batch_id=batch_id),
+                split_lines=True,
+            )
+        except RetryStep:
+            # Do not lose the jobs, they are submitted again later
+            self._return_to_batch(invocations=invocations)
+            raise
+        except Exception as error:
+            # Returning the jobs would requeue them forever, so they fail
+            raise BatchNotSubmitted(
+                "The batch could not be submitted",
+                job_params=[
+                    self.get_job_params(
+                        event={
+                            "TransformJobName": _get_transform_job_name(
+                                job_id=invocation["pk"]
+                            )
+                        }
+                    )
+                    for invocation in invocations
+                ],
+            ) from error
+
+    def _create_transform_job(
+        self,
+        *,
+        transform_job_name,
+        input_key,
+        output_prefix,
+        split_lines=False,
+    ):
+        transform_input = {
+            "DataSource": {
+                "S3DataSource": {
+                    "S3DataType": "S3Prefix",
+                    "S3Uri": f"s3://{settings.COMPONENTS_INPUT_BUCKET_NAME}/{input_key}",
+                }
+            }
+        }
+        transform_output = {
+            "S3OutputPath": f"s3://{settings.COMPONENTS_OUTPUT_BUCKET_NAME}/{output_prefix}"
+        }
+        batch_kwargs = {}
+
+        if split_lines:
+            # Each line of the input is a separate invocation, and the
+            # responses are written to the output in the same order
+            transform_input["SplitType"] = "Line"
+            transform_output["AssembleWith"] = "Line"
+            batch_kwargs["BatchStrategy"] = "SingleRecord"
+
         try:
             self._sagemaker_client.create_transform_job(
-                TransformJobName=self._transform_job_name,
+                TransformJobName=transform_job_name,
                 ModelName=get_sagemaker_model_name(
                     repo_tag=self._exec_image_repo_tag
                 ),
-                TransformInput={
-                    "DataSource": {
-                        "S3DataSource": {
-                            "S3DataType": "S3Prefix",
-                            "S3Uri": f"s3://{settings.COMPONENTS_INPUT_BUCKET_NAME}/{self._invocation_key}",
-                        }
-                    }
-                },
-                TransformOutput={
-                    "S3OutputPath": f"s3://{settings.COMPONENTS_OUTPUT_BUCKET_NAME}/{self._invocation_prefix}"
-                },
+                TransformInput=transform_input,
+                TransformOutput=transform_output,
+                **batch_kwargs,
                 TransformResources={
                     "InstanceType": self._instance_type.name,
                     "InstanceCount": 1,
@@ -493,15 +843,26 @@ class AmazonSageMakerBatchExecutor(Executor):
         try:
             started = ms_timestamp_to_datetime(event.get("TransformStartTime"))
             stopped = ms_timestamp_to_datetime(event.get("TransformEndTime"))
-            self.__duration = stopped - started
+            # The jobs in a batch share the duration, and so the cost
+            self.__duration = (stopped - started) / self.__batch_size
         except TypeError:
             logger.warning("Invalid start or end time, duration undetermined")
             self.__duration = None
 
+        try:
+            created = ms_timestamp_to_datetime(event.get("CreationTime"))
+            started = ms_timestamp_to_datetime(event.get("TransformStartTime"))
+            # Includes waiting for the instance to be provisioned
+            self._instrumentation["container_start"] = (
+                started - created
+            ).total_seconds()
+        except TypeError:
+            pass
+
     def _get_log_stream_name(self, *, data_log=False):
         response = self._logs_client.describe_log_streams(
             logGroupName=self._log_group_name,
-            logStreamNamePrefix=f"{self._transform_job_name}",
+            logStreamNamePrefix=f"{self._event_transform_job_name}",
         )
 
         if "nextToken" in response:
@@ -518,12 +879,16 @@ class AmazonSageMakerBatchExecutor(Executor):
         else:
             raise LogStreamNotFound("Log stream not found")
 
-    def _set_task_logs(self):
+    def _get_task_log_events(self):
+        if self.__batch_transform_job_name is not None:
+            # The logs of a batch are read once, by get_batched_job_events
+            return self.__batch_logs
+
         try:
             log_stream_name = self._get_log_stream_name(data_log=False)
         except LogStreamNotFound as error:
             logger.warning(str(error))
-            return
+            return None
 
         response = self._logs_client.get_log_events(
             logGroupName=self._log_group_name,
@@ -531,10 +896,18 @@ class AmazonSageMakerBatchExecutor(Executor):
             limit=LOGLINES,
             startFromHead=False,
         )
+        return response["events"]
+
+    def _set_task_logs(self):
+        log_events = self._get_task_log_events()
+
+        if log_events is None:
+            return
+
         stdout = []
         stderr = []
 
-        for event in response["events"]:
+        for event in log_events:
             try:
                 parsed_log = parse_structured_log(
                     log=event["message"].replace("\x00", "")
@@ -544,7 +917,12 @@ class AmazonSageMakerBatchExecutor(Executor):
                 logger.warning("Could not parse log")
                 continue
 
-            if parsed_log is not None:
+            if parsed_log is not None and (
+                self.__batch_transform_job_name is None
+                or parsed_log.task == self._job_id
+            ):
+                # The logs of a batch are only shown to the job that
+                # produced them
                 output = f"{timestamp.isoformat()} {parsed_log.message}"
                 if parsed_log.source == SourceChoices.STDOUT:
                     stdout.append(output)
@@ -574,7 +952,7 @@ class AmazonSageMakerBatchExecutor(Executor):
             return
 
         query_id = "q"
-        query = f"SEARCH('{{{self._log_group_name},Host}} Host={self._transform_job_name}/i-', 'Average', 60)"
+        query = f"SEARCH('{{{self._log_group_name},Host}} Host={self._event_transform_job_name}/i-', 'Average', 60)"
 
         instance_type = get(
             [
@@ -618,31 +996,41 @@ class AmazonSageMakerBatchExecutor(Executor):
             "metrics": runtime_metrics,
         }
 
-    def _get_task_return_code(self):
+    def _get_invocation_result(self):
+        if self.__batch_transform_job_name is not None:
+            if self.__batch_result is None:
+                raise ComponentException(
+                    "The invocation request did not return a result"
+                )
+            return self.__batch_result
+
         with io.BytesIO() as fileobj:
             self._s3_client.download_fileobj(
                 Fileobj=fileobj,
                 Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
                 Key=f"{self._invocation_key}.out",
             )
-            fileobj.seek(0)
+            return fileobj.getvalue().decode("utf-8")
 
-            try:
-                result = json.loads(
-                    fileobj.read().decode("utf-8"),
-                )
-            except JSONDecodeError:
-                raise ComponentException(
-                    "The invocation request did not return valid json"
-                )
+    def _get_task_return_code(self):
+        try:
+            result = json.loads(self._get_invocation_result())
+        except JSONDecodeError:
+            raise ComponentException(
+                "The invocation request did not return valid json"
+            )
 
-            try:
-                logger.info(f"{result=}")
-                return int(result["return_code"])
-            except (KeyError, ValueError):
-                raise ComponentException(
-                    "The invocation response object is not valid"
-                )
+        try:
+            logger.info(f"{result=}")
+
+            if result.get("pk", self._job_id) != self._job_id:
+                raise ValueError("Result is for another job")
+
+            return int(result["return_code"])
+        except (AttributeError, KeyError, ValueError):
+            raise ComponentException(
+                "The invocation response object is not valid"
+            )
 
     def _handle_completed_job(self):
         return_code = self._get_task_return_code()
@@ -658,6 +1046,10 @@ class AmazonSageMakerBatchExecutor(Executor):
     def _handle_failed_job(self, *, event):
         failure_reason = event.get("FailureReason")
 
+        if self.__batch_transform_job_name is not None:
+            # Any of the jobs could have failed the batch
+            raise RetryTask("Retrying the job outside of the batch")
+
         if failure_reason == (
             "CapacityError: Unable to provision requested ML compute capacity. "
             "Please retry using a different ML instance type."
@@ -714,3 +1106,53 @@ class AmazonSageMakerBatchExecutor(Executor):
                 logger.info(f"The job could not be stopped: {error}")
             else:
                 raise error
+
+
+def submit_pending_batches():
+    """
+    Submit the batches of jobs that are waiting for more jobs
+
+    Called periodically so that the jobs in a batch that does not fill up
+    wait for at most COMPONENTS_AMAZON_SAGEMAKER_BATCH_WAIT seconds.
+
+    Returns the errors of the batches that could not be submitted, the jobs
+    of these batches need to be failed.
+    """
+    errors = []
+
+    for key in cache.iter_keys(f"{PENDING_BATCH_KEY_PREFIX}.*"):
+        group = key[len(PENDING_BATCH_KEY_PREFIX) + 1 :]
+
+        with _get_pending_batch_lock(group=group):
+            batch = cache.get(key)
+            cache.delete(key)
+
+        if batch:
+            executor = AmazonSageMakerBatchExecutor(
+                job_id=batch["invocations"][0]["pk"],
+                **batch["executor_kwargs"],
+            )
+            try:
+                executor._submit_batch(invocations=batch["invocations"])
+            except RetryStep as error:
+                logger.info(f"Batch not submitted, will retry: {error}")
+            except BatchNotSubmitted as error:
+                logger.exception(error)
+                errors.append(error)
+
+    return errors
+
+
+def get_pending_batch_job_ids():
+    """The ids of the jobs that are waiting in a pending batch"""
+    job_ids = set()
+
+    for key in cache.iter_keys(f"{PENDING_BATCH_KEY_PREFIX}.*"):
+        batch = cache.get(key)
+
+        if batch:
+            job_ids |= {
+                invocation["pk"] for invocation in batch["invocations"]
+            }
+
+    return job_ids
@@ -3,15 +3,18 @@ import json
 import logging
 import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from json import JSONDecodeError
 from math import ceil
 from pathlib import Path
 from tempfile import SpooledTemporaryFile, TemporaryDirectory
+from threading import Lock
 from typing import NamedTuple
 from uuid import UUID
 
 import boto3
 import botocore
+from boto3.s3.transfer import TransferConfig
 from django.conf import settings
 from django.core.exceptions import SuspiciousFileOperation, ValidationError
 from django.db import transaction
@@ -24,6 +27,7 @@ from grandchallenge.components.backends.exceptions import ComponentException
 logger = logging.getLogger(__name__)
 
 MAX_SPOOL_SIZE = 1_000_000_000  # 1GB
+S3_CLIENT_LOCK = Lock()
 
 
 class JobParams(NamedTuple):
@@ -54,6 +58,7 @@ class Executor(ABC):
         self._requires_gpu = requires_gpu
         self._stdout = []
         self._stderr = []
+        self._instrumentation = {}
         self.__s3_client = None
 
     def provision(self, *, input_civs, input_prefixes):
@@ -103,10 +108,35 @@ class Executor(ABC):
     def get_job_params(*, event):
         ...
 
+    @staticmethod
+    def get_batched_job_events(*, event):
+        """
+        The events for each job if the event is for a batch of jobs
+
+        Returns None if the event is for a single job.
+        """
+        return None
+
+    @staticmethod
+    def delete_batch(*, event):
+        """Deletes the objects of a batch once its job events are sent"""
+        return None
+
     @property
     def stdout(self):
         return "\n".join(self._stdout)
 
+    @property
+    def instrumentation(self):
+        """
+        The measurements that were made while running the job
+
+        Can include the number of bytes provisioned ("provisioned_bytes")
+        and the seconds it took for the container to start
+        ("container_start").
+        """
+        return {**self._instrumentation}
+
     @property
     def stderr(self):
         return "\n".join(self._stderr)
@@ -153,13 +183,22 @@ class Executor(ABC):
     def _io_prefix(self):
         return safe_join("/io", *self.job_path_parts)
 
+    @property
+    def _transfer_config(self):
+        return TransferConfig(
+            max_concurrency=settings.COMPONENTS_S3_TRANSFER_CONCURRENCY
+        )
+
     @property
     def _s3_client(self):
-        if self.__s3_client is None:
-            self.__s3_client = boto3.client(
-                "s3",
-                endpoint_url=settings.AWS_S3_ENDPOINT_URL,
-            )
+        # The client is shared by the transfer threads, but creating it is
+        # not thread safe
+        with S3_CLIENT_LOCK:
+            if self.__s3_client is None:
+                self.__s3_client = boto3.client(
+                    "s3",
+                    endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                )
         return self.__s3_client
 
     def _get_key_and_relative_path(self, *, civ, input_prefixes):
@@ -197,51 +236,104 @@ class Executor(ABC):
         }
 
     def _provision_inputs(self, *, input_civs, input_prefixes):
-        for civ in input_civs:
-            key, _ = self._get_key_and_relative_path(
-                civ=civ, input_prefixes=input_prefixes
+        # The sources are resolved here as they can require database
+        # queries, which must not be made from the transfer threads
+        sources = [
+            self._get_input_source(civ=civ, input_prefixes=input_prefixes)
+            for civ in input_civs
+        ]
+
+        with ThreadPoolExecutor(
+            max_workers=settings.COMPONENTS_S3_TRANSFER_CONCURRENCY
+        ) as executor:
+            # Consume the results so that any exceptions are raised
+            list(
+                executor.map(
+                    lambda source: self._provision_input(
+                        key=source["key"],
+                        src=source["src"],
+                        content=source["content"],
+                    ),
+                    sources,
+                )
             )
 
-            if civ.image:
-                self._copy_input_file(src=civ.image_file, dest_key=key)
-            elif civ.file:
-                self._copy_input_file(src=civ.file, dest_key=key)
-            else:
-                with io.BytesIO() as f:
-                    f.write(json.dumps(civ.value).encode("utf-8"))
-                    f.seek(0)
-                    self._s3_client.upload_fileobj(
-                        Fileobj=f,
-                        Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
-                        Key=key,
-                    )
+        self._instrumentation["provisioned_bytes"] = sum(
+            source["size"] for source in sources
+        )
 
-    def _copy_input_file(self, *, src, dest_key):
-        self._s3_client.copy(
-            CopySource={"Bucket": src.storage.bucket.name, "Key": src.name},
-            Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
-            Key=dest_key,
+    def _get_input_source(self, *, civ, input_prefixes):
+        """Get the destination key, source and size of an input"""
+        key, _ = self._get_key_and_relative_path(
+            civ=civ, input_prefixes=input_prefixes
         )
 
+        if civ.image:
+            image_file = civ.image_file
+            return {
+                "key": key,
+                "src": image_file,
+                "content": None,
+                "size": image_file.instance.size_in_storage,
+            }
+        elif civ.file:
+            return {
+                "key": key,
+                "src": civ.file,
+                "content": None,
+                "size": civ.size_in_storage,
+            }
+        else:
+            content = json.dumps(civ.value).encode("utf-8")
+            return {
+                "key": key,
+                "src": None,
+                "content": content,
+                "size": len(content),
+            }
+
+    def _provision_input(self, *, key, src, content):
+        if src is not None:
+            self._s3_client.copy(
+                CopySource={
+                    "Bucket": src.storage.bucket.name,
+                    "Key": src.name,
+                },
+                Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
+                Key=key,
+                Config=self._transfer_config,
+            )
+        else:
+            with io.BytesIO(content) as f:
+                self._s3_client.upload_fileobj(
+                    Fileobj=f,
+                    Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
+                    Key=key,
+                )
+
+    def _list_objects(self, *, bucket, prefix):
+        """All of the objects with a given prefix"""
+        paginator = self._s3_client.get_paginator("list_objects_v2")
+
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            yield from page.get("Contents", [])
+
     def _create_images_result(self, *, interface):
         prefix = safe_join(self._io_prefix, interface.relative_path)
-        response = self._s3_client.list_objects_v2(
-            Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
-            Prefix=prefix,
-        )
-
-        if response.get("IsTruncated", False):
-            raise ComponentException(
-                f"Too many files produced in {interface.relative_path!r}"
+        output_files = [
+            *self._list_objects(
+                bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME, prefix=prefix
             )
+        ]
 
-        output_files = response.get("Contents", [])
         if not output_files:
             raise ComponentException(
                 f"Output directory {interface.relative_path!r} is empty"
             )
 
         with TemporaryDirectory() as tmpdir:
+            downloads = {}
+
             for file in output_files:
                 try:
                     key = safe_join("/", file["Key"])
@@ -250,16 +342,27 @@ class Executor(ABC):
                     logger.warning(f"Skipping {file=} for {interface=}")
                     continue
 
-                logger.info(
-                    f"Downloading {key} to {dest} from "
-                    f"{settings.COMPONENTS_OUTPUT_BUCKET_NAME}"
-                )
-
                 Path(dest).parent.mkdir(parents=True, exist_ok=True)
-                self._s3_client.download_file(
-                    Filename=dest,
-                    Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
-                    Key=key,
+                downloads[key] = dest
+
+            logger.info(
+                f"Downloading {len(downloads)} files from "
+                f"{settings.COMPONENTS_OUTPUT_BUCKET_NAME}/{prefix}"
+            )
+
+            with ThreadPoolExecutor(
+                max_workers=settings.COMPONENTS_S3_TRANSFER_CONCURRENCY
+            ) as executor:
+                list(
+                    executor.map(
+                        lambda item: self._s3_client.download_file(
+                            Filename=item[1],
+                            Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+                            Key=item[0],
+                            Config=self._transfer_config,
+                        ),
+                        downloads.items(),
+                    )
                 )
 
             importer_result = import_images(
@@ -355,25 +458,29 @@ class Executor(ABC):
                 "Deleting from this prefix or bucket is not allowed"
             )
 
-        objects_list = self._s3_client.list_objects_v2(
-            Bucket=bucket,
-            Prefix=prefix,
-        )
+        keys = [
+            content["Key"]
+            for content in self._list_objects(bucket=bucket, prefix=prefix)
+        ]
 
-        if contents := objects_list.get("Contents"):
+        if not keys:
+            logger.debug(f"No objects found in {bucket}/{prefix}")
+            return
+
+        errors = []
+
+        # delete_objects accepts at most 1000 keys per request
+        for idx in range(0, len(keys), 1000):
             response = self._s3_client.delete_objects(
                 Bucket=bucket,
                 Delete={
                     "Objects": [
-                        {"Key": content["Key"]} for content in contents
+                        {"Key": key} for key in keys[idx : idx + 1000]
                     ],
                 },
             )
             logger.debug(f"Deleted {response.get('Deleted')} from {bucket}")
-            errors = response.get("Errors")
-        else:
-            logger.debug(f"No objects found in {bucket}/{prefix}")
-            errors = None
+            errors.extend(response.get("Errors", []))
 
-        if objects_list["IsTruncated"] or errors:
+        if errors:
             logger.error("Not all files were deleted")
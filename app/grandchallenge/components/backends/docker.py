@@ -6,12 +6,18 @@ from pathlib import Path
 from socket import getaddrinfo
 from subprocess import CalledProcessError
 from tempfile import TemporaryDirectory
+from time import monotonic
 
 from dateutil.parser import isoparse
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils.timezone import now
 
-from grandchallenge.components.backends import docker_client
+from grandchallenge.components.backends import (
+    docker_client,
+    docker_pool,
+    http_client,
+)
 from grandchallenge.components.backends.base import Executor
 from grandchallenge.components.backends.exceptions import ComponentException
 from grandchallenge.components.backends.utils import (
@@ -59,6 +65,10 @@ class DockerConnectionMixin:
 
 
 class DockerExecutor(DockerConnectionMixin, Executor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pooled_duration = None
+
     def execute(self, *, input_civs, input_prefixes):
         self._pull_image()
         self._execute_container(
@@ -78,6 +88,9 @@ class DockerExecutor(DockerConnectionMixin, Executor):
 
     @property
     def duration(self):
+        if self._pooled_duration is not None:
+            return self._pooled_duration
+
         try:
             details = docker_client.inspect_container(name=self.container_name)
             if details["State"]["Status"] == "exited":
@@ -99,6 +112,7 @@ class DockerExecutor(DockerConnectionMixin, Executor):
         return
 
     def _execute_container(self, *, input_civs, input_prefixes) -> None:
+        start = monotonic()
         environment = {
             "NVIDIA_VISIBLE_DEVICES": settings.COMPONENTS_NVIDIA_VISIBLE_DEVICES
         }
@@ -112,6 +126,28 @@ class DockerExecutor(DockerConnectionMixin, Executor):
                 }
             )
 
+        if (
+            settings.COMPONENTS_DOCKER_HTTP_CLIENT
+            and settings.COMPONENTS_DOCKER_POOL_SIZE > 0
+        ):
+            with docker_pool.pooled_container(
+                repo_tag=self._exec_image_repo_tag,
+                memory_limit=self._memory_limit,
+                time_limit=self._time_limit,
+                environment=environment,
+            ) as container_name:
+                if container_name is not None:
+                    self._instrumentation["container_start"] = (
+                        monotonic() - start
+                    )
+                    response = self._invoke_pooled_container(
+                        container_name=container_name,
+                        input_civs=input_civs,
+                        input_prefixes=input_prefixes,
+                    )
+                    self._handle_response(response=response)
+                    return
+
         try:
             docker_client.run_container(
                 repo_tag=self._exec_image_repo_tag,
@@ -122,14 +158,48 @@ class DockerExecutor(DockerConnectionMixin, Executor):
                 network=settings.COMPONENTS_DOCKER_NETWORK_NAME,
                 mem_limit=self._memory_limit,
             )
-            self._await_container_ready()
-            response = self._invoke_inference(
-                input_civs=input_civs, input_prefixes=input_prefixes
-            )
+            if settings.COMPONENTS_DOCKER_HTTP_CLIENT:
+                http_client.await_ready(host=self.container_name)
+                self._instrumentation["container_start"] = monotonic() - start
+                response = http_client.invoke(
+                    host=self.container_name,
+                    payload=self._get_invocation_json(
+                        input_civs=input_civs, input_prefixes=input_prefixes
+                    ),
+                    timeout=self._time_limit,
+                )
+            else:
+                self._await_container_ready()
+                self._instrumentation["container_start"] = monotonic() - start
+                response = self._invoke_inference(
+                    input_civs=input_civs, input_prefixes=input_prefixes
+                )
         finally:
             docker_client.stop_container(name=self.container_name)
             self._set_task_logs()
 
+        self._handle_response(response=response)
+
+    def _invoke_pooled_container(
+        self, *, container_name, input_civs, input_prefixes
+    ):
+        started_at = now()
+
+        try:
+            return http_client.invoke(
+                host=container_name,
+                payload=self._get_invocation_json(
+                    input_civs=input_civs, input_prefixes=input_prefixes
+                ),
+                timeout=self._time_limit,
+            )
+        finally:
+            self._pooled_duration = now() - started_at
+            self._set_task_logs(
+                container_name=container_name, since=started_at
+            )
+
+    def _handle_response(self, *, response):
         exit_code = int(response["return_code"])
 
         if exit_code == 137:
@@ -231,10 +301,18 @@ class DockerExecutor(DockerConnectionMixin, Executor):
 
         return loglines
 
-    def _set_task_logs(self):
+    def _set_task_logs(self, *, container_name=None, since=None):
+        """
+        Set the logs of this task
+
+        Pooled containers are shared between jobs, for those only the logs
+        since the invocation started are used.
+        """
         try:
             loglines = docker_client.get_logs(
-                name=self.container_name, tail=LOGLINES
+                name=container_name or self.container_name,
+                tail=LOGLINES,
+                since=since,
             )
         except ObjectDoesNotExist:
             return
@@ -280,8 +358,9 @@ class Service(DockerConnectionMixin):
 
     @property
     def extra_hosts(self):
-        return {}  # Just disable this and work via naming the http service gc.localhost as a quick hack
-
+        return (
+            {}
+        )  # Just disable this and work via naming the http service gc.localhost as a quick hack
 
     def logs(self) -> str:
         """Get the container logs for this service."""
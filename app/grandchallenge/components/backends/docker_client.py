@@ -116,13 +116,24 @@ def inspect_container(*, name):
     return json.loads(result.stdout)
 
 
-def get_logs(*, name, tail=None):
+def list_containers(*, label):
+    """List the running containers that have this label"""
+    result = _run_docker_command(
+        "ps", "--filter", f"label={label}", "--format", "{{json .}}"
+    )
+    return [json.loads(line) for line in result.stdout.splitlines()]
+
+
+def get_logs(*, name, tail=None, since=None):
     container_id = get_container_id(name=name)
     args = ["logs", "--timestamps"]
 
     if tail is not None:
         args.extend(["--tail", str(tail)])
 
+    if since is not None:
+        args.extend(["--since", since.isoformat()])
+
     result = _run_docker_command(*args, container_id)
 
     return result.stdout.splitlines() + result.stderr.splitlines()
@@ -0,0 +1,224 @@
+"""
+A pool of warm containers for the docker backend
+
+Starting a container takes longer than inference for many small jobs, so
+with COMPONENTS_DOCKER_POOL_SIZE set the serve containers are kept running
+and reused by the following jobs of the same container image. Only one job
+uses a pooled container at a time, which is coordinated with a cache lock
+per container so that several workers on the same docker host can share
+the pool.
+
+Pooled containers are invoked with the HTTP client, so the pool is only
+used when COMPONENTS_DOCKER_HTTP_CLIENT is enabled.
+"""
+import logging
+from contextlib import contextmanager
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+from redis.exceptions import LockError
+
+from grandchallenge.components.backends import docker_client, http_client
+
+logger = logging.getLogger(__name__)
+
+POOL_LABEL = "grand-challenge.pool"
+MEMORY_LIMIT_LABEL = "grand-challenge.pool.memory-limit"
+
+
+def _get_pool_key(*, repo_tag, memory_limit):
+    return sha256(f"{repo_tag}:{memory_limit}".encode()).hexdigest()[:16]
+
+
+def _get_lock(*, container_name, timeout):
+    return cache.lock(
+        f"lock.components.docker_pool.{container_name}", timeout=timeout
+    )
+
+
+def _last_used_key(*, container_name):
+    return f"components.docker_pool.last_used.{container_name}"
+
+
+def get_pool_size(*, memory_limit):
+    """The number of containers that are pooled for an image"""
+    return min(
+        settings.COMPONENTS_DOCKER_POOL_SIZE,
+        settings.COMPONENTS_DOCKER_POOL_MEMORY_LIMIT // memory_limit,
+    )
+
+
+@contextmanager
+def pooled_container(*, repo_tag, memory_limit, time_limit, environment):
+    """
+    Acquire a running container from the pool
+
+    Yields the name of the container, or None if no container in the pool
+    is available and the job should run in its own container. If the job
+    raises the container is removed as it could be in a bad state.
+    """
+    pool_key = _get_pool_key(repo_tag=repo_tag, memory_limit=memory_limit)
+
+    for slot in range(get_pool_size(memory_limit=memory_limit)):
+        container_name = f"pool-{pool_key}-{slot}"
+        lock = _get_lock(
+            container_name=container_name,
+            # Allow time for starting the container
+            timeout=time_limit + 300,
+        )
+
+        if not lock.acquire(blocking=False):
+            # Another job is using this container
+            continue
+
+        try:
+            if not _start_container(
+                container_name=container_name,
+                pool_key=pool_key,
+                repo_tag=repo_tag,
+                memory_limit=memory_limit,
+                environment=environment,
+            ):
+                break
+
+            try:
+                yield container_name
+            except Exception:
+                _remove_container(container_name=container_name)
+                raise
+            else:
+                cache.set(
+                    _last_used_key(container_name=container_name),
+                    now(),
+                    timeout=None,
+                )
+
+            return
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                logger.warning(f"Lock for {container_name} had expired")
+
+    yield None
+
+
+def _start_container(
+    *, container_name, pool_key, repo_tag, memory_limit, environment
+):
+    """Ensure that the pooled container is running, returns success"""
+    running = _get_running_containers()
+
+    if container_name in running:
+        return True
+
+    pooled_memory = sum(running.values())
+
+    if (
+        pooled_memory + memory_limit
+        > settings.COMPONENTS_DOCKER_POOL_MEMORY_LIMIT
+    ):
+        evict_idle_containers(
+            required_memory=(
+                pooled_memory
+                + memory_limit
+                - settings.COMPONENTS_DOCKER_POOL_MEMORY_LIMIT
+            )
+        )
+
+        if (
+            sum(_get_running_containers().values()) + memory_limit
+            > settings.COMPONENTS_DOCKER_POOL_MEMORY_LIMIT
+        ):
+            return False
+
+    # Clean up the container if it has exited
+    docker_client.remove_container(name=container_name)
+
+    docker_client.run_container(
+        repo_tag=repo_tag,
+        name=container_name,
+        command=["serve"],
+        labels={
+            POOL_LABEL: pool_key,
+            MEMORY_LIMIT_LABEL: str(memory_limit),
+            "traefik.enable": "false",
+        },
+        environment=environment,
+        network=settings.COMPONENTS_DOCKER_NETWORK_NAME,
+        mem_limit=memory_limit,
+    )
+
+    try:
+        http_client.await_ready(host=container_name)
+    except Exception:
+        _remove_container(container_name=container_name)
+        raise
+
+    return True
+
+
+def _get_running_containers():
+    """The names and memory limits of the running pooled containers"""
+    containers = {}
+
+    for container in docker_client.list_containers(label=POOL_LABEL):
+        labels = dict(
+            label.split("=", 1)
+            for label in container["Labels"].split(",")
+            if "=" in label
+        )
+        containers[container["Names"]] = int(labels[MEMORY_LIMIT_LABEL])
+
+    return containers
+
+
+def _remove_container(*, container_name):
+    docker_client.stop_container(name=container_name)
+    docker_client.remove_container(name=container_name)
+    cache.delete(_last_used_key(container_name=container_name))
+
+
+def evict_idle_containers(*, required_memory=None):
+    """
+    Remove the pooled containers that are not in use
+
+    Containers that have been idle for longer than
+    COMPONENTS_DOCKER_POOL_IDLE_TIMEOUT seconds are always removed. If
+    required_memory is set, least recently used containers are also
+    removed until that many gigabytes are freed.
+    """
+    running = _get_running_containers()
+    last_used = cache.get_many(
+        [_last_used_key(container_name=name) for name in running]
+    )
+    timestamp = now()
+
+    def get_last_used(name):
+        return last_used.get(_last_used_key(container_name=name), timestamp)
+
+    freed_memory = 0
+
+    for container_name in sorted(running, key=get_last_used):
+        idle_seconds = (
+            timestamp - get_last_used(container_name)
+        ).total_seconds()
+
+        if idle_seconds < settings.COMPONENTS_DOCKER_POOL_IDLE_TIMEOUT and (
+            required_memory is None or freed_memory >= required_memory
+        ):
+            continue
+
+        lock = _get_lock(container_name=container_name, timeout=300)
+
+        if not lock.acquire(blocking=False):
+            # The container is in use
+            continue
+
+        try:
+            _remove_container(container_name=container_name)
+            freed_memory += running[container_name]
+        finally:
+            lock.release()
@@ -16,3 +16,11 @@ class RetryTask(ComponentBaseException):
 
 class TaskCancelled(ComponentBaseException):
     """Raised if a task has been cancelled"""
+
+
+class BatchNotSubmitted(ComponentBaseException):
+    """Raised if a batch of jobs could not be submitted, failing its jobs"""
+
+    def __init__(self, *args, job_params):
+        super().__init__(*args)
+        self.job_params = job_params
@@ -0,0 +1,87 @@
+from time import monotonic, sleep
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from grandchallenge.components.backends.exceptions import ComponentException
+
+SHIM_PORT = 8080
+
+_session = None
+
+
+def _get_session():
+    """
+    A session that is shared so that connections are reused
+
+    The containers are on the components network, which the worker either
+    needs to be attached to, or reach through the proxy set in
+    COMPONENTS_DOCKER_HTTP_PROXY.
+    """
+    global _session
+
+    if _session is None:
+        _session = requests.Session()
+        # Only use the configured proxy, not the ones from the environment
+        _session.trust_env = False
+
+        if settings.COMPONENTS_DOCKER_HTTP_PROXY:
+            _session.proxies = {"http": settings.COMPONENTS_DOCKER_HTTP_PROXY}
+
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        _session.mount("http://", adapter)
+
+    return _session
+
+
+def await_ready(*, host, initial_delay=0.1, max_delay=5):
+    """
+    Wait until the sagemaker shim on the host responds to pings
+
+    The delay between attempts is doubled each time, until the container
+    has not started within COMPONENTS_DOCKER_READY_TIMEOUT seconds.
+    """
+    deadline = monotonic() + settings.COMPONENTS_DOCKER_READY_TIMEOUT
+    delay = initial_delay
+
+    while monotonic() < deadline:
+        try:
+            response = _get_session().get(
+                f"http://{host}:{SHIM_PORT}/ping", timeout=2
+            )
+        except (requests.ConnectionError, requests.Timeout):
+            # Container is not ready, try again
+            pass
+        else:
+            if response.status_code == 200:
+                return
+
+        sleep(min(delay, max(deadline - monotonic(), 0)))
+        delay = min(delay * 2, max_delay)
+
+    raise ComponentException("Container did not start in time")
+
+
+def invoke(*, host, payload, timeout):
+    """Make an invocation request to the sagemaker shim on the host"""
+    try:
+        response = _get_session().post(
+            f"http://{host}:{SHIM_PORT}/invocations",
+            json=payload,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+    except requests.Timeout:
+        raise ComponentException("Time limit exceeded")
+    except requests.HTTPError as error:
+        raise ComponentException(
+            "The container responded with an error "
+            f"(status {error.response.status_code})."
+        ) from error
+    except requests.RequestException as error:
+        # Includes connection errors and invalid JSON in the response
+        raise ComponentException(
+            "The container could not be reached or did not respond correctly."
+        ) from error
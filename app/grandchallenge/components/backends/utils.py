@@ -49,6 +49,8 @@ class SourceChoices(TextChoices):
 class ParsedLog(NamedTuple):
     message: str
     source: SourceChoices
+    # The pk of the invocation that produced the log, if known
+    task: str | None = None
 
 
 def parse_structured_log(*, log: str) -> ParsedLog | None:
@@ -60,7 +62,9 @@ def parse_structured_log(*, log: str) -> ParsedLog | None:
 
     if structured_log["internal"] is False:
         # Defensive, in case the type of structured_log["internal"] is str
-        return ParsedLog(message=message, source=source)
+        return ParsedLog(
+            message=message, source=source, task=structured_log.get("task")
+        )
 
 
 def safe_extract(*, src: File, dest: Path):
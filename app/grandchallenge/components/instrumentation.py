@@ -0,0 +1,227 @@
+"""
+Aggregated timings of the stages that component jobs go through
+
+The timings of the jobs that completed recently are collected in histograms
+per job model, backend and container image, so that slow stages such as
+copying the inputs or starting the containers can be spotted.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from grandchallenge.components.models import ComponentImage, ComponentJob
+
+STAGES = (
+    "queue_wait",
+    "provisioning",
+    "container_start",
+    "inference",
+    "parsing",
+    "deprovision",
+)
+BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+CACHE_KEY = "components.instrumentation.stage_histograms"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        # The values in the last bucket exceed the largest bound
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def as_dict(self):
+        return {
+            "buckets": dict(
+                zip(
+                    [*(str(bound) for bound in BUCKETS), "+Inf"],
+                    self.counts,
+                    strict=True,
+                )
+            ),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+def _get_job_models():
+    return [
+        model for model in apps.get_models() if issubclass(model, ComponentJob)
+    ]
+
+
+def _get_container_field(*, model):
+    return next(
+        field
+        for field in model._meta.concrete_fields
+        if field.is_relation
+        and issubclass(field.related_model, ComponentImage)
+    )
+
+
+def _collect_stage_histograms(*, since):
+    histograms = defaultdict(lambda: defaultdict(Histogram))
+    provisioned = defaultdict(lambda: {"bytes": 0, "seconds": 0.0})
+
+    for model in _get_job_models():
+        container_field = _get_container_field(model=model)
+
+        jobs = model.objects.filter(completed_at__gte=since).only(
+            "created",
+            "status_transitions",
+            "instrumentation",
+            container_field.name,
+        )
+
+        for job in jobs.iterator():
+            key = (
+                model._meta.label_lower,
+                job.instrumentation.get("backend", ""),
+                str(getattr(job, container_field.attname)),
+            )
+            stage_timings = job.stage_timings
+
+            for stage, seconds in stage_timings.items():
+                histograms[key][stage].observe(seconds)
+
+            if (
+                stage_timings.get("provisioning")
+                and "provisioned_bytes" in job.instrumentation
+            ):
+                provisioned[key]["bytes"] += job.instrumentation[
+                    "provisioned_bytes"
+                ]
+                provisioned[key]["seconds"] += stage_timings["provisioning"]
+
+    groups = []
+
+    for key in sorted(histograms):
+        model_label, backend, image_pk = key
+        groups.append(
+            {
+                "model": model_label,
+                "backend": backend,
+                "image": image_pk,
+                "stages": {
+                    stage: histograms[key][stage].as_dict()
+                    for stage in STAGES
+                    if stage in histograms[key]
+                },
+                "provisioning_bytes_per_second": (
+                    provisioned[key]["bytes"] / provisioned[key]["seconds"]
+                    if provisioned[key]["seconds"]
+                    else None
+                ),
+            }
+        )
+
+    return groups
+
+
+def get_stage_histograms():
+    """
+    The histograms of the stage timings of recently completed jobs
+
+    Jobs that completed in the last COMPONENTS_STAGE_TIMINGS_WINDOW seconds
+    are included, the result is cached for
+    COMPONENTS_STAGE_TIMINGS_CACHE_TIMEOUT seconds.
+    """
+    histograms = cache.get(CACHE_KEY)
+
+    if histograms is None:
+        histograms = _collect_stage_histograms(
+            since=now()
+            - timedelta(seconds=settings.COMPONENTS_STAGE_TIMINGS_WINDOW)
+        )
+        cache.set(
+            CACHE_KEY,
+            histograms,
+            timeout=settings.COMPONENTS_STAGE_TIMINGS_CACHE_TIMEOUT,
+        )
+
+    return histograms
+
+
+def _quote(value):
+    escaped = (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+    return '"' + escaped + '"'
+
+
+def _format_labels(**labels):
+    return ",".join(
+        f"{name}={_quote(value)}" for name, value in labels.items()
+    )
+
+
+def render_prometheus(*, histograms):
+    """Render the stage histograms in the Prometheus text format"""
+    lines = [
+        "# HELP grandchallenge_job_stage_seconds "
+        "Time spent in each stage of a component job",
+        "# TYPE grandchallenge_job_stage_seconds histogram",
+    ]
+
+    for group in histograms:
+        for stage, histogram in group["stages"].items():
+            labels = {
+                "model": group["model"],
+                "backend": group["backend"],
+                "image": group["image"],
+                "stage": stage,
+            }
+
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                lines.append(
+                    "grandchallenge_job_stage_seconds_bucket"
+                    f"{{{_format_labels(**labels, le=bound)}}} {cumulative}"
+                )
+
+            labels = _format_labels(**labels)
+
+            lines.append(
+                f"grandchallenge_job_stage_seconds_sum{{{labels}}} "
+                f"{histogram['sum']}"
+            )
+            lines.append(
+                f"grandchallenge_job_stage_seconds_count{{{labels}}} "
+                f"{histogram['count']}"
+            )
+
+    lines += [
+        "# HELP grandchallenge_job_provisioning_bytes_per_second "
+        "Rate at which the inputs of component jobs are provisioned",
+        "# TYPE grandchallenge_job_provisioning_bytes_per_second gauge",
+    ]
+
+    for group in histograms:
+        if group["provisioning_bytes_per_second"] is not None:
+            labels = _format_labels(
+                model=group["model"],
+                backend=group["backend"],
+                image=group["image"],
+            )
+            lines.append(
+                f"grandchallenge_job_provisioning_bytes_per_second"
+                f"{{{labels}}} {group['provisioning_bytes_per_second']}"
+            )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.10 on 2026-10-18 17:20
+
+import json
+
+from django.core.files.base import ContentFile
+from django.db import migrations
+
+
+def move_predictions_to_object_store(apps, schema_editor):
+    ComponentInterface = apps.get_model(  # noqa: N806
+        "components", "ComponentInterface"
+    )
+    ComponentInterfaceValue = apps.get_model(  # noqa: N806
+        "components", "ComponentInterfaceValue"
+    )
+
+    # On new databases the interface is created by init_default_interfaces
+    interface = ComponentInterface.objects.filter(
+        slug="predictions-json-file"
+    ).first()
+
+    if interface is None:
+        return
+
+    interface.store_in_database = False
+    interface.save()
+
+    for civ in ComponentInterfaceValue.objects.filter(
+        interface=interface, value__isnull=False
+    ).iterator():
+        content = json.dumps(civ.value).encode("utf-8")
+
+        civ.file.save("predictions.json", ContentFile(content), save=False)
+        civ.value = None
+        civ.size_in_storage = len(content)
+        civ.save(update_fields=["file", "value", "size_in_storage"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("components", "0017_componentinterfacevalue_size_in_storage"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            move_predictions_to_object_store,
+            migrations.RunPython.noop,
+            elidable=True,
+        ),
+    ]
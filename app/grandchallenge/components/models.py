@@ -1,9 +1,12 @@
+import itertools
 import json
 import logging
+import os
 import re
-from datetime import timedelta
-from json import JSONDecodeError
+from datetime import datetime, timedelta
+from functools import cache
 from pathlib import Path
+from tempfile import TemporaryFile
 
 from celery import signature
 from django import forms
@@ -52,6 +55,7 @@ from grandchallenge.core.storage import (
     private_s3_storage,
     protected_s3_storage,
 )
+from grandchallenge.core.utils.json_stream import JSONStreamReader
 from grandchallenge.core.validators import (
     ExtensionValidator,
     JSONSchemaValidator,
@@ -979,22 +983,263 @@ class ComponentInterface(OverlaySegmentsMixin):
                 f"Interface {self.kind} objects cannot be stored in the database"
             )
 
+    def _get_schema_validators(self):
+        validators = [_get_interface_value_validator(kind=self.kind)]
+
+        if self.schema:
+            validators.append(JSONValidator(schema=self.schema))
+
+        return validators
+
     def validate_against_schema(self, *, value):
         """Validates values against both default and custom schemas"""
-        JSONValidator(
-            schema={
-                **INTERFACE_VALUE_SCHEMA,
-                "anyOf": [{"$ref": f"#/definitions/{self.kind}"}],
-            }
-        )(value=value)
+        for validator in self._get_schema_validators():
+            validator(value=value)
 
-        if self.schema:
-            JSONValidator(schema=self.schema)(value=value)
+    def validate_many_against_schema(self, *, values):
+        """Validates many values against both default and custom schemas"""
+        for validator in self._get_schema_validators():
+            validator.validate_many(values)
+
+    def validate_json_file_against_schema(self, *, f):
+        """
+        Validates a JSON file against both default and custom schemas
+
+        Large files are validated in parts to limit the memory that is used,
+        unless the custom schema constrains arrays as a whole.
+        """
+        size = f.seek(0, os.SEEK_END)
+        f.seek(0)
+
+        try:
+            if (
+                size < settings.COMPONENTS_JSON_STREAMING_MIN_BYTES
+                or not self._schema_validates_in_parts
+            ):
+                value = json.loads(f.read().decode("utf-8"))
+                self.validate_against_schema(value=value)
+            else:
+                self._validate_json_stream(f=f)
+        except ValueError as e:
+            # Includes JSON and unicode decode errors
+            raise ValidationError(e)
+
+    @property
+    def _schema_validates_in_parts(self):
+        return _validates_in_parts(
+            schema={"$ref": f"#/definitions/{self.kind}"},
+            root=INTERFACE_VALUE_SCHEMA,
+        ) and _validates_in_parts(schema=self.schema, root=self.schema)
+
+    def _validate_json_stream(self, *, f):
+        """
+        Validates the items of the large arrays in a JSON file one at a time
+
+        The file is read twice. First the document is decoded apart from the
+        items of the arrays that have more than JSON_STREAMING_ARRAY_ITEMS
+        items. Then the document is validated with each of those items in
+        turn as the only item of its array.
+        """
+        validators = self._get_schema_validators()
+        document, streamed_keys = _read_json_skeleton(f=f)
+
+        if not streamed_keys:
+            for validator in validators:
+                validator(value=document)
+            return
+
+        f.seek(0)
+        item_counts = dict.fromkeys(streamed_keys, 0)
+
+        for event in _iter_json_stream(f=f):
+            if event.kind != "item" or event.key not in streamed_keys:
+                continue
+
+            if event.key is None:
+                value = [event.value]
+            else:
+                value = {**document, event.key: [event.value]}
+
+            try:
+                for validator in validators:
+                    validator(value=value)
+            except ValidationError as e:
+                raise ValidationError(
+                    f"Item {item_counts[event.key]} of "
+                    f"{event.key or 'the array'} is invalid: "
+                    f"{' '.join(e.messages)}"
+                )
+
+            item_counts[event.key] += 1
 
     class Meta:
         ordering = ("pk",)
 
 
+# Larger arrays in big JSON files are validated one item at a time
+JSON_STREAMING_ARRAY_ITEMS = 1000
+
+# Keywords that constrain arrays as a whole, so cannot be checked per item
+ARRAY_KEYWORDS = frozenset(
+    (
+        "minItems",
+        "maxItems",
+        "uniqueItems",
+        "contains",
+        "minContains",
+        "maxContains",
+        "prefixItems",
+        "additionalItems",
+        "not",
+    )
+)
+
+# Keywords with subschemas that an array of one item can match when the
+# whole array does not
+ALTERNATIVE_KEYWORDS = frozenset(("anyOf", "oneOf"))
+
+# Keywords with values that are not schemas
+NON_SCHEMA_KEYWORDS = frozenset(
+    (
+        "definitions",
+        "$defs",
+        "enum",
+        "const",
+        "default",
+        "examples",
+        "dependentRequired",
+    )
+)
+
+# Keywords with values that map names to schemas
+SCHEMA_MAP_KEYWORDS = frozenset(
+    ("properties", "patternProperties", "dependencies", "dependentSchemas")
+)
+
+
+def _validates_in_parts(*, schema, root, refs=frozenset()):
+    """
+    Can documents be validated against a schema one array item at a time
+
+    The schemas of the items are not checked as each item is validated in
+    full, only the keywords that apply to the arrays themselves. References
+    are resolved against root, those that cannot be resolved are assumed to
+    constrain the arrays.
+    """
+    if not isinstance(schema, dict):
+        return True
+
+    return all(
+        _keyword_validates_in_parts(
+            keyword=keyword, value=value, root=root, refs=refs
+        )
+        for keyword, value in schema.items()
+    )
+
+
+def _keyword_validates_in_parts(*, keyword, value, root, refs):
+    if keyword in ARRAY_KEYWORDS:
+        return False
+    elif keyword in ALTERNATIVE_KEYWORDS:
+        return len(value) == 1 and _validates_in_parts(
+            schema=value[0], root=root, refs=refs
+        )
+    elif keyword == "items":
+        # Each item is validated in full, unless the items have their
+        # own schemas
+        return not isinstance(value, list)
+    elif keyword == "$ref":
+        if value in refs:
+            return True
+
+        subschema = _resolve_schema_ref(root=root, ref=value)
+
+        return subschema is not None and _validates_in_parts(
+            schema=subschema, root=root, refs=refs | {value}
+        )
+    elif keyword in NON_SCHEMA_KEYWORDS:
+        return True
+    elif keyword in SCHEMA_MAP_KEYWORDS:
+        subschemas = value.values()
+    elif isinstance(value, list):
+        subschemas = value
+    else:
+        subschemas = [value]
+
+    return all(
+        _validates_in_parts(schema=subschema, root=root, refs=refs)
+        for subschema in subschemas
+    )
+
+
+def _resolve_schema_ref(*, root, ref):
+    """Get the subschema of root that a local reference points to"""
+    if not ref.startswith("#/"):
+        return None
+
+    schema = root
+
+    for part in ref[2:].split("/"):
+        try:
+            schema = schema[part.replace("~1", "/").replace("~0", "~")]
+        except (KeyError, TypeError):
+            return None
+
+    return schema
+
+
+def _iter_json_stream(*, f):
+    return JSONStreamReader(
+        f=f, max_item_size=settings.COMPONENTS_JSON_STREAMING_MAX_ITEM_SIZE
+    )
+
+
+def _read_json_skeleton(*, f):
+    """
+    Decode a JSON document apart from the items of its large arrays
+
+    Returns the document, where the large arrays are empty, and the keys of
+    those arrays. The key of a top level array is None.
+    """
+    document = None
+    arrays = {}
+    streamed_keys = set()
+
+    for event in _iter_json_stream(f=f):
+        if event.kind == "object":
+            document = {}
+        elif event.kind == "value" and event.key is None:
+            document = event.value
+        elif event.kind == "value":
+            document[event.key] = event.value
+        elif event.kind == "array":
+            arrays[event.key] = []
+        elif event.key not in streamed_keys:
+            arrays[event.key].append(event.value)
+
+            if len(arrays[event.key]) > JSON_STREAMING_ARRAY_ITEMS:
+                streamed_keys.add(event.key)
+                arrays[event.key] = []
+
+    for key, items in arrays.items():
+        if key is None:
+            document = items
+        else:
+            document[key] = items
+
+    return document, streamed_keys
+
+
+@cache
+def _get_interface_value_validator(*, kind):
+    return JSONValidator(
+        schema={
+            **INTERFACE_VALUE_SCHEMA,
+            "anyOf": [{"$ref": f"#/definitions/{kind}"}],
+        }
+    )
+
+
 def component_interface_value_path(instance, filename):
     # Convert the pk to a hex, padded to 4 chars with zeros
     pk_as_padded_hex = f"{instance.pk:04x}"
@@ -1219,26 +1464,19 @@ class ComponentInterfaceValue(models.Model):
             return
         if self.interface.saved_in_object_store:
             self._validate_file_only()
-            with self.file.open("r") as f:
-                try:
-                    value = json.loads(f.read().decode("utf-8"))
-                except JSONDecodeError as e:
-                    raise ValidationError(e)
+            with self.file.open("rb") as f:
+                self.interface.validate_json_file_against_schema(f=f)
         else:
             self._validate_value_only()
-            value = self.value
-
-        self.interface.validate_against_schema(value=value)
+            self.interface.validate_against_schema(value=self.value)
 
     def validate_user_upload(self, user_upload):
         if not user_upload.is_completed:
             raise ValidationError("User upload is not completed.")
         if self.interface.is_json_kind:
-            try:
-                value = json.loads(user_upload.read_object())
-            except JSONDecodeError as e:
-                raise ValidationError(e)
-            self.interface.validate_against_schema(value=value)
+            with TemporaryFile() as f:
+                user_upload.download_fileobj(f)
+                self.interface.validate_json_file_against_schema(f=f)
         self._user_upload_validated = True
 
     def update_size_in_storage(self):
@@ -1322,6 +1560,18 @@ class ComponentJob(models.Model):
     error_message = models.CharField(max_length=1024, default="")
     started_at = models.DateTimeField(null=True)
     completed_at = models.DateTimeField(null=True)
+    status_transitions = models.JSONField(
+        default=list,
+        editable=False,
+        help_text="List of the statuses of this job and when they were set",
+    )
+    instrumentation = models.JSONField(
+        default=dict,
+        editable=False,
+        help_text=(
+            "The backend that ran this job and the measurements it made"
+        ),
+    )
     compute_cost_euro_millicents = models.PositiveIntegerField(
         # We store euro here as the costs were incurred at a time when
         # the exchange rate may have been different
@@ -1381,46 +1631,159 @@ class ComponentJob(models.Model):
         duration: timedelta | None = None,
         compute_cost_euro_millicents=None,
         runtime_metrics=None,
+        instrumentation=None,
     ):
+        timestamp = now()
+
         self.status = status
+        self.status_transitions = [
+            *self.status_transitions,
+            [status, timestamp.isoformat()],
+        ]
+        # Only write what has changed, the other fields could have been
+        # updated elsewhere and the model save hooks are skipped
+        update_fields = {"status", "status_transitions"}
 
         if stdout:
             self.stdout = stdout
+            update_fields.add("stdout")
 
         if stderr:
             self.stderr = stderr
+            update_fields.add("stderr")
 
         if error_message:
             self.error_message = error_message[:1024]
+            update_fields.add("error_message")
 
         if (
             status in [self.STARTED, self.EXECUTING]
             and self.started_at is None
         ):
-            self.started_at = now()
+            self.started_at = timestamp
+            update_fields.add("started_at")
         elif (
             status
             in [self.EXECUTED, self.SUCCESS, self.FAILURE, self.CANCELLED]
             and self.completed_at is None
         ):
-            self.completed_at = now()
+            self.completed_at = timestamp
+            update_fields.add("completed_at")
             if duration and self.started_at:
-                # TODO: maybe add separate timings for provisioning, executing, parsing and total
+                # The time spent in each status is in status_durations
                 self.started_at = self.completed_at - duration
+                update_fields.add("started_at")
 
         if compute_cost_euro_millicents is not None:
             self.compute_cost_euro_millicents = compute_cost_euro_millicents
+            update_fields.add("compute_cost_euro_millicents")
 
         if runtime_metrics is not None:
             self.runtime_metrics = runtime_metrics
+            update_fields.add("runtime_metrics")
+
+        if duration is not None:
+            instrumentation = {
+                **(instrumentation or {}),
+                "inference": duration.total_seconds(),
+            }
+
+        if instrumentation:
+            self.instrumentation = {**self.instrumentation, **instrumentation}
+            update_fields.add("instrumentation")
+
+        update_fields.update(
+            field.name
+            for field in self._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        )
 
-        self.save()
+        self.save(update_fields=update_fields)
 
         if self.status == self.SUCCESS:
             on_commit(self.execute_task_on_success)
         elif self.status in [self.FAILURE, self.CANCELLED]:
             on_commit(self.execute_task_on_failure)
 
+    @property
+    def status_durations(self):
+        """
+        The total time in seconds that the job spent in each status
+
+        The status that the job is currently in is not included.
+        """
+        durations = {}
+
+        for (status, started), (_next_status, stopped) in itertools.pairwise(
+            self.status_transitions
+        ):
+            label = self.get_status_display_for(status=status)
+            durations[label] = (
+                durations.get(label, 0)
+                + (
+                    datetime.fromisoformat(stopped)
+                    - datetime.fromisoformat(started)
+                ).total_seconds()
+            )
+
+        return durations
+
+    @property
+    def stage_timings(self):
+        """
+        The seconds spent in each stage of running this job
+
+        Stages that the job has not been through, or that the backend did
+        not measure, are not included.
+        """
+        durations = self.status_durations
+        timings = {}
+
+        provisioning_started = next(
+            (
+                timestamp
+                for status, timestamp in self.status_transitions
+                if status == self.PROVISIONING
+            ),
+            None,
+        )
+        if provisioning_started is not None:
+            timings["queue_wait"] = (
+                datetime.fromisoformat(provisioning_started) - self.created
+            ).total_seconds()
+
+        for stage, status in (
+            ("provisioning", self.PROVISIONING),
+            ("parsing", self.PARSING),
+        ):
+            label = self.get_status_display_for(status=status)
+            if label in durations:
+                timings[stage] = durations[label]
+
+        for stage in ("container_start", "inference", "deprovision"):
+            if stage in self.instrumentation:
+                timings[stage] = self.instrumentation[stage]
+
+        return timings
+
+    @property
+    def provisioning_bytes_per_second(self):
+        provisioning = self.stage_timings.get("provisioning")
+        provisioned_bytes = self.instrumentation.get("provisioned_bytes")
+
+        if provisioning and provisioned_bytes is not None:
+            return provisioned_bytes / provisioning
+        else:
+            return None
+
+    def update_instrumentation(self, **measurements):
+        self.instrumentation = {**self.instrumentation, **measurements}
+        self.save(update_fields=["instrumentation"])
+
+    @classmethod
+    def get_status_display_for(cls, *, status):
+        return dict(cls.STATUS_CHOICES).get(status, str(status))
+
     @property
     def executor_kwargs(self):
         return {
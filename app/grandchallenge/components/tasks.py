@@ -7,9 +7,11 @@ import tarfile
 import uuid
 import zlib
 from base64 import b64encode
+from datetime import timedelta
 from lzma import LZMAError
 from pathlib import Path
 from tempfile import NamedTemporaryFile, TemporaryDirectory
+from time import monotonic
 
 import boto3
 from billiard.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
@@ -28,7 +30,17 @@ from panimg.models import SimpleITKImage
 
 from grandchallenge.cases.models import ImageFile, RawImageUploadSession
 from grandchallenge.cases.utils import get_sitk_image
+from grandchallenge.components.backends.amazon_sagemaker_batch import (
+    AmazonSageMakerBatchExecutor,
+    ModelChoices,
+    get_pending_batch_job_ids,
+    submit_pending_batches,
+)
+from grandchallenge.components.backends.docker_pool import (
+    evict_idle_containers,
+)
 from grandchallenge.components.backends.exceptions import (
+    BatchNotSubmitted,
     ComponentException,
     RetryStep,
     RetryTask,
@@ -222,6 +234,90 @@ def remove_inactive_container_images():
                     )
 
 
+@shared_task
+def evict_idle_pooled_containers():
+    """Stop the pooled containers of the docker backend that are idle"""
+    evict_idle_containers()
+
+
+@shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
+def submit_pending_sagemaker_batches():
+    """Submit the batches of SageMaker jobs that are not yet full"""
+    for error in submit_pending_batches():
+        _fail_batched_jobs(error=error)
+
+
+@shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
+def fail_lost_sagemaker_batch_jobs():
+    """
+    Fail the SageMaker jobs that were lost from their batch
+
+    Pending batches are only kept in the cache, so their jobs are lost if
+    the cache is flushed or a worker dies while submitting a batch. These
+    jobs never receive an event, so they are failed once they have been
+    executing for longer than their batch could take.
+    """
+    backend = (
+        f"{AmazonSageMakerBatchExecutor.__module__}."
+        f"{AmazonSageMakerBatchExecutor.__qualname__}"
+    )
+    pending_job_ids = get_pending_batch_job_ids()
+    # Allows for the instance of the batch to be started
+    margin = timedelta(hours=1)
+    cutoff = (
+        now()
+        - timedelta(seconds=settings.COMPONENTS_AMAZON_SAGEMAKER_BATCH_WAIT)
+        - margin
+    )
+
+    for label in ModelChoices.labels:
+        app_label, model_name = label.split("-")
+        model = apps.get_model(app_label=app_label, model_name=model_name)
+
+        # Only the first attempt of a job is batched
+        jobs = model.objects.filter(
+            status=model.EXECUTING,
+            attempt=0,
+            instrumentation__backend=backend,
+            started_at__lt=cutoff,
+        )
+
+        for job in jobs.iterator():
+            job_id = f"{app_label}-{model_name}-{job.pk}-{job.attempt:02}"
+            batch_duration = timedelta(
+                seconds=settings.COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE
+                * job.time_limit
+            )
+
+            if (
+                job_id not in pending_job_ids
+                and job.started_at < cutoff - batch_duration
+            ):
+                job.update_status(
+                    status=job.FAILURE,
+                    error_message="An unexpected error occurred",
+                )
+
+
+def _fail_batched_jobs(*, error):
+    """Fail the jobs of a batch that could not be submitted"""
+    for job_params in error.job_params:
+        model = apps.get_model(
+            app_label=job_params.app_label, model_name=job_params.model_name
+        )
+        jobs = model.objects.filter(
+            pk=job_params.pk,
+            attempt=job_params.attempt,
+            status=model.EXECUTING,
+        )
+
+        for job in jobs:
+            job.update_status(
+                status=job.FAILURE,
+                error_message="An unexpected error occurred",
+            )
+
+
 @shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-2xlarge"])
 def remove_container_image_from_registry(
     *, pk: uuid.UUID, app_label: str, model_name: str
@@ -584,7 +680,9 @@ def provision_job(
     executor = job.get_executor(backend=backend)
 
     if job.status in [job.PENDING, job.RETRY]:
-        job.update_status(status=job.PROVISIONING)
+        job.update_status(
+            status=job.PROVISIONING, instrumentation={"backend": backend}
+        )
     else:
         raise PriorStepFailed("Job is not ready for provisioning")
 
@@ -603,8 +701,31 @@ def provision_job(
         )
         raise
     else:
-        job.update_status(status=job.PROVISIONED)
-        on_commit(execute_job.signature(**job.signature_kwargs).apply_async)
+        job.update_status(
+            status=job.PROVISIONED, instrumentation=executor.instrumentation
+        )
+
+        if settings.COMPONENTS_JOB_PIPELINE:
+            _run_job_pipeline(job=job, executor=executor)
+        else:
+            on_commit(
+                execute_job.signature(**job.signature_kwargs).apply_async
+            )
+
+
+def _run_job_pipeline(*, job, executor):
+    """
+    Execute the job and parse its outputs in this task
+
+    This avoids the queueing of the execute and parse tasks and fetching
+    the job again in each of them. Event driven executors return straight
+    away from execute, so their outputs are still parsed in a separate task
+    once the event for the job has been handled.
+    """
+    executed = _execute_job(job=job, executor=executor, retries=0)
+
+    if executed:
+        _parse_job_outputs(job=job, executor=executor)
 
 
 def _delay(*, task, signature_kwargs):
@@ -642,7 +763,7 @@ def _retry(*, task, signature_kwargs, retries):
 
 
 @shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
-def execute_job(  # noqa: C901
+def execute_job(
     *,
     job_pk: uuid.UUID,
     job_app_label: str,
@@ -665,6 +786,24 @@ def execute_job(  # noqa: C901
     )
     executor = job.get_executor(backend=backend)
 
+    executed = _execute_job(job=job, executor=executor, retries=retries)
+
+    if executed:
+        on_commit(
+            parse_job_outputs.signature(**job.signature_kwargs).apply_async
+        )
+
+
+def _refresh_job(*, job):
+    return get_model_instance(
+        pk=job.pk,
+        app_label=job._meta.app_label,
+        model_name=job._meta.model_name,
+    )
+
+
+def _execute_job(*, job, executor, retries):  # noqa: C901
+    """Executes the job, returns True if its outputs can now be parsed"""
     if job.status == job.PROVISIONED:
         job.update_status(status=job.EXECUTING)
     else:
@@ -692,7 +831,7 @@ def execute_job(  # noqa: C901
                 signature_kwargs=job.signature_kwargs,
                 retries=retries,
             )
-            return
+            return False
         except MaxRetriesExceededError:
             job.update_status(
                 status=job.FAILURE,
@@ -702,9 +841,7 @@ def execute_job(  # noqa: C901
             )
             raise
     except ComponentException as e:
-        job = get_model_instance(
-            pk=job_pk, app_label=job_app_label, model_name=job_model_name
-        )
+        job = _refresh_job(job=job)
         job.update_status(
             status=job.FAILURE,
             stdout=executor.stdout,
@@ -712,19 +849,19 @@ def execute_job(  # noqa: C901
             error_message=str(e),
         )
     except (SoftTimeLimitExceeded, TimeLimitExceeded):
-        job = get_model_instance(
-            pk=job_pk, app_label=job_app_label, model_name=job_model_name
-        )
+        job = _refresh_job(job=job)
         job.update_status(
             status=job.FAILURE,
             stdout=executor.stdout,
             stderr=executor.stderr,
             error_message="Time limit exceeded",
         )
+    except BatchNotSubmitted as error:
+        # Includes this job
+        _fail_batched_jobs(error=error)
+        raise
     except Exception:
-        job = get_model_instance(
-            pk=job_pk, app_label=job_app_label, model_name=job_model_name
-        )
+        job = _refresh_job(job=job)
         job.update_status(
             status=job.FAILURE,
             stdout=executor.stdout,
@@ -740,10 +877,11 @@ def execute_job(  # noqa: C901
                 stderr=executor.stderr,
                 duration=executor.duration,
                 compute_cost_euro_millicents=executor.compute_cost_euro_millicents,
+                instrumentation=executor.instrumentation,
             )
-            on_commit(
-                parse_job_outputs.signature(**job.signature_kwargs).apply_async
-            )
+            return True
+
+    return False
 
 
 @shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
@@ -761,6 +899,19 @@ def handle_event(*, event, backend, retries=0):  # noqa: C901
     """
     Backend = import_string(backend)  # noqa: N806
 
+    job_events = Backend.get_batched_job_events(event=event)
+
+    if job_events is not None:
+        for job_event in job_events:
+            handle_event.apply_async(
+                kwargs={"event": job_event, "backend": backend}
+            )
+
+        # The job events contain everything that the jobs need from the
+        # batch, so if sending them fails the batch can be handled again
+        Backend.delete_batch(event=event)
+        return
+
     job_params = Backend.get_job_params(event=event)
 
     job = get_model_instance(
@@ -834,6 +985,7 @@ def handle_event(*, event, backend, retries=0):  # noqa: C901
             duration=executor.duration,
             compute_cost_euro_millicents=executor.compute_cost_euro_millicents,
             runtime_metrics=executor.runtime_metrics,
+            instrumentation=executor.instrumentation,
         )
         on_commit(
             parse_job_outputs.signature(**job.signature_kwargs).apply_async
@@ -849,12 +1001,16 @@ def parse_job_outputs(
     )
     executor = job.get_executor(backend=backend)
 
-    if job.status == job.EXECUTED and not job.outputs.exists():
-        job.update_status(status=job.PARSING)
-    else:
+    if job.status != job.EXECUTED or job.outputs.exists():
         deprovision_job.signature(**job.signature_kwargs).apply_async()
         raise PriorStepFailed("Job is not ready for output parsing")
 
+    _parse_job_outputs(job=job, executor=executor)
+
+
+def _parse_job_outputs(*, job, executor):
+    job.update_status(status=job.PARSING)
+
     try:
         outputs = executor.get_outputs(
             output_interfaces=job.output_interfaces.all()
@@ -925,6 +1081,7 @@ def deprovision_job(
         pk=job_pk, app_label=job_app_label, model_name=job_model_name
     )
     executor = job.get_executor(backend=backend)
+    start = monotonic()
 
     try:
         executor.deprovision()
@@ -934,6 +1091,8 @@ def deprovision_job(
             signature_kwargs=job.signature_kwargs,
             retries=retries,
         )
+    else:
+        job.update_instrumentation(deprovision=monotonic() - start)
 
 
 @shared_task
@@ -3,10 +3,19 @@ from django.db.models import Q, TextChoices
 from django.views.generic import ListView, TemplateView
 from django_filters.rest_framework import DjangoFilterBackend
 from guardian.mixins import LoginRequiredMixin
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from grandchallenge.algorithms.forms import NON_ALGORITHM_INTERFACES
 from grandchallenge.api.permissions import IsAuthenticated
+from grandchallenge.components.instrumentation import (
+    get_stage_histograms,
+    render_prometheus,
+)
 from grandchallenge.components.models import ComponentInterface, InterfaceKind
 from grandchallenge.components.serializers import ComponentInterfaceSerializer
 from grandchallenge.reader_studies.models import ReaderStudy
@@ -20,6 +29,32 @@ class ComponentInterfaceViewSet(ReadOnlyModelViewSet):
     filter_backends = (DjangoFilterBackend,)
 
 
+class StageTimingsPrometheusRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return render_prometheus(histograms=data)
+
+
+class JobStageTimingsAPIView(APIView):
+    """
+    Histograms of the time that recent jobs spent in each stage
+
+    Also available in the Prometheus text format with ?format=prometheus.
+    """
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = (
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        StageTimingsPrometheusRenderer,
+    )
+
+    def get(self, request, format=None):
+        return Response(get_stage_histograms())
+
+
 class ComponentInterfaceIOSwitch(LoginRequiredMixin, TemplateView):
     template_name = "components/componentinterface_io_switch.html"
 
@@ -1,2 +1,82 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+
 def _cache_key_from_method(method):
     return f"lock.{method.__module__}.{method.__name__}"
+
+
+def _permissions_version_key(*, model, pk):
+    return f"permissions_version.{model._meta.label_lower}.{pk}"
+
+
+def _cached_permission_key(*, user, perm, model, pk):
+    return f"cached_permission.{user.pk}.{perm}.{model._meta.label_lower}.{pk}"
+
+
+def invalidate_cached_permissions(*, objs):
+    """
+    Invalidates the cached permission decisions for these objects
+
+    The objects can either be the objects that were checked or the users
+    that were checked.
+    """
+    cache.set_many(
+        {
+            _permissions_version_key(
+                model=obj._meta.model, pk=obj.pk
+            ): uuid4().hex
+            for obj in objs
+        },
+        timeout=None,
+    )
+
+
+def has_cached_perm(*, user, perm, model, pk):
+    """
+    Returns True if the user was recently granted perm on the object
+
+    Only granted permissions are cached, which are invalidated with
+    invalidate_cached_permissions for either the user or the object.
+    """
+    if not user.is_authenticated:
+        return False
+
+    version_keys = [
+        _permissions_version_key(model=user._meta.model, pk=user.pk),
+        _permissions_version_key(model=model, pk=pk),
+    ]
+    permission_key = _cached_permission_key(
+        user=user, perm=perm, model=model, pk=pk
+    )
+
+    values = cache.get_many([permission_key, *version_keys])
+    versions = [values.get(key) for key in version_keys]
+
+    return None not in versions and values.get(permission_key) == versions
+
+
+def cache_granted_perm(*, user, perm, obj):
+    """Caches that the user has been granted perm on the object"""
+    if not user.is_authenticated:
+        return
+
+    version_keys = [
+        _permissions_version_key(model=user._meta.model, pk=user.pk),
+        _permissions_version_key(model=obj._meta.model, pk=obj.pk),
+    ]
+
+    for key in version_keys:
+        cache.add(key, uuid4().hex, timeout=None)
+
+    versions = cache.get_many(version_keys)
+
+    cache.set(
+        _cached_permission_key(
+            user=user, perm=perm, model=obj._meta.model, pk=obj.pk
+        ),
+        [versions.get(key) for key in version_keys],
+        timeout=settings.CACHED_PERMISSIONS_TIMEOUT,
+    )
@@ -1,51 +1,191 @@
+import csv
 import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Prefetch
 
 from grandchallenge.challenges.models import Challenge
+from grandchallenge.components.models import ComponentInterfaceValue
 from grandchallenge.evaluation.models import Evaluation
 
+FIELDS = (
+    "pk",
+    "created",
+    "phase",
+    "submission",
+    "submission_comment",
+    "submission_file",
+    "supplementary_file",
+    "supplementary_url",
+    "method",
+    "creator",
+    "published",
+    "metrics",
+    "rank",
+    "rank_score",
+    "rank_per_metric",
+)
+
+# These fields contain nested objects so are encoded for flat formats
+JSON_FIELDS = ("metrics", "rank_per_metric")
+
 
 class Command(BaseCommand):
+    help = "Exports the results of the evaluations of a challenge"
+
     def add_arguments(self, parser):
-        parser.add_argument("challenge_short_name", nargs="+", type=str)
+        parser.add_argument("challenge_short_name", type=str)
+        parser.add_argument(
+            "--phase",
+            action="append",
+            dest="phase_slugs",
+            default=[],
+            help="Only export this phase, can be used multiple times",
+        )
+        parser.add_argument(
+            "--format",
+            choices=("jsonl", "csv"),
+            default="jsonl",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="The file to write to, defaults to stdout",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--signing-workers",
+            type=int,
+            default=8,
+            help="The number of threads used to sign the file urls",
+        )
 
     def handle(self, *args, **options):
-        challenge = Challenge.objects.get(
-            short_name__iexact=options["challenge_short_name"][0]
+        try:
+            challenge = Challenge.objects.get(
+                short_name__iexact=options["challenge_short_name"]
+            )
+        except Challenge.DoesNotExist:
+            raise CommandError("Challenge not found")
+
+        evaluations = (
+            Evaluation.objects.filter(submission__phase__challenge=challenge)
+            .select_related("submission__creator", "submission__phase")
+            .prefetch_related(
+                Prefetch(
+                    "outputs",
+                    queryset=ComponentInterfaceValue.objects.filter(
+                        interface__slug="metrics-json-file"
+                    ),
+                    to_attr="metrics_outputs",
+                )
+            )
+            .order_by("created")
         )
 
-        jobs = (
-            Evaluation.objects.filter(method__challenge=challenge)
-            .select_related("submission", "method")
-            .prefetch_related("outputs")
+        if options["phase_slugs"]:
+            evaluations = evaluations.filter(
+                submission__phase__slug__in=options["phase_slugs"]
+            )
+
+        writer_class = {
+            "jsonl": JSONLinesWriter,
+            "csv": CSVWriter,
+        }[options["format"]]
+
+        if options["output"] == "-":
+            stream = nullcontext(self.stdout)
+        else:
+            stream = open(options["output"], "w", newline="")
+
+        with stream as f, ThreadPoolExecutor(
+            max_workers=options["signing_workers"]
+        ) as executor:
+            writer = writer_class(f=f)
+
+            for batch in _batched(
+                evaluations.iterator(chunk_size=options["batch_size"]),
+                options["batch_size"],
+            ):
+                writer.write(rows=_get_rows(batch=batch, executor=executor))
+
+            writer.close()
+
+
+def _batched(iterable, n):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, n)):
+        yield batch
+
+
+def _get_url(field):
+    return field.url if field else None
+
+
+def _get_rows(*, batch, executor):
+    """Get the results of a batch of evaluations, signing the urls in parallel"""
+    submission_files = executor.map(
+        _get_url, [e.submission.predictions_file for e in batch]
+    )
+    supplementary_files = executor.map(
+        _get_url, [e.submission.supplementary_file for e in batch]
+    )
+
+    return [
+        {
+            "pk": str(e.pk),
+            "created": e.created.isoformat(),
+            "phase": e.submission.phase.slug,
+            "submission": str(e.submission.pk),
+            "submission_comment": e.submission.comment,
+            "submission_file": submission_file,
+            "supplementary_file": supplementary_file,
+            "supplementary_url": e.submission.supplementary_url,
+            "method": str(e.method_id),
+            "creator": str(e.submission.creator),
+            "published": e.published,
+            "metrics": e.metrics_outputs[0].value
+            if e.metrics_outputs
+            else None,
+            "rank": e.rank,
+            "rank_score": e.rank_score,
+            "rank_per_metric": e.rank_per_metric,
+        }
+        for e, submission_file, supplementary_file in zip(
+            batch, submission_files, supplementary_files, strict=True
         )
+    ]
+
 
-        print("[")
-
-        for j in jobs:
-            out = {
-                "pk": str(j.pk),
-                "created": j.created.isoformat(),
-                "submission": str(j.submission.pk),
-                "submission_comment": j.submission.comment,
-                "submission_file": j.submission.predictions_file.url
-                if j.submission.predictions_file
-                else None,
-                "supplementary_file": j.submission.supplementary_file.url
-                if j.submission.supplementary_file
-                else None,
-                "supplementary_url": j.submission.supplementary_url,
-                "method": str(j.method.pk),
-                "creator": str(j.submission.creator),
-                "published": j.published,
-                "metrics": j.outputs.get(
-                    interface__slug="metrics-json-file"
-                ).value,
-                "rank": j.rank,
-                "rank_score": j.rank_score,
-                "rank_per_metric": j.rank_per_metric,
+class JSONLinesWriter:
+    def __init__(self, *, f):
+        self._f = f
+
+    def write(self, *, rows):
+        for row in rows:
+            self._f.write(json.dumps(row) + "\n")
+
+    def close(self):
+        self._f.flush()
+
+
+class CSVWriter:
+    def __init__(self, *, f):
+        self._f = f
+        self._writer = csv.DictWriter(f, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def write(self, *, rows):
+        self._writer.writerows(
+            {
+                **row,
+                **{field: json.dumps(row[field]) for field in JSON_FIELDS},
             }
-            print(json.dumps(out, indent=2) + ",")
+            for row in rows
+        )
 
-        print("]")
+    def close(self):
+        self._f.flush()
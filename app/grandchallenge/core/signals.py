@@ -24,6 +24,7 @@ from grandchallenge.algorithms.models import (
 from grandchallenge.archives.models import Archive, ArchivePermissionRequest
 from grandchallenge.cases.models import RawImageUploadSession
 from grandchallenge.challenges.models import Challenge
+from grandchallenge.core.cache import invalidate_cached_permissions
 from grandchallenge.core.utils import disable_for_loaddata
 from grandchallenge.evaluation.models import Evaluation, Phase, Submission
 from grandchallenge.notifications.models import Notification, NotificationType
@@ -114,6 +115,26 @@ def remove_permission_request_notifications(sender, *, instance, created, **_):
         ).delete()
 
 
+@receiver(m2m_changed, sender=Group.user_set.through)
+def invalidate_cached_permissions_on_group_change(
+    instance, action, reverse, model, pk_set, **_
+):
+    """Users removed from a group could lose permissions on objects"""
+    if reverse:
+        if action == "pre_clear":
+            users = instance.user_set.all()
+        elif action == "post_remove":
+            users = model.objects.filter(pk__in=pk_set)
+        else:
+            return
+    elif action in {"post_remove", "post_clear"}:
+        users = [instance]
+    else:
+        return
+
+    invalidate_cached_permissions(objs=users)
+
+
 @receiver(m2m_changed, sender=Group.user_set.through)
 def update_editor_follows(  # noqa: C901
     instance, action, reverse, model, pk_set, **_
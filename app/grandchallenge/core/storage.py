@@ -1,15 +1,24 @@
 import copy
 import datetime
 from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
 from uuid import uuid4
 
+from boto3.s3.transfer import TransferConfig
 from botocore.signers import CloudFrontSigner
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import (
+    ImproperlyConfigured,
+    SuspiciousFileOperation,
+)
 from django.db.models.fields.files import FieldFile
+from django.utils._os import safe_join
 from django.utils.deconstruct import deconstructible
 from django.utils.encoding import filepath_to_uri
 from django.utils.text import get_valid_filename
@@ -44,6 +53,46 @@ class S3Storage(S3Boto3Storage):
             Key=to_name,
         )
 
+    def save_directory(self, *, directory, name, max_workers=10):
+        """
+        Saves all of the files in a directory concurrently
+
+        The files are stored under name with their path relative to the
+        directory, and large files are uploaded in parts. Existing files
+        are overwritten. Returns the total number of bytes saved.
+        """
+        directory = Path(directory)
+        files = []
+
+        for file in directory.rglob("*"):
+            if not file.is_file():
+                continue
+
+            if file.is_symlink() or file.absolute() != file.resolve():
+                raise SuspiciousFileOperation
+
+            files.append(file)
+
+        client = self.connection.meta.client
+        transfer_config = TransferConfig(use_threads=False)
+
+        def upload(file):
+            key = safe_join(f"/{name}", file.relative_to(directory))[1:]
+            key = self._normalize_name(clean_name(key))
+
+            client.upload_file(
+                Filename=str(file),
+                Bucket=self.bucket_name,
+                Key=key,
+                ExtraArgs=self._get_write_parameters(key),
+                Config=transfer_config,
+            )
+
+            return file.stat().st_size
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return sum(executor.map(upload, files))
+
 
 @deconstructible
 class PrivateS3Storage(S3Storage):
@@ -72,6 +121,8 @@ class ProtectedS3Storage(S3Storage):
 
         super().__init__(*args, config=config, **kwargs)
 
+        self._signed_url_cache = _SignedURLCache(expire=None, urls={})
+
     def cloudfront_signed_url(self, *, name, domain=None, expire=None):
         """
         Create a signed url that will be valid until the specific expiry date
@@ -81,36 +132,98 @@ class ProtectedS3Storage(S3Storage):
 
         https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/cloudfront.html#id57
         """
-        name = self._normalize_name(clean_name(name))
+        return self.cloudfront_signed_urls(
+            names=[name], domain=domain, expire=expire
+        )[name]
 
+    def cloudfront_signed_urls(self, *, names, domain=None, expire=None):
+        """
+        Create signed urls for many files at once, returns a dict of the
+        name of each file to its signed url.
+
+        If no expiry date is given the urls expire a fixed time after the
+        start of the current cache period, so urls signed in the same period
+        are identical and are reused from an in memory cache.
+        """
         if domain is None:
             domain = settings.PROTECTED_S3_STORAGE_CLOUDFRONT_DOMAIN
 
-        url = f"https://{domain}/{filepath_to_uri(name)}"
-
         if expire is None:
-            expire = now() + datetime.timedelta(
-                seconds=settings.CLOUDFRONT_URL_EXPIRY_SECONDS
-            )
+            expire, url_cache = self._get_signed_url_cache()
+        else:
+            url_cache = {}
 
-        return self._cloudfront_signer.generate_presigned_url(
-            url, date_less_than=expire
+        signer = self._cloudfront_signer
+        urls = {}
+
+        for name in names:
+            key = (domain, name)
+
+            try:
+                urls[name] = url_cache[key]
+            except KeyError:
+                normalized_name = self._normalize_name(clean_name(name))
+                urls[name] = url_cache[key] = signer.generate_presigned_url(
+                    f"https://{domain}/{filepath_to_uri(normalized_name)}",
+                    date_less_than=expire,
+                )
+
+        return urls
+
+    def _get_signed_url_cache(self):
+        cache_seconds = settings.CLOUDFRONT_URL_CACHE_SECONDS
+        timestamp = int(now().timestamp())
+
+        if cache_seconds:
+            timestamp -= timestamp % cache_seconds
+
+        expire = datetime.datetime.fromtimestamp(
+            timestamp + settings.CLOUDFRONT_URL_EXPIRY_SECONDS,
+            tz=datetime.timezone.utc,
         )
 
+        if not cache_seconds:
+            return expire, {}
+
+        expire_cache = self._signed_url_cache
+
+        if (
+            expire_cache.expire != expire
+            or len(expire_cache.urls) >= settings.CLOUDFRONT_URL_CACHE_SIZE
+        ):
+            # Urls from the previous period are dropped
+            expire_cache = self._signed_url_cache = _SignedURLCache(
+                expire=expire, urls={}
+            )
+
+        return expire, expire_cache.urls
+
     @property
     def _cloudfront_signer(self):
-        key_bytes = b64decode(
-            settings.CLOUDFRONT_PRIVATE_KEY_BASE64.encode("ascii")
+        return _get_cloudfront_signer(
+            key_pair_id=settings.CLOUDFRONT_KEY_PAIR_ID,
+            private_key_base64=settings.CLOUDFRONT_PRIVATE_KEY_BASE64,
         )
 
-        private_key = serialization.load_pem_private_key(
-            key_bytes, password=None, backend=default_backend()
-        )
 
-        return CloudFrontSigner(
-            settings.CLOUDFRONT_KEY_PAIR_ID,
-            lambda m: private_key.sign(m, padding.PKCS1v15(), hashes.SHA1()),
-        )
+class _SignedURLCache(NamedTuple):
+    expire: datetime.datetime | None
+    urls: dict
+
+
+@lru_cache(maxsize=4)
+def _get_cloudfront_signer(*, key_pair_id, private_key_base64):
+    """Loading the private key is slow, so the signer is reused"""
+    key_bytes = b64decode(private_key_base64.encode("ascii"))
+
+    private_key = serialization.load_pem_private_key(
+        key_bytes, password=None, backend=default_backend()
+    )
+
+    return CloudFrontSigner(
+        key_pair_id,
+        lambda m: private_key.sign(m, padding.PKCS1v15(), hashes.SHA1()),
+    )
 
 
 @deconstructible
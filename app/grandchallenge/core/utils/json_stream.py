@@ -0,0 +1,200 @@
+"""
+Incremental decoding of large JSON documents
+
+Only the top level of a document is decoded incrementally. The items of a
+top level array, or of the arrays that are the values of a top level
+object, are decoded one at a time, so the memory that is used is bounded
+by the largest item rather than by the size of the document.
+"""
+import codecs
+import json
+import re
+from json import JSONDecodeError
+from typing import Any, NamedTuple
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+# The characters that can continue a number that has been decoded
+NUMBER_CONTINUATION = re.compile(r"[0-9.eE+\-]*")
+
+
+class JSONStreamEvent(NamedTuple):
+    # One of "object", "value", "array" or "item"
+    kind: str
+    # The key in the top level object, None for other documents
+    key: str | None
+    value: Any
+
+
+class JSONStreamReader:
+    def __init__(self, *, f, chunk_size=1_048_576, max_item_size=None):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._max_item_size = max_item_size
+
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self, size):
+        """Adds the next chunk to the buffer, returns False at the end"""
+        if self._eof:
+            return False
+
+        chunk = self._f.read(size)
+
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+
+        if not chunk:
+            self._eof = True
+
+        # The consumed part of the buffer is no longer needed
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(
+            chunk, final=self._eof
+        )
+        self._pos = 0
+
+        return True
+
+    def _peek(self):
+        """The next non-whitespace character, an empty string at the end"""
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            elif not self._read(self._chunk_size):
+                return ""
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise JSONDecodeError(
+                f"Expecting {char!r}", self._buffer, self._pos
+            )
+
+        self._pos += 1
+
+    def _decode(self):
+        """Decodes the next value"""
+        self._peek()
+        size = self._chunk_size
+
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(
+                    self._buffer, self._pos
+                )
+            except JSONDecodeError:
+                # The value could be incomplete
+                self._check_item_size()
+                if not self._read(size):
+                    raise
+            else:
+                if not self._could_continue(end=end) or not self._read(size):
+                    self._pos = end
+                    return value
+
+                # The value could continue in the next chunk, for instance
+                # when it is a number that is split after its "." or "e"
+
+            size *= 2
+
+    def _could_continue(self, *, end):
+        """Could the value decoded up to end continue in the next chunk"""
+        if self._eof:
+            return False
+        elif end == len(self._buffer):
+            return True
+        else:
+            # Strings, arrays and objects are delimited, so only numbers
+            # can be truncated at a chunk boundary
+            return (
+                self._buffer[self._pos] in "-0123456789"
+                and NUMBER_CONTINUATION.fullmatch(self._buffer, end)
+                is not None
+            )
+
+    def _check_item_size(self):
+        if (
+            self._max_item_size is not None
+            and len(self._buffer) - self._pos > self._max_item_size
+        ):
+            raise ValueError(
+                f"Items larger than {self._max_item_size} characters "
+                "cannot be decoded"
+            )
+
+    def _iter_array(self, *, key):
+        self._expect("[")
+
+        yield JSONStreamEvent(kind="array", key=key, value=None)
+
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield JSONStreamEvent(kind="item", key=key, value=self._decode())
+
+            if self._peek() == ",":
+                self._pos += 1
+            else:
+                self._expect("]")
+                return
+
+    def _iter_object(self):
+        self._expect("{")
+
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            if self._peek() != '"':
+                raise JSONDecodeError(
+                    "Expecting property name enclosed in double quotes",
+                    self._buffer,
+                    self._pos,
+                )
+
+            key = self._decode()
+            self._expect(":")
+
+            if self._peek() == "[":
+                yield from self._iter_array(key=key)
+            else:
+                yield JSONStreamEvent(
+                    kind="value", key=key, value=self._decode()
+                )
+
+            if self._peek() == ",":
+                self._pos += 1
+            else:
+                self._expect("}")
+                return
+
+    def __iter__(self):
+        """
+        Yields the events of the document
+
+        For a top level object an "object" event is yielded, followed by a
+        "value" event for every member that is not an array. Array members
+        yield an "array" event and then an "item" event for each of their
+        items. A top level array yields the same events with the key set to
+        None, and any other document yields a single "value" event.
+        """
+        char = self._peek()
+
+        if char == "[":
+            yield from self._iter_array(key=None)
+        elif char == "{":
+            yield JSONStreamEvent(kind="object", key=None, value=None)
+            yield from self._iter_object()
+        else:
+            yield JSONStreamEvent(kind="value", key=None, value=self._decode())
+
+        if self._peek() != "":
+            raise JSONDecodeError("Extra data", self._buffer, self._pos)
@@ -1,5 +1,6 @@
+import json
 import re
-from functools import cache
+from functools import cache, lru_cache
 from pathlib import Path
 
 import magic
@@ -9,9 +10,8 @@ import requests
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.deconstruct import deconstructible
-from jsonschema import SchemaError
-from jsonschema import ValidationError as JSONValidationError
-from jsonschema import validate, validators
+from jsonschema import SchemaError, validators
+from jsonschema.exceptions import best_match
 
 
 @deconstructible
@@ -146,6 +146,26 @@ def get_json_schema_registry():
     return referencing.Registry(retrieve=retrieve)
 
 
+def get_json_validator(*, schema: dict):
+    """
+    Get the compiled validator for a schema
+
+    The validators are shared by the process, so the schema is only checked
+    and the validator only created once for each distinct schema.
+    """
+    return _get_json_validator(json.dumps(schema, sort_keys=True))
+
+
+@lru_cache(maxsize=1024)
+def _get_json_validator(schema_json):
+    schema = json.loads(schema_json)
+
+    cls = validators.validator_for(schema)
+    cls.check_schema(schema)
+
+    return cls(schema, registry=get_json_schema_registry())
+
+
 @deconstructible
 class JSONValidator:
     """Uses jsonschema to validate json fields."""
@@ -154,14 +174,37 @@ class JSONValidator:
 
     def __init__(self, *, schema: dict):
         self.schema = schema
-        self.registry = get_json_schema_registry()
+        self._validator = None
         super().__init__()
 
+    def _get_error(self, value):
+        if self._validator is None:
+            self._validator = get_json_validator(schema=self.schema)
+
+        return best_match(self._validator.iter_errors(value))
+
     def __call__(self, value):
-        try:
-            validate(value, self.schema, registry=self.registry)
-        except JSONValidationError as e:
-            raise ValidationError(f"JSON does not fulfill schema: {e}")
+        error = self._get_error(value)
+
+        if error is not None:
+            raise ValidationError(f"JSON does not fulfill schema: {error}")
+
+    def validate_many(self, values):
+        """Validates each of the values, raising the errors of all of them"""
+        errors = []
+
+        for idx, value in enumerate(values):
+            error = self._get_error(value)
+
+            if error is not None:
+                errors.append(
+                    ValidationError(
+                        f"Item {idx} JSON does not fulfill schema: {error}"
+                    )
+                )
+
+        if errors:
+            raise ValidationError(errors)
 
     def __eq__(self, other):
         return isinstance(other, JSONValidator) and self.schema == other.schema
@@ -164,6 +164,9 @@ class EvaluationAdmin(admin.ModelAdmin):
         "task_on_success",
         "task_on_failure",
         "runtime_metrics",
+        "stage_timings",
+        "provisioning_bytes_per_second",
+        "instrumentation",
     )
     actions = (requeue_jobs, cancel_jobs, deprovision_jobs)
 
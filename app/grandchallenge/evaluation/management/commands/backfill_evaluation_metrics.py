@@ -0,0 +1,44 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from grandchallenge.evaluation.models import Evaluation, Phase
+from grandchallenge.evaluation.tasks import (
+    calculate_ranks,
+    update_evaluation_metrics,
+)
+
+
+class Command(BaseCommand):
+    help = "Materialises the leaderboard metrics of existing evaluations"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        for phase in Phase.objects.iterator():
+            paths = phase.metric_paths
+            pks = list(
+                Evaluation.objects.filter(submission__phase=phase)
+                .annotate(
+                    metrics_count=Count(
+                        "metrics", filter=Q(metrics__path__in=paths)
+                    )
+                )
+                .filter(metrics_count__lt=len(paths))
+                .values_list("pk", flat=True)
+            )
+
+            for idx in range(0, len(pks), batch_size):
+                with transaction.atomic():
+                    update_evaluation_metrics(
+                        evaluation_pks=pks[idx : idx + batch_size],
+                        paths=paths,
+                    )
+
+            if pks:
+                calculate_ranks.apply_async(kwargs={"phase_pk": phase.pk})
+
+            self.stdout.write(f"{phase}: {len(pks)} evaluations backfilled")
@@ -0,0 +1,48 @@
+# Generated by Django 4.1.10 on 2026-10-18 08:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0044_optionalhangingprotocolphase_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EvaluationMetric",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("path", models.CharField(editable=False, max_length=255)),
+                ("value", models.FloatField(editable=False, null=True)),
+                (
+                    "evaluation",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metrics",
+                        to="evaluation.evaluation",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["path", "value"],
+                        name="evaluation__path_4a6e53_idx",
+                    )
+                ],
+                "unique_together": {("evaluation", "path")},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.1.10 on 2026-10-18 09:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0045_evaluationmetric"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(editable=False)),
+                (
+                    "metric_paths",
+                    models.JSONField(default=list, editable=False),
+                ),
+                ("positions", models.JSONField(default=dict, editable=False)),
+                (
+                    "phase",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_snapshots",
+                        to="evaluation.phase",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("phase", "date")},
+            },
+        ),
+    ]
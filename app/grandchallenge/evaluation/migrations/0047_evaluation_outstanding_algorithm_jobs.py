@@ -0,0 +1,22 @@
+# Generated by Django 4.1.10 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0046_leaderboardsnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluation",
+            name="outstanding_algorithm_jobs",
+            field=models.IntegerField(
+                editable=False,
+                help_text="The number of algorithm jobs that this evaluation is waiting for, set once all of the jobs have been created",
+                null=True,
+            ),
+        ),
+    ]
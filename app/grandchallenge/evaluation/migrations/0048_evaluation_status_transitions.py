@@ -0,0 +1,22 @@
+# Generated by Django 4.1.10 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0047_evaluation_outstanding_algorithm_jobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluation",
+            name="status_transitions",
+            field=models.JSONField(
+                default=list,
+                editable=False,
+                help_text="List of the statuses of this job and when they were set",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.10 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0048_evaluation_status_transitions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluation",
+            name="instrumentation",
+            field=models.JSONField(
+                default=dict,
+                editable=False,
+                help_text="The backend that ran this job and the measurements it made",
+            ),
+        ),
+    ]
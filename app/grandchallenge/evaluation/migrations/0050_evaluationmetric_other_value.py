@@ -0,0 +1,30 @@
+# Generated by Django 4.1.10 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+def delete_missing_metrics(apps, schema_editor):
+    # Metrics that are not numbers were stored as missing, deleting them
+    # means that they are extracted again by backfill_evaluation_metrics
+    # or when the ranks are next calculated
+    EvaluationMetric = apps.get_model(  # noqa: N806
+        "evaluation", "EvaluationMetric"
+    )
+    EvaluationMetric.objects.filter(value__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("evaluation", "0049_evaluation_instrumentation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluationmetric",
+            name="other_value",
+            field=models.JSONField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            delete_missing_metrics, migrations.RunPython.noop, elidable=True
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 4.1.10 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_positions(apps, schema_editor):
+    Evaluation = apps.get_model("evaluation", "Evaluation")  # noqa: N806
+    LeaderboardSnapshot = apps.get_model(  # noqa: N806
+        "evaluation", "LeaderboardSnapshot"
+    )
+    LeaderboardSnapshotPosition = apps.get_model(  # noqa: N806
+        "evaluation", "LeaderboardSnapshotPosition"
+    )
+
+    for snapshot in LeaderboardSnapshot.objects.iterator():
+        existing_pks = {
+            str(pk)
+            for pk in Evaluation.objects.filter(
+                pk__in=snapshot.old_positions.keys()
+            ).values_list("pk", flat=True)
+        }
+
+        LeaderboardSnapshotPosition.objects.bulk_create(
+            [
+                LeaderboardSnapshotPosition(
+                    snapshot=snapshot,
+                    evaluation_id=pk,
+                    rank=rank,
+                    rank_score=rank_score,
+                    rank_per_metric=dict(
+                        zip(snapshot.metric_paths, ranks, strict=True)
+                    ),
+                )
+                for pk, (rank, rank_score, *ranks) in (
+                    snapshot.old_positions.items()
+                )
+                if pk in existing_pks
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("evaluation", "0050_evaluationmetric_other_value"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="leaderboardsnapshot",
+            old_name="positions",
+            new_name="old_positions",
+        ),
+        migrations.CreateModel(
+            name="LeaderboardSnapshotPosition",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveIntegerField(editable=False)),
+                ("rank_score", models.FloatField(editable=False)),
+                (
+                    "rank_per_metric",
+                    models.JSONField(default=dict, editable=False),
+                ),
+                (
+                    "evaluation",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_snapshot_positions",
+                        to="evaluation.evaluation",
+                    ),
+                ),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="positions",
+                        to="evaluation.leaderboardsnapshot",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("snapshot", "evaluation")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="leaderboardsnapshotposition",
+            index=models.Index(
+                fields=["snapshot", "rank"],
+                name="evaluation__snapsho_2da113_idx",
+            ),
+        ),
+        migrations.RunPython(
+            create_positions, migrations.RunPython.noop, elidable=True
+        ),
+    ]
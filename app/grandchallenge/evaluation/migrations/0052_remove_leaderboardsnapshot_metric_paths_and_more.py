@@ -0,0 +1,20 @@
+# Generated by Django 4.1.10 on 2026-10-18 16:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("evaluation", "0051_leaderboardsnapshotposition"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="leaderboardsnapshot",
+            name="metric_paths",
+        ),
+        migrations.RemoveField(
+            model_name="leaderboardsnapshot",
+            name="old_positions",
+        ),
+    ]
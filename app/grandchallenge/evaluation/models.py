@@ -476,6 +476,18 @@ class Phase(UUIDModel, ViewContentMixin):
     def __str__(self):
         return f"{self.title} Evaluation for {self.challenge.short_name}"
 
+    @property
+    def metric_paths(self):
+        """The unique paths of the metrics used to rank the evaluations"""
+        return list(
+            dict.fromkeys(
+                [
+                    self.score_jsonpath,
+                    *(col["path"] for col in self.extra_results_columns),
+                ]
+            )
+        )
+
     def save(self, *args, **kwargs):
         adding = self._state.adding
 
@@ -977,6 +989,14 @@ class Evaluation(UUIDModel, ComponentJob):
     )
     rank_score = models.FloatField(default=0.0)
     rank_per_metric = models.JSONField(default=dict)
+    outstanding_algorithm_jobs = models.IntegerField(
+        null=True,
+        editable=False,
+        help_text=(
+            "The number of algorithm jobs that this evaluation is waiting "
+            "for, set once all of the jobs have been created"
+        ),
+    )
 
     class Meta(UUIDModel.Meta, ComponentJob.Meta):
         unique_together = ("submission", "method")
@@ -989,8 +1009,19 @@ class Evaluation(UUIDModel, ComponentJob):
 
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get("update_fields")
+
+        if update_fields is not None and "published" not in update_fields:
+            # Status updates do not change the permissions or the ranks,
+            # unless this evaluation has now succeeded
+            if "status" in update_fields and self.status == self.SUCCESS:
+                self._calculate_ranks_on_commit()
+            return
+
         self.assign_permissions()
+        self._calculate_ranks_on_commit()
 
+    def _calculate_ranks_on_commit(self):
         on_commit(
             lambda: calculate_ranks.apply_async(
                 kwargs={"phase_pk": self.submission.phase.pk}
@@ -1088,6 +1119,75 @@ class Evaluation(UUIDModel, ComponentJob):
         )
 
 
+class EvaluationMetric(models.Model):
+    """
+    A metric value extracted from the metrics json of an evaluation
+
+    One row is stored for each of the metrics used for ranking by the
+    phase. Numbers are stored in value so that they can be indexed, other
+    values such as strings are stored in other_value. Both are null if the
+    metric is missing.
+    """
+
+    evaluation = models.ForeignKey(
+        Evaluation,
+        on_delete=models.CASCADE,
+        related_name="metrics",
+        editable=False,
+    )
+    path = models.CharField(max_length=255, editable=False)
+    value = models.FloatField(null=True, editable=False)
+    other_value = models.JSONField(null=True, editable=False)
+
+    class Meta:
+        unique_together = (("evaluation", "path"),)
+        indexes = (models.Index(fields=["path", "value"]),)
+
+
+class LeaderboardSnapshot(models.Model):
+    """
+    The positions on the leaderboard of a phase at the end of a day
+
+    The position of each ranked evaluation is stored in a
+    LeaderboardSnapshotPosition.
+    """
+
+    phase = models.ForeignKey(
+        Phase,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_snapshots",
+        editable=False,
+    )
+    date = models.DateField(editable=False)
+
+    class Meta:
+        unique_together = (("phase", "date"),)
+
+
+class LeaderboardSnapshotPosition(models.Model):
+    """The position of an evaluation in a leaderboard snapshot"""
+
+    snapshot = models.ForeignKey(
+        LeaderboardSnapshot,
+        on_delete=models.CASCADE,
+        related_name="positions",
+        editable=False,
+    )
+    evaluation = models.ForeignKey(
+        Evaluation,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_snapshot_positions",
+        editable=False,
+    )
+    rank = models.PositiveIntegerField(editable=False)
+    rank_score = models.FloatField(editable=False)
+    rank_per_metric = models.JSONField(default=dict, editable=False)
+
+    class Meta:
+        unique_together = (("snapshot", "evaluation"),)
+        indexes = (models.Index(fields=["snapshot", "rank"]),)
+
+
 class EvaluationUserObjectPermission(UserObjectPermissionBase):
     content_object = models.ForeignKey(Evaluation, on_delete=models.CASCADE)
 
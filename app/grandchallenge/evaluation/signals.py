@@ -6,8 +6,11 @@ from django.dispatch import receiver
 from grandchallenge.evaluation.models import (
     CombinedLeaderboard,
     CombinedLeaderboardPhase,
+    Evaluation,
+    EvaluationMetric,
     Phase,
 )
+from grandchallenge.evaluation.tasks import update_evaluation_metrics
 
 
 @receiver(pre_delete, sender=Phase)
@@ -35,3 +38,36 @@ def handle_combined_leaderboard_phase_change(
 
     for leaderboard in leaderboards:
         leaderboard.schedule_combined_ranks_update()
+
+
+@receiver(m2m_changed, sender=Evaluation.outputs.through)
+def update_metrics_on_evaluation_outputs_changed(
+    instance, action, reverse, pk_set, **_
+):
+    if reverse:
+        if action == "pre_clear":
+            # The evaluations are only known before the clear
+            if instance.interface.slug == "metrics-json-file":
+                EvaluationMetric.objects.filter(
+                    evaluation__outputs=instance
+                ).update(value=None, other_value=None)
+            return
+        elif action in ["post_add", "post_remove"]:
+            evaluations = Evaluation.objects.filter(
+                pk__in=pk_set
+            ).select_related("submission__phase")
+        else:
+            # nothing to do for the other actions
+            return
+    else:
+        if action in ["post_add", "post_remove", "post_clear"]:
+            evaluations = [instance]
+        else:
+            # nothing to do for the other actions
+            return
+
+    for evaluation in evaluations:
+        update_evaluation_metrics(
+            evaluation_pks=[evaluation.pk],
+            paths=evaluation.submission.phase.metric_paths,
+        )
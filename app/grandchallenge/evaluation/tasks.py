@@ -1,34 +1,47 @@
 import calendar
 import datetime
+import json
 import logging
 import uuid
-from statistics import mean, median
+from functools import partial
+from pathlib import Path
+from tempfile import TemporaryFile
 from typing import NamedTuple
 
+import numpy as np
 from celery import shared_task
 from django.apps import apps
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.files import File
 from django.db import transaction
-from django.db.models import Count, F, Q
-from django.db.models.functions import Extract
+from django.db.models import Count, F, Subquery
+from django.db.models.functions import Coalesce, Extract
 from django.db.transaction import on_commit
+from django.utils.timezone import localdate
 from redis.exceptions import LockError
+from rest_framework.utils.encoders import JSONEncoder
 
 from grandchallenge.algorithms.exceptions import TooManyJobsScheduled
-from grandchallenge.algorithms.models import Job
-from grandchallenge.algorithms.tasks import create_algorithm_jobs
+from grandchallenge.algorithms.models import get_inputs_hash
+from grandchallenge.algorithms.tasks import (
+    _backfill_inputs_hashes,
+    create_algorithm_jobs,
+)
 from grandchallenge.components.models import (
     ComponentInterface,
     ComponentInterfaceValue,
 )
 from grandchallenge.components.tasks import _retry
-from grandchallenge.core.cache import _cache_key_from_method
 from grandchallenge.core.validators import get_file_mimetype
+from grandchallenge.evaluation.templatetags.evaluation_extras import (
+    get_jsonpath,
+)
 from grandchallenge.evaluation.utils import (
     Metric,
     SubmissionKindChoices,
+    get_metric_values,
     rank_results,
 )
 from grandchallenge.notifications.models import Notification, NotificationType
@@ -170,11 +183,6 @@ def create_algorithm_jobs_for_evaluation(
             retries=retries,
         )
 
-    if Job.objects.active().count() >= settings.ALGORITHMS_MAX_ACTIVE_JOBS:
-        logger.info("Retrying task as too many jobs scheduled")
-        retry_with_delay()
-        raise TooManyJobsScheduled
-
     Evaluation = apps.get_model(  # noqa: N806
         app_label="evaluation", model_name="Evaluation"
     )
@@ -197,7 +205,7 @@ def create_algorithm_jobs_for_evaluation(
     if max_jobs is None:
         # Once the algorithm has been run, score the submission. No emails as
         # algorithm editors should not have access to the underlying images.
-        task_on_success = set_evaluation_inputs.signature(
+        task_on_success = handle_successful_job.signature(
             kwargs={"evaluation_pk": str(evaluation.pk)}, immutable=True
         )
     else:
@@ -217,33 +225,36 @@ def create_algorithm_jobs_for_evaluation(
     evaluation.update_status(status=Evaluation.EXECUTING_PREREQUISITES)
 
     try:
-        # Method is expensive so only allow one process at a time
-        with cache.lock(
-            _cache_key_from_method(create_algorithm_jobs),
-            timeout=settings.CELERY_TASK_TIME_LIMIT,
-            blocking_timeout=10,
-        ):
-            jobs = create_algorithm_jobs(
-                algorithm_image=evaluation.submission.algorithm_image,
-                civ_sets=[
-                    {*ai.values.all()}
-                    for ai in evaluation.submission.phase.archive.items.prefetch_related(
-                        "values__interface"
-                    )
-                ],
-                extra_viewer_groups=challenge_admins,
-                extra_logs_viewer_groups=challenge_admins,
-                task_on_success=task_on_success,
-                task_on_failure=task_on_failure,
-                max_jobs=max_jobs,
-                time_limit=evaluation.submission.phase.algorithm_time_limit,
-            )
+        jobs = create_algorithm_jobs(
+            algorithm_image=evaluation.submission.algorithm_image,
+            civ_sets=[
+                {*ai.values.all()}
+                for ai in evaluation.submission.phase.archive.items.prefetch_related(
+                    "values__interface"
+                )
+            ],
+            extra_viewer_groups=challenge_admins,
+            extra_logs_viewer_groups=challenge_admins,
+            task_on_success=task_on_success,
+            task_on_failure=task_on_failure,
+            max_jobs=max_jobs,
+            time_limit=evaluation.submission.phase.algorithm_time_limit,
+            tenant=f"challenge-{evaluation.submission.phase.challenge_id}",
+        )
     except (TooManyJobsScheduled, LockError) as error:
         logger.info(f"Retrying task due to: {error}")
         retry_with_delay()
         raise
 
-    if not jobs:
+    if max_jobs is None:
+        # All of the jobs have now been created
+        outstanding_algorithm_jobs = _set_outstanding_algorithm_jobs(
+            evaluation=evaluation
+        )
+    else:
+        outstanding_algorithm_jobs = None
+
+    if not jobs or outstanding_algorithm_jobs == 0:
         # No more jobs created from this task, so everything must be
         # ready for evaluation, handles archives with only one item
         # and re-evaluation of existing submissions with new methods
@@ -253,6 +264,106 @@ def create_algorithm_jobs_for_evaluation(
         ).apply_async()
 
 
+@transaction.atomic
+def _set_outstanding_algorithm_jobs(*, evaluation):
+    """Count the jobs that the evaluation waits for, returns the count"""
+    Job = apps.get_model(  # noqa: N806
+        app_label="algorithms", model_name="Job"
+    )
+    Evaluation = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="Evaluation"
+    )
+
+    # Only the jobs for the archive items of this phase are counted, the
+    # algorithm image could also be running jobs for other phases
+    inputs_hashes = _get_inputs_hashes(evaluation=evaluation)
+
+    # Counted in the update so that jobs cannot finish in between
+    Evaluation.objects.filter(pk=evaluation.pk).update(
+        outstanding_algorithm_jobs=Coalesce(
+            Subquery(
+                Job.objects.active()
+                .filter(
+                    algorithm_image=evaluation.submission.algorithm_image,
+                    creator__isnull=True,
+                    inputs_hash__in=inputs_hashes,
+                )
+                .order_by()
+                .values("algorithm_image")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+    return (
+        Evaluation.objects.filter(pk=evaluation.pk)
+        .values_list("outstanding_algorithm_jobs", flat=True)
+        .get()
+    )
+
+
+def _get_inputs_hashes(*, evaluation):
+    """The fingerprints of the inputs of the jobs that an evaluation needs"""
+    algorithm_input_pks = {
+        *evaluation.submission.phase.algorithm_inputs.values_list(
+            "pk", flat=True
+        )
+    }
+
+    inputs_hashes = set()
+
+    for item in evaluation.submission.phase.archive.items.prefetch_related(
+        "values"
+    ):
+        civ_pks = [
+            civ.pk
+            for civ in item.values.all()
+            if civ.interface_id in algorithm_input_pks
+        ]
+        if len(civ_pks) == len(algorithm_input_pks):
+            inputs_hashes.add(get_inputs_hash(civ_pks=civ_pks))
+
+    return inputs_hashes
+
+
+@shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
+def handle_successful_job(*, evaluation_pk):
+    """
+    Counts down the outstanding algorithm jobs of an evaluation
+
+    Once none are outstanding the inputs of the evaluation are set. Until
+    all of the jobs have been created there is nothing to count down, the
+    count is then set by create_algorithm_jobs_for_evaluation.
+    """
+    Evaluation = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="Evaluation"
+    )
+
+    with transaction.atomic():
+        updated = Evaluation.objects.filter(
+            pk=evaluation_pk, outstanding_algorithm_jobs__isnull=False
+        ).update(
+            outstanding_algorithm_jobs=F("outstanding_algorithm_jobs") - 1
+        )
+
+        if not updated:
+            logger.info("Nothing to do: the jobs are still being created.")
+            return
+
+        outstanding_algorithm_jobs = (
+            Evaluation.objects.filter(pk=evaluation_pk)
+            .values_list("outstanding_algorithm_jobs", flat=True)
+            .get()
+        )
+
+    if outstanding_algorithm_jobs <= 0:
+        set_evaluation_inputs.apply_async(
+            kwargs={"evaluation_pk": evaluation_pk}
+        )
+
+
 @shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
 @transaction.atomic
 def handle_failed_jobs(*, evaluation_pk):
@@ -303,19 +414,6 @@ def set_evaluation_inputs(*, evaluation_pk):
         app_label="evaluation", model_name="Evaluation"
     )
 
-    has_pending_jobs = (
-        Job.objects.active()
-        .filter(
-            algorithm_image__submission__evaluation=evaluation_pk,
-            creator__isnull=True,  # Evaluation inference jobs have no creator
-        )
-        .exists()
-    )
-
-    if has_pending_jobs:
-        logger.info("Nothing to do: the algorithm has pending jobs.")
-        return
-
     evaluation_queryset = Evaluation.objects.filter(
         pk=evaluation_pk
     ).select_for_update()
@@ -330,71 +428,99 @@ def set_evaluation_inputs(*, evaluation_pk):
             )
             return
 
-        algorithm_inputs = {
-            *evaluation.submission.phase.algorithm_inputs.all()
-        }
+        algorithm_image = evaluation.submission.algorithm_image
+
+        # The jobs are found by the fingerprint of their inputs
+        inputs_hashes = [*_get_inputs_hashes(evaluation=evaluation)]
 
-        civ_sets = {
-            i.values.all()
-            for i in evaluation.submission.phase.archive.items.annotate(
-                interface_match_count=Count(
-                    "values", filter=Q(values__interface__in=algorithm_inputs)
+        _backfill_inputs_hashes(algorithm_image=algorithm_image)
+
+        for idx in range(0, len(inputs_hashes), 1000):
+            if (
+                Job.objects.active()
+                .filter(
+                    algorithm_image=algorithm_image,
+                    # Evaluation inference jobs have no creator
+                    creator__isnull=True,
+                    inputs_hash__in=inputs_hashes[idx : idx + 1000],
                 )
+                .exists()
+            ):
+                logger.info("Nothing to do: the algorithm has pending jobs.")
+                return
+
+        job_pks = {}
+        for idx in range(0, len(inputs_hashes), 1000):
+            for job_pk, inputs_hash in Job.objects.filter(
+                algorithm_image=algorithm_image,
+                status=Job.SUCCESS,
+                inputs_hash__in=inputs_hashes[idx : idx + 1000],
+            ).values_list("pk", "inputs_hash"):
+                job_pks.setdefault(inputs_hash, job_pk)
+
+        if len(job_pks) != len(inputs_hashes):
+            logger.info("Nothing to do: not all of the jobs were successful.")
+            return
+
+        job_pks = [*job_pks.values()]
+
+        predictions = _create_predictions_file(job_pks=job_pks)
+
+        output_to_job = {}
+        for idx in range(0, len(job_pks), 1000):
+            output_to_job.update(
+                ComponentInterfaceValue.objects.filter(
+                    algorithms_jobs_as_output__in=job_pks[idx : idx + 1000]
+                ).values_list("pk", "algorithms_jobs_as_output")
             )
-            .filter(interface_match_count=len(algorithm_inputs))
-            .prefetch_related("values")
+
+        evaluation.inputs.set([predictions.pk, *output_to_job.keys()])
+        evaluation.input_prefixes = {
+            str(o): f"{j}/output/" for o, j in output_to_job.items()
         }
+        evaluation.status = Evaluation.PENDING
+        evaluation.save()
 
-        successful_jobs = (
-            Job.objects.filter(
-                algorithm_image=evaluation.submission.algorithm_image,
-                status=Job.SUCCESS,
-            )
-            .annotate(
-                inputs_match_count=Count(
-                    "inputs",
-                    filter=Q(
-                        inputs__in={
-                            civ for civ_set in civ_sets for civ in civ_set
-                        }
-                    ),
-                )
-            )
-            .filter(
-                inputs_match_count=evaluation.submission.phase.algorithm_inputs.count()
-            )
-            .distinct()
-            .prefetch_related("outputs__interface", "inputs__interface")
-            .select_related("algorithm_image__algorithm")
-        )
+        on_commit(evaluation.execute)
 
-        if successful_jobs.count() == len(civ_sets):
-            from grandchallenge.algorithms.serializers import JobSerializer
-            from grandchallenge.components.models import (
-                ComponentInterface,
-                ComponentInterfaceValue,
-            )
 
-            serializer = JobSerializer(successful_jobs.all(), many=True)
-            interface = ComponentInterface.objects.get(
-                slug="predictions-json-file"
-            )
-            civ = ComponentInterfaceValue.objects.create(
-                interface=interface, value=serializer.data
+def _create_predictions_file(*, job_pks):
+    """
+    Writes the serialized jobs to a new predictions-json-file value
+
+    The jobs are serialized in batches and the document is streamed to
+    storage through a temporary file, rather than built in memory.
+    """
+    from grandchallenge.algorithms.serializers import JobSerializer
+
+    Job = apps.get_model(  # noqa: N806
+        app_label="algorithms", model_name="Job"
+    )
+
+    interface = ComponentInterface.objects.get(slug="predictions-json-file")
+    civ = ComponentInterfaceValue.objects.create(interface=interface)
+
+    with TemporaryFile() as f:
+        f.write(b"[")
+
+        for idx in range(0, len(job_pks), 100):
+            jobs = (
+                Job.objects.filter(pk__in=job_pks[idx : idx + 100])
+                .prefetch_related("outputs__interface", "inputs__interface")
+                .select_related("algorithm_image__algorithm")
             )
 
-            output_to_job = {
-                o: j for j in successful_jobs.all() for o in j.outputs.all()
-            }
+            for job in JobSerializer(jobs, many=True).data:
+                if f.tell() > 1:
+                    f.write(b",")
+                f.write(json.dumps(job, cls=JSONEncoder).encode("utf-8"))
+
+        f.write(b"]")
+        f.seek(0)
 
-            evaluation.inputs.set([civ, *output_to_job.keys()])
-            evaluation.input_prefixes = {
-                str(o.pk): f"{j.pk}/output/" for o, j in output_to_job.items()
-            }
-            evaluation.status = Evaluation.PENDING
-            evaluation.save()
+        civ.file.save(Path(interface.relative_path).name, File(f))
 
-            on_commit(evaluation.execute)
+    return civ
 
 
 def filter_by_creators_most_recent(*, evaluations):
@@ -444,7 +570,8 @@ def calculate_ranks(*, phase_pk: uuid.UUID):
         app_label="evaluation", model_name="Evaluation"
     )
 
-    phase = Phase.objects.get(pk=phase_pk)
+    # Locked so that the positions are calculated for one state at a time
+    phase = Phase.objects.select_for_update().get(pk=phase_pk)
     display_choice = phase.result_display_choice
     score_method_choice = phase.scoring_method_choice
 
@@ -462,12 +589,12 @@ def calculate_ranks(*, phase_pk: uuid.UUID):
     if score_method_choice == phase.ABSOLUTE:
 
         def score_method(x):
-            return list(x)[0]
+            return x[:, 0]
 
     elif score_method_choice == phase.MEAN:
-        score_method = mean
+        score_method = partial(np.mean, axis=1)
     elif score_method_choice == phase.MEDIAN:
-        score_method = median
+        score_method = partial(np.median, axis=1)
     else:
         raise NotImplementedError
 
@@ -477,7 +604,13 @@ def calculate_ranks(*, phase_pk: uuid.UUID):
         )
         .order_by("-created")
         .select_related("submission__creator")
-        .prefetch_related("outputs__interface")
+    )
+
+    metric_values = get_metric_values(
+        values=_get_evaluation_metrics(
+            evaluations=valid_evaluations, paths=phase.metric_paths
+        ),
+        metrics=metrics,
     )
 
     if display_choice == phase.MOST_RECENT:
@@ -486,35 +619,138 @@ def calculate_ranks(*, phase_pk: uuid.UUID):
         )
     elif display_choice == phase.BEST:
         all_positions = rank_results(
-            evaluations=valid_evaluations,
-            metrics=metrics,
-            score_method=score_method,
+            metric_values=metric_values, score_method=score_method
         )
         valid_evaluations = filter_by_creators_best(
             evaluations=valid_evaluations, ranks=all_positions.ranks
         )
 
     final_positions = rank_results(
-        evaluations=valid_evaluations,
-        metrics=metrics,
+        metric_values=metric_values.filter(
+            pks={e.pk for e in valid_evaluations}
+        ),
         score_method=score_method,
     )
 
-    evaluations = Evaluation.objects.filter(submission__phase=phase)
+    evaluations = Evaluation.objects.filter(submission__phase=phase).only(
+        "pk", "rank", "rank_score", "rank_per_metric"
+    )
 
-    _update_evaluations(
+    changed_evaluations = _update_evaluations(
         evaluations=evaluations, final_positions=final_positions
     )
 
+    if changed_evaluations:
+        _update_leaderboard_snapshot(
+            phase=phase,
+            final_positions=final_positions,
+            changed_evaluations=changed_evaluations,
+        )
+
     for leaderboard in phase.combinedleaderboard_set.all():
         leaderboard.schedule_combined_ranks_update()
 
 
+def _get_evaluation_metrics(*, evaluations, paths):
+    """
+    Get the (evaluation pk, path, value) of the metrics of the evaluations
+
+    Metrics that have not been materialised yet, for instance when the
+    metric paths of the phase have changed, are extracted and stored.
+    """
+    EvaluationMetric = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="EvaluationMetric"
+    )
+
+    values = list(
+        EvaluationMetric.objects.filter(
+            evaluation__in=evaluations, path__in=paths
+        ).values_list("evaluation_id", "path", "value", "other_value")
+    )
+
+    stored = {(pk, path) for pk, path, *_ in values}
+    missing = {
+        e.pk
+        for e in evaluations
+        for path in paths
+        if (e.pk, path) not in stored
+    }
+
+    if missing:
+        values.extend(
+            (m.evaluation_id, m.path, m.value, m.other_value)
+            for m in update_evaluation_metrics(
+                evaluation_pks=missing, paths=paths
+            )
+            if (m.evaluation_id, m.path) not in stored
+        )
+
+    return [
+        (pk, path, other_value if value is None else value)
+        for pk, path, value, other_value in values
+    ]
+
+
+def update_evaluation_metrics(*, evaluation_pks, paths):
+    """Extract the metrics of the evaluations and store them"""
+    EvaluationMetric = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="EvaluationMetric"
+    )
+
+    metrics_json = dict(
+        ComponentInterfaceValue.objects.filter(
+            evaluation_evaluations_as_output__in=evaluation_pks,
+            interface__slug="metrics-json-file",
+        ).values_list("evaluation_evaluations_as_output", "value")
+    )
+
+    metrics = []
+
+    for pk in evaluation_pks:
+        for path in paths:
+            value = get_jsonpath(metrics_json.get(pk), path)
+
+            if value in ["", None]:
+                value = other_value = None
+            elif isinstance(value, int | float):
+                other_value = None
+            else:
+                value, other_value = None, value
+
+            metrics.append(
+                EvaluationMetric(
+                    evaluation_id=pk,
+                    path=path,
+                    value=value,
+                    other_value=other_value,
+                )
+            )
+
+    EvaluationMetric.objects.bulk_create(
+        metrics,
+        update_conflicts=True,
+        unique_fields=["evaluation", "path"],
+        update_fields=["value", "other_value"],
+        batch_size=1000,
+    )
+
+    return metrics
+
+
 def _update_evaluations(*, evaluations, final_positions):
+    """
+    Update the positions of the evaluations
+
+    Only the evaluations whose position has changed are written, so
+    adding a single result to a leaderboard only updates the rows
+    that were moved by it.
+    """
     Evaluation = apps.get_model(  # noqa: N806
         app_label="evaluation", model_name="Evaluation"
     )
 
+    changed_evaluations = []
+
     for e in evaluations:
         try:
             rank = final_positions.ranks[e.pk]
@@ -526,12 +762,75 @@ def _update_evaluations(*, evaluations, final_positions):
             rank_score = 0.0
             rank_per_metric = {}
 
-        e.rank = rank
-        e.rank_score = rank_score
-        e.rank_per_metric = rank_per_metric
+        if (e.rank, e.rank_score, e.rank_per_metric) != (
+            rank,
+            rank_score,
+            rank_per_metric,
+        ):
+            e.rank = rank
+            e.rank_score = rank_score
+            e.rank_per_metric = rank_per_metric
+            changed_evaluations.append(e)
 
     Evaluation.objects.bulk_update(
-        evaluations, ["rank", "rank_score", "rank_per_metric"]
+        changed_evaluations,
+        ["rank", "rank_score", "rank_per_metric"],
+        batch_size=1000,
+    )
+
+    return changed_evaluations
+
+
+def _update_leaderboard_snapshot(
+    *, phase, final_positions, changed_evaluations
+):
+    """
+    Store the positions of the leaderboard for today
+
+    The snapshot of today holds the positions that are stored on the
+    evaluations, so once it exists only the positions of the changed
+    evaluations are written.
+    """
+    LeaderboardSnapshot = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="LeaderboardSnapshot"
+    )
+    LeaderboardSnapshotPosition = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="LeaderboardSnapshotPosition"
+    )
+
+    snapshot = LeaderboardSnapshot.objects.filter(
+        phase=phase, date=localdate()
+    ).first()
+
+    if snapshot is None:
+        # The phase is locked, so this cannot be created concurrently
+        snapshot = LeaderboardSnapshot.objects.create(
+            phase=phase, date=localdate()
+        )
+        evaluation_pks = final_positions.ranks.keys()
+    else:
+        evaluation_pks = {e.pk for e in changed_evaluations}
+        removed_pks = evaluation_pks - final_positions.ranks.keys()
+
+        if removed_pks:
+            snapshot.positions.filter(evaluation_id__in=removed_pks).delete()
+
+    LeaderboardSnapshotPosition.objects.bulk_create(
+        [
+            LeaderboardSnapshotPosition(
+                snapshot=snapshot,
+                evaluation_id=pk,
+                rank=final_positions.ranks[pk],
+                rank_score=final_positions.rank_scores[pk],
+                rank_per_metric=final_positions.rank_per_metric[pk],
+            )
+            for pk in evaluation_pks
+            if pk in final_positions.ranks
+        ],
+        update_conflicts=True,
+        unique_fields=["snapshot", "evaluation"],
+        update_fields=["rank", "rank_score", "rank_per_metric"],
+        batch_size=1000,
     )
 
 
@@ -3,19 +3,35 @@ from collections import OrderedDict
 from collections.abc import Callable, Iterable
 from typing import NamedTuple
 
+import numpy as np
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from django.db import models
 
-from grandchallenge.evaluation.templatetags.evaluation_extras import (
-    get_jsonpath,
-)
-
 
 class Metric(NamedTuple):
     path: str
     reverse: bool
 
 
+class MetricValues(NamedTuple):
+    pks: tuple
+    columns: tuple[np.ndarray, ...]
+    metrics: tuple[Metric, ...]
+
+    def filter(self, *, pks: Iterable) -> "MetricValues":
+        """Restrict the values to the results with the given pks."""
+        pks = set(pks)
+        mask = np.array([pk in pks for pk in self.pks], dtype=bool)
+
+        return MetricValues(
+            pks=tuple(
+                pk for pk, keep in zip(self.pks, mask, strict=True) if keep
+            ),
+            columns=tuple(column[mask] for column in self.columns),
+            metrics=self.metrics,
+        )
+
+
 class Positions(NamedTuple):
     ranks: dict[str, float]
     rank_scores: dict[str, float]
@@ -32,92 +48,108 @@ def get(inputs):
         raise MultipleObjectsReturned
 
 
-def rank_results(
-    *, evaluations: tuple, metrics: tuple[Metric, ...], score_method: Callable
-) -> Positions:
-    """Determine the overall rank for each result."""
-    evaluations = _filter_valid_results(
-        evaluations=evaluations, metrics=metrics
-    )
+def get_metric_values(
+    *, values: Iterable[tuple], metrics: tuple[Metric, ...]
+) -> MetricValues:
+    """
+    Collect the metric values into one column per metric
 
-    rank_per_metric = _get_rank_per_metric(
-        evaluations=evaluations, metrics=metrics
+    Takes an iterable of (evaluation pk, metric path, value) tuples,
+    evaluations that are missing any of the metrics are excluded.
+    """
+    path_indices = {}
+    for idx, metric in enumerate(metrics):
+        path_indices.setdefault(metric.path, []).append(idx)
+
+    rows = {}
+    for pk, path, value in values:
+        if value is None or path not in path_indices:
+            continue
+
+        row = rows.setdefault(pk, [None] * len(metrics))
+        for idx in path_indices[path]:
+            row[idx] = value
+
+    rows = {pk: row for pk, row in rows.items() if None not in row}
+
+    return MetricValues(
+        pks=tuple(rows.keys()),
+        columns=tuple(
+            _to_column(values=[row[idx] for row in rows.values()])
+            for idx in range(len(metrics))
+        ),
+        metrics=metrics,
     )
 
-    rank_scores = {
-        pk: score_method([m for m in metrics.values()])
-        for pk, metrics in rank_per_metric.items()
-    }
 
-    return Positions(
-        ranks=_scores_to_ranks(scores=rank_scores, reverse=False),
-        rank_scores=rank_scores,
-        rank_per_metric=rank_per_metric,
+def _to_column(*, values: list) -> np.ndarray:
+    if all(isinstance(value, int | float) for value in values):
+        return np.array(values, dtype=np.float64)
+    else:
+        # Non-numeric metrics cannot be vectorised, they are ranked
+        # with the comparison operators of the original objects
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+
+
+def rank_results(
+    *, metric_values: MetricValues, score_method: Callable
+) -> Positions:
+    """
+    Determine the overall rank for each result.
+
+    The score method receives a 2D array of the rank of each result (rows)
+    for each metric (columns) and must return the score for each row.
+    """
+    if not metric_values.pks:
+        return Positions(ranks={}, rank_scores={}, rank_per_metric={})
+
+    rank_per_metric = np.column_stack(
+        [
+            _rank_column(values=column, reverse=metric.reverse)
+            for column, metric in zip(
+                metric_values.columns, metric_values.metrics, strict=True
+            )
+        ]
     )
 
+    rank_scores = np.asarray(score_method(rank_per_metric), dtype=np.float64)
+    ranks = _rank_column(values=rank_scores, reverse=False)
 
-def _filter_valid_results(
-    *, evaluations: Iterable, metrics: tuple[Metric, ...]
-) -> list:
-    """Ensure that all of the metrics are in every result."""
-    return [
-        e
-        for e in evaluations
-        if all(
-            get_jsonpath(
-                get(
-                    [
-                        o.value
-                        for o in e.outputs.all()
-                        if o.interface.slug == "metrics-json-file"
-                    ]
-                ),
-                m.path,
+    metric_paths = [m.path for m in metric_values.metrics]
+
+    return Positions(
+        ranks=dict(zip(metric_values.pks, ranks.tolist(), strict=True)),
+        rank_scores=dict(
+            zip(metric_values.pks, rank_scores.tolist(), strict=True)
+        ),
+        rank_per_metric={
+            pk: dict(zip(metric_paths, row, strict=True))
+            for pk, row in zip(
+                metric_values.pks, rank_per_metric.tolist(), strict=True
             )
-            not in ["", None]
-            for m in metrics
-        )
-    ]
+        },
+    )
 
 
-def _get_rank_per_metric(
-    *, evaluations: Iterable, metrics: tuple[Metric, ...]
-) -> dict[str, dict[str, float]]:
+def _rank_column(*, values: np.ndarray, reverse: bool) -> np.ndarray:
     """
-    Takes results and calculates the rank for each of the individual metrics
+    Go from scores to ranks, tied scores share the lowest rank.
 
-    Returns a dictionary where the key is the pk of the result, and the
-    values is another dictionary where the key is the path of the metric and
-    the value is the rank of this result for this metric
+    The rank of a score is one more than the number of scores that
+    are strictly better than it.
     """
-    metric_rank = {}
-    for metric in metrics:
-        # Extract the value of the metric for this primary key and sort on the
-        # value of the metric
-        metric_scores = {
-            e.pk: get_jsonpath(
-                get(
-                    [
-                        o.value
-                        for o in e.outputs.all()
-                        if o.interface.slug == "metrics-json-file"
-                    ]
-                ),
-                metric.path,
-            )
-            for e in evaluations
-        }
-        metric_rank[metric.path] = _scores_to_ranks(
-            scores=metric_scores, reverse=metric.reverse
+    if values.dtype == object:
+        ranks = _scores_to_ranks(
+            scores=dict(enumerate(values)), reverse=reverse
         )
+        return np.array([ranks[idx] for idx in range(len(values))])
+
+    if reverse:
+        values = -values
 
-    return {
-        e.pk: {
-            metric_path: ranks[e.pk]
-            for metric_path, ranks in metric_rank.items()
-        }
-        for e in evaluations
-    }
+    return np.searchsorted(np.sort(values), values, side="left") + 1
 
 
 def _scores_to_ranks(
@@ -1,11 +1,11 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
+from django.db.models import F, OuterRef, Q, Subquery
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.functional import cached_property
@@ -44,6 +44,7 @@ from grandchallenge.evaluation.forms import (
 from grandchallenge.evaluation.models import (
     CombinedLeaderboard,
     Evaluation,
+    EvaluationMetric,
     Method,
     Phase,
     Submission,
@@ -554,7 +555,7 @@ class EvaluationDetail(ObjectPermissionRequiredMixin, DetailView):
         try:
             predictions = self.object.inputs.get(
                 interface__slug="predictions-json-file"
-            ).value
+            )
         except ObjectDoesNotExist:
             predictions = None
 
@@ -655,7 +656,9 @@ class LeaderboardDetail(TeamContextMixin, PaginatedTableListView):
         columns.extend(
             [
                 Column(
-                    title="Current #" if "date" in self.request.GET else "#",
+                    title="Current #"
+                    if self.leaderboard_date and not self.snapshot
+                    else "#",
                     sort_field="rank",
                 ),
                 Column(
@@ -697,13 +700,13 @@ class LeaderboardDetail(TeamContextMixin, PaginatedTableListView):
                 )
             )
 
-        for c in self.phase.extra_results_columns:
+        for idx, c in enumerate(self.phase.extra_results_columns):
             columns.append(
                 Column(
                     title=c["title"]
                     if self.phase.scoring_method_choice == self.phase.ABSOLUTE
                     else f"{c['title']} (Position)",
-                    sort_field="rank",
+                    sort_field=f"extra_result_{idx}",
                     classes=("toggleable",),
                 )
             )
@@ -757,7 +760,15 @@ class LeaderboardDetail(TeamContextMixin, PaginatedTableListView):
                 submission__phase=self.phase,
                 published=True,
                 status=Evaluation.SUCCESS,
-                rank__gt=0,
+            )
+            .annotate(
+                **{
+                    f"extra_result_{idx}": self._get_metric_sort_value(
+                        path=c["path"],
+                        reverse=c["order"] == self.phase.DESCENDING,
+                    )
+                    for idx, c in enumerate(self.phase.extra_results_columns)
+                }
             )
             .select_related(
                 "submission__creator__user_profile",
@@ -775,15 +786,83 @@ class LeaderboardDetail(TeamContextMixin, PaginatedTableListView):
             codename="view_evaluation",
         )
 
-    def filter_by_date(self, queryset):
+    @staticmethod
+    def _get_metric_sort_value(*, path, reverse):
+        """
+        Get the value of a metric from the materialised metrics
+
+        The sign is flipped for descending metrics so that,
+        like the positions, ascending order puts the best result first.
+        """
+        value = Subquery(
+            EvaluationMetric.objects.filter(
+                evaluation=OuterRef("pk"), path=path
+            ).values("value")[:1]
+        )
+        return value * -1 if reverse else value
+
+    @cached_property
+    def leaderboard_date(self):
         if "date" in self.request.GET:
             year, month, day = self.request.GET["date"].split("-")
-            before = datetime(
-                year=int(year), month=int(month), day=int(day)
+            return date(year=int(year), month=int(month), day=int(day))
+        else:
+            return None
+
+    @cached_property
+    def snapshot(self):
+        """The most recent snapshot of the leaderboard at the chosen date"""
+        if self.leaderboard_date is None:
+            return None
+        else:
+            return (
+                self.phase.leaderboard_snapshots.filter(
+                    date__lte=self.leaderboard_date
+                )
+                .order_by("-date")
+                .first()
+            )
+
+    def filter_by_date(self, queryset):
+        if self.snapshot:
+            return queryset.filter(
+                leaderboard_snapshot_positions__snapshot=self.snapshot
+            ).annotate(
+                snapshot_rank=F("leaderboard_snapshot_positions__rank"),
+                snapshot_rank_score=F(
+                    "leaderboard_snapshot_positions__rank_score"
+                ),
+                snapshot_rank_per_metric=F(
+                    "leaderboard_snapshot_positions__rank_per_metric"
+                ),
+            )
+        elif self.leaderboard_date:
+            # No snapshot available, so show the current positions of
+            # the evaluations that existed at the chosen date
+            before = datetime.combine(
+                self.leaderboard_date, datetime.min.time()
             ) + relativedelta(days=1)
-            return queryset.filter(submission__created__lt=before)
+            return queryset.filter(rank__gt=0, submission__created__lt=before)
         else:
-            return queryset
+            return queryset.filter(rank__gt=0)
+
+    def filter_queryset(self, queryset, search, order_by):
+        if self.snapshot and order_by.lstrip("-") == "rank":
+            # The positions are those of the snapshot
+            order_by = order_by.replace("rank", "snapshot_rank")
+
+        return super().filter_queryset(queryset, search, order_by)
+
+    def render_rows(self, *, object_list):
+        if self.snapshot:
+            for evaluation in object_list:
+                evaluation.rank = evaluation.snapshot_rank
+                evaluation.rank_score = evaluation.snapshot_rank_score
+                evaluation.rank_per_metric = (
+                    evaluation.snapshot_rank_per_metric
+                )
+
+        return super().render_rows(object_list=object_list)
 
 
 class EvaluationUpdate(
@@ -0,0 +1,97 @@
+# Generated by Django 4.1.10 on 2026-10-18 14:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def create_display_set_answer_counts(apps, schema_editor):
+    Answer = apps.get_model("reader_studies", "Answer")  # noqa: N806
+    DisplaySetAnswerCount = apps.get_model(  # noqa: N806
+        "reader_studies", "DisplaySetAnswerCount"
+    )
+
+    counts = (
+        Answer.objects.filter(is_ground_truth=False, display_set__isnull=False)
+        .values("creator_id", "display_set_id", "display_set__reader_study_id")
+        .annotate(answer_count=Count("pk"))
+        .order_by()
+    )
+
+    DisplaySetAnswerCount.objects.bulk_create(
+        (
+            DisplaySetAnswerCount(
+                reader_id=count["creator_id"],
+                display_set_id=count["display_set_id"],
+                reader_study_id=count["display_set__reader_study_id"],
+                answer_count=count["answer_count"],
+            )
+            for count in counts.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("reader_studies", "0047_optionalhangingprotocolreaderstudy_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DisplaySetAnswerCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("answer_count", models.PositiveIntegerField(default=0)),
+                (
+                    "display_set",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answer_counts",
+                        to="reader_studies.displayset",
+                    ),
+                ),
+                (
+                    "reader",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "reader_study",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="reader_studies.readerstudy",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("reader", "display_set")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="displaysetanswercount",
+            index=models.Index(
+                fields=["reader_study", "reader", "answer_count"],
+                name="reader_stud_reader__a9c9ae_idx",
+            ),
+        ),
+        migrations.RunPython(
+            create_display_set_answer_counts,
+            migrations.RunPython.noop,
+            elidable=True,
+        ),
+    ]
@@ -1,9 +1,11 @@
 import json
+from collections import Counter
+from functools import cache
 
 from actstream.models import Follow
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
+from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import (
@@ -14,7 +16,8 @@ from django.core.validators import (
     RegexValidator,
 )
 from django.db import models
-from django.db.models import Avg, Count, Q, Sum
+from django.db.models import Avg, Count, F, Q, Sum
+from django.db.models.functions import Greatest
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from django.utils.functional import cached_property
@@ -23,6 +26,7 @@ from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
 from guardian.shortcuts import assign_perm, remove_perm
 from referencing.exceptions import Unresolvable
 from simple_history.models import HistoricalRecords
+from simple_history.utils import bulk_create_with_history
 from stdimage import JPEGField
 
 from grandchallenge.anatomy.models import BodyStructure
@@ -593,41 +597,57 @@ class ReaderStudy(UUIDModel, TitleSlugDescriptionModel, ViewContentMixin):
 
     def get_progress_for_user(self, user):
         """Returns the percentage of completed hangings and questions for ``user``."""
-        if self.display_sets.count() == 0:
-            return {"questions": 0.0, "hangings": 0.0, "diff": 0.0}
+        return self.get_progress_for_users(users=[user])[user.pk]
 
+    def get_progress_for_users(self, *, users):
+        """
+        Returns the percentage of completed hangings and questions for each
+        of ``users``, keyed by their primary key.
+        """
         n_display_sets = self.display_sets.count()
         expected = n_display_sets * self.answerable_question_count
 
-        answers = Answer.objects.filter(
-            question__in=self.answerable_questions,
-            creator_id=user.id,
-            is_ground_truth=False,
-        ).distinct()
-        answer_count = answers.count()
-
-        if expected == 0 or answer_count == 0:
-            return {"questions": 0.0, "hangings": 0.0, "diff": 0.0}
-
-        completed_hangings = (
-            self.display_sets.annotate(
-                answers_for_user=Count(
-                    "answers",
-                    filter=Q(
-                        answers__creator=user,
-                        answers__is_ground_truth=False,
-                    ),
-                )
-            ).filter(answers_for_user=self.answerable_question_count)
-        ).count()
-        questions = answer_count / expected * 100
-        hangings = completed_hangings / n_display_sets * 100
-        return {
-            "questions": questions,
-            "hangings": hangings,
-            "diff": questions - hangings,
+        counts = {
+            row["reader_id"]: row
+            for row in DisplaySetAnswerCount.objects.filter(
+                reader_study=self, reader__in=[user.pk for user in users]
+            )
+            .values("reader_id")
+            .annotate(
+                answers=Sum("answer_count"),
+                completed_hangings=Count(
+                    "pk",
+                    filter=Q(answer_count__gte=self.answerable_question_count),
+                ),
+            )
+            .order_by()
         }
 
+        progress = {}
+
+        for user in users:
+            answer_count = counts.get(user.pk, {}).get("answers") or 0
+
+            if expected == 0 or answer_count == 0:
+                progress[user.pk] = {
+                    "questions": 0.0,
+                    "hangings": 0.0,
+                    "diff": 0.0,
+                }
+                continue
+
+            questions = answer_count / expected * 100
+            hangings = (
+                counts[user.pk]["completed_hangings"] / n_display_sets * 100
+            )
+            progress[user.pk] = {
+                "questions": questions,
+                "hangings": hangings,
+                "diff": questions - hangings,
+            }
+
+        return progress
+
     @cached_property
     def questions_with_ground__truth(self):
         return self.questions.annotate(
@@ -1124,6 +1144,16 @@ EMPTY_ANSWER_VALUES = {
 }
 
 
+@cache
+def _get_answer_validator(*, answer_type, allow_null):
+    allowed_types = [{"$ref": f"#/definitions/{answer_type}"}]
+
+    if allow_null:
+        allowed_types.append({"$ref": "#/definitions/null"})
+
+    return JSONValidator(schema={**ANSWER_TYPE_SCHEMA, "anyOf": allowed_types})
+
+
 class Question(UUIDModel, OverlaySegmentsMixin):
     AnswerType = AnswerType
 
@@ -1486,15 +1516,11 @@ class Question(UUIDModel, OverlaySegmentsMixin):
         if self.answer_type == Question.AnswerType.HEADING:  # Never valid
             return False
 
-        allowed_types = [{"$ref": f"#/definitions/{self.answer_type}"}]
-
-        if self.empty_answer_value is None:
-            allowed_types.append({"$ref": "#/definitions/null"})
-
         try:
             return (
-                JSONValidator(
-                    schema={**ANSWER_TYPE_SCHEMA, "anyOf": allowed_types}
+                _get_answer_validator(
+                    answer_type=self.answer_type,
+                    allow_null=self.empty_answer_value is None,
                 )(answer)
                 is None
             )
@@ -1559,6 +1585,80 @@ class CategoricalOption(models.Model):
         return f"{self.title} ({'' if self.default else 'not '}default)"
 
 
+class AnswerManager(models.Manager):
+    def bulk_create_answers(self, *, creator, answers):
+        """
+        Creates and scores many validated answers of a reader
+
+        The answers are dicts with the question, display_set, answer and
+        last_edit_duration. They are scored against the ground truth before
+        they are created, and their history and permissions are created in
+        bulk, so the post_save signals that would do this are not sent.
+        """
+        ground_truths = {
+            (gt.question_id, gt.display_set_id): gt.answer
+            for gt in self.filter(
+                is_ground_truth=True,
+                question__in={a["question"] for a in answers},
+                display_set__in={a["display_set"] for a in answers},
+            ).only("question_id", "display_set_id", "answer")
+        }
+
+        objs = []
+
+        for answer in answers:
+            obj = self.model(
+                creator=creator,
+                question=answer["question"],
+                display_set=answer["display_set"],
+                answer=answer["answer"],
+                last_edit_duration=answer.get("last_edit_duration"),
+                total_edit_duration=answer.get("last_edit_duration"),
+            )
+
+            key = (obj.question.pk, obj.display_set.pk)
+            if key in ground_truths:
+                obj.calculate_score(ground_truths[key])
+
+            objs.append(obj)
+
+        objs = bulk_create_with_history(objs, self.model, default_user=creator)
+
+        permissions = {
+            p.codename: p
+            for p in Permission.objects.filter(
+                codename__in=["view_answer", "change_answer", "delete_answer"],
+                content_type__app_label="reader_studies",
+            )
+        }
+        AnswerGroupObjectPermission.objects.bulk_create(
+            AnswerGroupObjectPermission(
+                permission=permissions[codename],
+                group=obj.question.reader_study.editors_group,
+                content_object=obj,
+            )
+            for obj in objs
+            for codename in ("view_answer", "delete_answer")
+        )
+        AnswerUserObjectPermission.objects.bulk_create(
+            AnswerUserObjectPermission(
+                permission=permissions[codename],
+                user=creator,
+                content_object=obj,
+            )
+            for obj in objs
+            for codename in ("view_answer", "change_answer")
+        )
+
+        counts = Counter(obj.display_set for obj in objs)
+        for display_set, count in counts.items():
+            DisplaySetAnswerCount.objects.add_answers(
+                reader_id=creator.pk, display_set=display_set, count=count
+            )
+
+        return objs
+
+
 class Answer(UUIDModel):
     """
     An ``Answer`` can be provided to a ``Question`` that is a part of a
@@ -1585,6 +1685,8 @@ class Answer(UUIDModel):
     last_edit_duration = models.DurationField(null=True)
     total_edit_duration = models.DurationField(null=True)
 
+    objects = AnswerManager()
+
     history = HistoricalRecords(
         excluded_fields=[
             "created",
@@ -1603,6 +1705,10 @@ class Answer(UUIDModel):
             ("creator", "display_set", "question", "is_ground_truth"),
         )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._display_set_id_orig = self.display_set_id
+
     def __str__(self):
         return f"{self.question.question_text} {self.answer} ({self.creator})"
 
@@ -1618,7 +1724,7 @@ class Answer(UUIDModel):
         return self.history.values_list("answer", "history_date")
 
     @staticmethod
-    def validate(  # noqa: C901
+    def validate(
         *,
         creator,
         question,
@@ -1628,21 +1734,9 @@ class Answer(UUIDModel):
         instance=None,
     ):
         """Validates all fields provided for ``answer``."""
-        if question.answer_type == Question.AnswerType.HEADING:
-            # Maintained for historical consistency
-            raise ValidationError("Headings are not answerable.")
-
-        if not question.is_answer_valid(answer=answer):
-            raise ValidationError(
-                f"Your answer is not the correct type. "
-                f"{question.get_answer_type_display()} expected, "
-                f"{type(answer)} found."
-            )
-
-        if display_set.reader_study != question.reader_study:
-            raise ValidationError(
-                f"Display set {display_set} does not belong to this reader study."
-            )
+        Answer._validate_answer_type(
+            question=question, answer=answer, display_set=display_set
+        )
 
         if not is_ground_truth:
             if (
@@ -1663,7 +1757,96 @@ class Answer(UUIDModel):
         if not creator.has_perm("read_readerstudy", question.reader_study):
             raise ValidationError("This user is not a reader for this study.")
 
-        valid_options = question.options.values_list("id", flat=True)
+        Answer._validate_answer_value(
+            question=question,
+            answer=answer,
+            valid_options=question.options.values_list("id", flat=True),
+        )
+
+    @staticmethod
+    def validate_many(*, creator, answers):
+        """
+        Validates many non ground truth answers of a reader
+
+        Does the same as validate for each of the answers, which are dicts
+        with the question, display_set and answer. The options of the
+        questions must be prefetched, so that the answers are validated
+        with a fixed number of queries.
+        """
+        existing = {
+            *Answer.objects.filter(
+                creator=creator,
+                is_ground_truth=False,
+                question__in={a["question"] for a in answers},
+                display_set__in={a["display_set"] for a in answers},
+            ).values_list("question_id", "display_set_id")
+        }
+        is_reader = {}
+        errors = []
+
+        for idx, answer in enumerate(answers):
+            question = answer["question"]
+            display_set = answer["display_set"]
+
+            if question.reader_study_id not in is_reader:
+                is_reader[question.reader_study_id] = creator.has_perm(
+                    "read_readerstudy", question.reader_study
+                )
+
+            try:
+                Answer._validate_answer_type(
+                    question=question,
+                    answer=answer["answer"],
+                    display_set=display_set,
+                )
+
+                if (question.pk, display_set.pk) in existing:
+                    raise ValidationError(
+                        f"User {creator} has already answered this question "
+                        f"for this display set."
+                    )
+
+                if not is_reader[question.reader_study_id]:
+                    raise ValidationError(
+                        "This user is not a reader for this study."
+                    )
+
+                Answer._validate_answer_value(
+                    question=question,
+                    answer=answer["answer"],
+                    valid_options=[o.pk for o in question.options.all()],
+                )
+            except ValidationError as error:
+                errors.extend(
+                    ValidationError(f"Answer {idx}: {message}")
+                    for message in error.messages
+                )
+
+            existing.add((question.pk, display_set.pk))
+
+        if errors:
+            raise ValidationError(errors)
+
+    @staticmethod
+    def _validate_answer_type(*, question, answer, display_set):
+        if question.answer_type == Question.AnswerType.HEADING:
+            # Maintained for historical consistency
+            raise ValidationError("Headings are not answerable.")
+
+        if not question.is_answer_valid(answer=answer):
+            raise ValidationError(
+                f"Your answer is not the correct type. "
+                f"{question.get_answer_type_display()} expected, "
+                f"{type(answer)} found."
+            )
+
+        if display_set.reader_study_id != question.reader_study_id:
+            raise ValidationError(
+                f"Display set {display_set} does not belong to this reader study."
+            )
+
+    @staticmethod
+    def _validate_answer_value(*, question, answer, valid_options):
         if question.answer_type == Question.AnswerType.CHOICE:
             if not question.required:
                 valid_options = (*valid_options, None)
@@ -1724,6 +1907,7 @@ class Answer(UUIDModel):
     def save(self, *args, **kwargs):
         adding = self._state.adding
         super().save(*args, **kwargs)
+        self._display_set_id_orig = self.display_set_id
 
         if adding:
             self.assign_permissions()
@@ -1752,6 +1936,60 @@ class AnswerGroupObjectPermission(GroupObjectPermissionBase):
     content_object = models.ForeignKey(Answer, on_delete=models.CASCADE)
 
 
+class DisplaySetAnswerCountManager(models.Manager):
+    def add_answers(self, *, reader_id, display_set, count=1):
+        obj, created = self.get_or_create(
+            reader_id=reader_id,
+            display_set=display_set,
+            defaults={
+                "reader_study_id": display_set.reader_study_id,
+                "answer_count": count,
+            },
+        )
+
+        if not created:
+            self.filter(pk=obj.pk).update(
+                answer_count=F("answer_count") + count
+            )
+
+    def remove_answers(self, *, reader_id, display_set_id, count=1):
+        # Clamped as the count is unsigned, a missed increment must not
+        # make the deletion of an answer fail
+        self.filter(reader_id=reader_id, display_set_id=display_set_id).update(
+            answer_count=Greatest(F("answer_count") - count, 0)
+        )
+
+
+class DisplaySetAnswerCount(models.Model):
+    """
+    The number of answers that a reader has given for a display set
+
+    Ground truth answers are not counted. The counts are kept up to date
+    when answers are created or deleted, so that the progress of the
+    readers can be read without counting their answers.
+    """
+
+    reader = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="+"
+    )
+    display_set = models.ForeignKey(
+        DisplaySet, on_delete=models.CASCADE, related_name="answer_counts"
+    )
+    # Denormalised from the display set for the progress queries
+    reader_study = models.ForeignKey(
+        ReaderStudy, on_delete=models.CASCADE, related_name="+"
+    )
+    answer_count = models.PositiveIntegerField(default=0)
+
+    objects = DisplaySetAnswerCountManager()
+
+    class Meta:
+        unique_together = (("reader", "display_set"),)
+        indexes = (
+            models.Index(fields=["reader_study", "reader", "answer_count"]),
+        )
+
+
 class ReaderStudyPermissionRequest(RequestBase):
     """
     When a user wants to read a reader study, editors have the option of
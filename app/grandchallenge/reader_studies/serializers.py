@@ -8,11 +8,14 @@ from rest_framework.fields import (
     JSONField,
     ReadOnlyField,
     URLField,
+    UUIDField,
 )
 from rest_framework.relations import HyperlinkedRelatedField, SlugRelatedField
 from rest_framework.serializers import (
     HyperlinkedModelSerializer,
+    ListSerializer,
     ModelSerializer,
+    Serializer,
     SerializerMethodField,
 )
 
@@ -272,3 +275,67 @@ class AnswerSerializer(HyperlinkedModelSerializer):
         swagger_schema_fields = {
             "properties": {"answer": {"title": "Answer", **ANSWER_TYPE_SCHEMA}}
         }
+
+
+class AnswerBulkListSerializer(ListSerializer):
+    def validate(self, attrs):
+        """Fetches the questions and display sets, then validates in bulk"""
+        user = self.context["request"].user
+
+        questions = (
+            Question.objects.filter(pk__in={a["question"] for a in attrs})
+            .select_related("reader_study__editors_group")
+            .prefetch_related("options")
+            .in_bulk()
+        )
+        display_sets = {
+            display_set.pk: display_set
+            for display_set in filter_by_permission(
+                queryset=DisplaySet.objects.filter(
+                    pk__in={a["display_set"] for a in attrs}
+                ),
+                user=user,
+                codename="view_displayset",
+            )
+        }
+
+        answers = []
+        errors = []
+
+        for idx, answer in enumerate(attrs):
+            if answer["question"] not in questions:
+                errors.append(f"Answer {idx}: Question not found.")
+            elif answer["display_set"] not in display_sets:
+                errors.append(f"Answer {idx}: Display set not found.")
+            else:
+                answers.append(
+                    {
+                        **answer,
+                        "question": questions[answer["question"]],
+                        "display_set": display_sets[answer["display_set"]],
+                    }
+                )
+
+        if errors:
+            raise DRFValidationError(errors)
+
+        Answer.validate_many(creator=user, answers=answers)
+
+        return answers
+
+
+class AnswerBulkSerializer(Serializer):
+    """
+    An answer of the current user that is created in bulk
+
+    The question and display set are given by their primary keys so that
+    they can be fetched for all of the answers at once.
+    """
+
+    question = UUIDField()
+    display_set = UUIDField()
+    answer = JSONField(allow_null=True)
+    last_edit_duration = DurationField(required=False, allow_null=True)
+
+    class Meta:
+        list_serializer_class = AnswerBulkListSerializer
@@ -1,11 +1,20 @@
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
 from django.db.transaction import on_commit
 from django.dispatch import receiver
 
 from grandchallenge.cases.models import Image
-from grandchallenge.reader_studies.models import Answer, DisplaySet
+from grandchallenge.reader_studies.models import (
+    Answer,
+    DisplaySet,
+    DisplaySetAnswerCount,
+)
 from grandchallenge.reader_studies.tasks import add_scores_for_display_set
 
 
@@ -113,3 +122,36 @@ def assign_score(sender, instance, created, update_fields=None, **kwargs):
             }
         )
     )
+
+
+@receiver(post_save, sender=Answer)
+def update_display_set_answer_counts(sender, instance, created, **_):
+    if instance.is_ground_truth:
+        return
+
+    previous_display_set_id = (
+        None if created else instance._display_set_id_orig
+    )
+
+    if previous_display_set_id == instance.display_set_id:
+        return
+
+    if previous_display_set_id:
+        DisplaySetAnswerCount.objects.remove_answers(
+            reader_id=instance.creator_id,
+            display_set_id=previous_display_set_id,
+        )
+
+    if instance.display_set_id:
+        DisplaySetAnswerCount.objects.add_answers(
+            reader_id=instance.creator_id, display_set=instance.display_set
+        )
+
+
+@receiver(post_delete, sender=Answer)
+def decrement_display_set_answer_count(sender, instance, **_):
+    if not instance.is_ground_truth and instance.display_set_id:
+        DisplaySetAnswerCount.objects.remove_answers(
+            reader_id=instance.creator_id,
+            display_set_id=instance.display_set_id,
+        )
@@ -2,6 +2,7 @@ from celery import shared_task
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Count
 
 from grandchallenge.cases.models import Image, RawImageUploadSession
 from grandchallenge.components.models import (
@@ -12,6 +13,7 @@ from grandchallenge.notifications.models import Notification, NotificationType
 from grandchallenge.reader_studies.models import (
     Answer,
     DisplaySet,
+    DisplaySetAnswerCount,
     ReaderStudy,
 )
 from grandchallenge.uploads.models import UserUpload
@@ -204,3 +206,68 @@ def copy_reader_study_display_sets(*, orig_pk, new_pk):
         for ds in orig.display_sets.all():
             new_ds = DisplaySet.objects.create(reader_study=new)
             new_ds.values.set(ds.values.all())
+
+
+@shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-2xlarge"])
+def reconcile_display_set_answer_counts():
+    """
+    Corrects the display set answer counts from the answers
+
+    The counts are updated as answers are created and deleted, this
+    catches changes that were missed, such as bulk updates of answers.
+    """
+    for reader_study_pk in ReaderStudy.objects.values_list(
+        "pk", flat=True
+    ).iterator():
+        _reconcile_display_set_answer_counts(reader_study_pk=reader_study_pk)
+
+
+@transaction.atomic
+def _reconcile_display_set_answer_counts(*, reader_study_pk):
+    existing = {
+        (count.reader_id, count.display_set_id): count
+        for count in DisplaySetAnswerCount.objects.select_for_update().filter(
+            reader_study_id=reader_study_pk
+        )
+    }
+    answer_counts = (
+        Answer.objects.filter(
+            is_ground_truth=False, display_set__reader_study_id=reader_study_pk
+        )
+        .values("creator_id", "display_set_id")
+        .annotate(answer_count=Count("pk"))
+        .order_by()
+    )
+
+    to_create = []
+    to_update = []
+
+    for answer_count in answer_counts:
+        count = existing.pop(
+            (answer_count["creator_id"], answer_count["display_set_id"]),
+            None,
+        )
+
+        if count is None:
+            to_create.append(
+                DisplaySetAnswerCount(
+                    reader_id=answer_count["creator_id"],
+                    display_set_id=answer_count["display_set_id"],
+                    reader_study_id=reader_study_pk,
+                    answer_count=answer_count["answer_count"],
+                )
+            )
+        elif count.answer_count != answer_count["answer_count"]:
+            count.answer_count = answer_count["answer_count"]
+            to_update.append(count)
+
+    # The remaining readers no longer have answers for these display sets
+    for count in existing.values():
+        if count.answer_count != 0:
+            count.answer_count = 0
+            to_update.append(count)
+
+    DisplaySetAnswerCount.objects.bulk_create(to_create)
+    DisplaySetAnswerCount.objects.bulk_update(
+        to_update, fields=["answer_count"]
+    )
@@ -2,6 +2,7 @@ import csv
 import json
 import uuid
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin.utils import NestedObjects
 from django.contrib.auth import get_user_model
@@ -14,7 +15,6 @@ from django.core.exceptions import (
     ValidationError,
 )
 from django.db import transaction
-from django.db.models import Count, Q
 from django.db.models.query import QuerySet
 from django.db.transaction import on_commit
 from django.forms import Form, Media
@@ -52,7 +52,7 @@ from drf_spectacular.utils import (
 from guardian.core import ObjectPermissionChecker
 from guardian.mixins import LoginRequiredMixin
 from guardian.shortcuts import get_perms
-from rest_framework import mixins
+from rest_framework import mixins, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.permissions import DjangoObjectPermissions
@@ -107,11 +107,13 @@ from grandchallenge.reader_studies.models import (
     Answer,
     CategoricalOption,
     DisplaySet,
+    DisplaySetAnswerCount,
     Question,
     ReaderStudy,
     ReaderStudyPermissionRequest,
 )
 from grandchallenge.reader_studies.serializers import (
+    AnswerBulkSerializer,
     AnswerSerializer,
     DisplaySetPostSerializer,
     DisplaySetSerializer,
@@ -790,16 +792,18 @@ class UsersProgress(
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        users = [
-            {
-                "obj": reader,
-                "progress": self.object.get_progress_for_user(reader),
-            }
-            for reader in get_user_model()
+        readers = (
+            get_user_model()
             .objects.filter(answer__question__reader_study=self.object)
             .distinct()
             .select_related("user_profile", "verification")
             .order_by("username")
+        )
+        progress = self.object.get_progress_for_users(users=readers)
+
+        users = [
+            {"obj": reader, "progress": progress[reader.pk]}
+            for reader in readers
         ]
 
         context.update(
@@ -1181,22 +1185,13 @@ class DisplaySetViewSet(
                     "Please provide a reader study when filtering for "
                     "unanswered display_sets."
                 )
-            answerable_question_count = reader_study.answerable_question_count
-            queryset = (
-                queryset.annotate(
-                    answer_count=Count(
-                        "answers",
-                        filter=Q(
-                            answers__is_ground_truth=False,
-                            answers__creator=user,
-                        ),
-                    )
-                )
-                .exclude(
-                    answer_count__gte=answerable_question_count,
-                )
-                .order_by("order", "created")
-            )
+            queryset = queryset.exclude(
+                pk__in=DisplaySetAnswerCount.objects.filter(
+                    reader_study=reader_study,
+                    reader=user,
+                    answer_count__gte=reader_study.answerable_question_count,
+                ).values("display_set_id")
+            ).order_by("order", "created")
             # Because the filtering has changed the list, we can no longer
             # reapply .order_by("?"), as the ordering would not be consistent
             # with the ordering of the full list. Instead, we use the
@@ -1289,6 +1284,38 @@ class AnswerViewSet(
 
         serializer.save(total_edit_duration=total_edit_duration)
 
+    @extend_schema(
+        request=AnswerBulkSerializer(many=True),
+        responses={201: AnswerSerializer(many=True)},
+    )
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        An endpoint that creates many answers of the current user at once
+
+        The answers are validated together and scored against the ground
+        truth straight away, so all of the answers for a display set, or for
+        many display sets, can be sent in one request.
+        """
+        serializer = AnswerBulkSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.READER_STUDY_BULK_ANSWERS_LIMIT,
+            context=self.get_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            answers = Answer.objects.bulk_create_answers(
+                creator=request.user, answers=serializer.validated_data
+            )
+
+        return Response(
+            self.get_serializer(answers, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False)
     def mine(self, request):
         """
@@ -0,0 +1,177 @@
+import logging
+from collections import defaultdict
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from redis.exceptions import LockError
+
+from grandchallenge.core.cache import _cache_key_from_method
+from grandchallenge.serving.models import Download
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_COUNT_KEY_PREFIX = "serving.download_count"
+
+
+def download_count_key(*, creator_pk, field, pk):
+    """The cache key where downloads of an object by a user are counted"""
+    return f"{DOWNLOAD_COUNT_KEY_PREFIX}.{creator_pk}.{field}.{pk}"
+
+
+def add_to_download_count(*, key, count=1):
+    """
+    Adds to a download count that is buffered in the cache
+
+    Incrementing a key keeps its expiry, so the expiry is refreshed to
+    stop the counts of busy objects expiring before they are flushed.
+    """
+    timeout = settings.DOWNLOAD_COUNTS_BUFFER_TIMEOUT
+
+    cache.add(key, 0, timeout=timeout)
+
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        # The key expired between adding and incrementing it
+        cache.set(key, count, timeout=timeout)
+    else:
+        cache.touch(key, timeout=timeout)
+
+
+def _parse_download_count_key(key):
+    creator_pk, field, pk = key[len(DOWNLOAD_COUNT_KEY_PREFIX) + 1 :].split(
+        ".", 2
+    )
+    return int(creator_pk), field, pk
+
+
+@shared_task
+def flush_download_counts():
+    """
+    Writes the download counts buffered in the cache to the database
+
+    Counts are taken from the cache before they are written, so at most the
+    downloads of one flush interval are lost if the worker dies in between.
+    """
+    try:
+        with cache.lock(
+            _cache_key_from_method(flush_download_counts),
+            timeout=settings.CELERY_TASK_SOFT_TIME_LIMIT,
+            blocking_timeout=1,
+        ):
+            _flush_download_counts()
+    except LockError as error:
+        logger.info(f"Download counts are already being flushed: {error}")
+
+
+def _flush_download_counts():
+    counts = {}
+
+    for key in cache.iter_keys(f"{DOWNLOAD_COUNT_KEY_PREFIX}.*"):
+        count = cache.get(key)
+        if count:
+            try:
+                # Decrement rather than delete so that concurrent
+                # increments are kept for the next flush
+                cache.decr(key, count)
+            except ValueError:
+                # The key expired after it was read, so the count that
+                # was read is the only copy
+                pass
+
+            counts[key] = count
+
+    try:
+        _update_downloads(counts=counts)
+    except Exception:
+        # Put the counts back so that they are written on the next flush
+        for key, count in counts.items():
+            add_to_download_count(key=key, count=count)
+        raise
+
+
+def _update_downloads(*, counts):
+    counts_per_field = defaultdict(dict)
+
+    for key, count in counts.items():
+        creator_pk, field, pk = _parse_download_count_key(key)
+        counts_per_field[field][(creator_pk, pk)] = count
+
+    with transaction.atomic():
+        for field, field_counts in counts_per_field.items():
+            _update_field_downloads(field=field, counts=field_counts)
+
+
+def _update_field_downloads(*, field, counts):
+    downloads = Download.objects.select_for_update().filter(
+        creator_id__in={creator_pk for creator_pk, _ in counts},
+        **{f"{field}_id__in": {pk for _, pk in counts}},
+    )
+
+    to_update = {}
+    for download in downloads:
+        key = (download.creator_id, str(getattr(download, f"{field}_id")))
+        if key in counts and key not in to_update:
+            download.count += counts[key]
+            to_update[key] = download
+
+    Download.objects.bulk_update(
+        to_update.values(), ["count"], batch_size=1000
+    )
+
+    to_create = _get_existing_targets(
+        field=field, keys={key for key in counts if key not in to_update}
+    )
+
+    Download.objects.bulk_create(
+        [
+            Download(
+                creator_id=creator_pk,
+                count=counts[(creator_pk, pk)],
+                **{f"{field}_id": pk},
+            )
+            for creator_pk, pk in to_create
+        ],
+        batch_size=1000,
+    )
+
+
+def _get_existing_targets(*, field, keys):
+    """
+    Filter the (creator, object) pairs to those that still exist
+
+    The objects or users could have been deleted since they were
+    downloaded, their counts are dropped as they cannot be written.
+    """
+    if not keys:
+        return set()
+
+    creator_pks = set(
+        Download._meta.get_field("creator")
+        .related_model.objects.filter(
+            pk__in={creator_pk for creator_pk, _ in keys}
+        )
+        .values_list("pk", flat=True)
+    )
+    pks = {
+        str(pk)
+        for pk in Download._meta.get_field(field)
+        .related_model.objects.filter(pk__in={pk for _, pk in keys})
+        .values_list("pk", flat=True)
+    }
+
+    existing = {
+        (creator_pk, pk)
+        for creator_pk, pk in keys
+        if creator_pk in creator_pks and pk in pks
+    }
+
+    if len(existing) != len(keys):
+        logger.info(
+            f"Dropped the download counts of {len(keys) - len(existing)} "
+            f"deleted {field}s or users"
+        )
+
+    return existing
@@ -2,7 +2,6 @@ import posixpath
 
 from django.conf import settings
 from django.core.exceptions import MultipleObjectsReturned, PermissionDenied
-from django.db.models import F
 from django.http import Http404, HttpResponseRedirect
 from django.utils._os import safe_join
 from guardian.utils import get_anonymous_user
@@ -12,10 +11,14 @@ from rest_framework.exceptions import AuthenticationFailed
 from grandchallenge.cases.models import Image
 from grandchallenge.challenges.models import ChallengeRequest
 from grandchallenge.components.models import ComponentInterfaceValue
+from grandchallenge.core.cache import cache_granted_perm, has_cached_perm
 from grandchallenge.core.guardian import get_objects_for_user
 from grandchallenge.core.storage import internal_protected_s3_storage
 from grandchallenge.evaluation.models import Submission
-from grandchallenge.serving.models import Download
+from grandchallenge.serving.tasks import (
+    add_to_download_count,
+    download_count_key,
+)
 from grandchallenge.workstations.models import Feedback
 
 
@@ -72,10 +75,15 @@ def _create_download(
             "creator and only one other foreign key must be set"
         )
 
-    n_updated = Download.objects.filter(**kwargs).update(count=F("count") + 1)
-
-    if n_updated == 0:
-        Download.objects.create(**kwargs)
+    # Counting is buffered in the cache and written to the database by
+    # flush_download_counts, so that downloads of the same object do not
+    # contend for the same row lock while it is being served
+    ((field, obj),) = (
+        (field, obj) for field, obj in kwargs.items() if field != "creator"
+    )
+    add_to_download_count(
+        key=download_count_key(creator_pk=creator.pk, field=field, pk=obj.pk)
+    )
 
 
 def serve_images(request, *, pk, path, pa="", pb=""):
@@ -85,17 +93,26 @@ def serve_images(request, *, pk, path, pa="", pb=""):
     path = posixpath.normpath(path).lstrip("/")
     name = safe_join(document_root, path)
 
-    try:
-        image = Image.objects.get(pk=pk)
-    except Image.DoesNotExist:
-        raise Http404("Image not found.")
-
     try:
         user, _ = TokenAuthentication().authenticate(request)
     except (AuthenticationFailed, TypeError):
         user = request.user
 
+    # Viewers request many files for each image, so only check the
+    # permissions in the database once
+    if has_cached_perm(user=user, perm="view_image", model=Image, pk=pk):
+        # The download is only counted by pk, so avoid fetching the image
+        return protected_storage_redirect(
+            name=name, creator=user, image=Image(pk=pk)
+        )
+
+    try:
+        image = Image.objects.get(pk=pk)
+    except Image.DoesNotExist:
+        raise Http404("Image not found.")
+
     if user.has_perm("view_image", image):
+        cache_granted_perm(user=user, perm="view_image", obj=image)
         return protected_storage_redirect(name=name, creator=user, image=image)
 
     raise PermissionDenied
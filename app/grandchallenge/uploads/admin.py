@@ -8,6 +8,7 @@ from grandchallenge.core.admin import (
 from grandchallenge.uploads.models import (
     UserUpload,
     UserUploadGroupObjectPermission,
+    UserUploadQuota,
     UserUploadUserObjectPermission,
 )
 
@@ -18,7 +19,15 @@ class UserUploadAdmin(GuardedModelAdmin):
     list_filter = ("status",)
     ordering = ("-created",)
     search_fields = ("pk", "creator__username", "filename", "s3_upload_id")
-    readonly_fields = ("creator", "status", "s3_upload_id")
+    readonly_fields = ("creator", "status", "s3_upload_id", "size_in_storage")
+
+
+@admin.register(UserUploadQuota)
+class UserUploadQuotaAdmin(admin.ModelAdmin):
+    list_display = ("user", "size_of_completed_uploads", "reconciled_at")
+    ordering = ("-size_of_completed_uploads",)
+    search_fields = ("user__username",)
+    readonly_fields = ("user", "size_of_completed_uploads", "reconciled_at")
 
 
 admin.site.register(UserUploadUserObjectPermission, UserObjectPermissionAdmin)
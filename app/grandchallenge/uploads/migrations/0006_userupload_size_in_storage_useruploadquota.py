@@ -0,0 +1,50 @@
+# Generated by Django 4.1.10 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        (
+            "uploads",
+            "0005_useruploadgroupobjectpermission_useruploaduserobjectpermission",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userupload",
+            name="size_in_storage",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="The size of the completed upload in bytes",
+            ),
+        ),
+        migrations.CreateModel(
+            name="UserUploadQuota",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="user_upload_quota",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "size_of_completed_uploads",
+                    models.BigIntegerField(default=0),
+                ),
+                (
+                    "reconciled_at",
+                    models.DateTimeField(auto_now_add=True),
+                ),
+            ],
+        ),
+    ]
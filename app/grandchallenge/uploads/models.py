@@ -1,9 +1,12 @@
 import os
+from time import time
 
 import boto3
 from botocore.config import Config
 from django.conf import settings
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from django.utils.text import get_valid_filename
@@ -12,7 +15,7 @@ from django_summernote.models import AbstractAttachment
 from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
 from guardian.shortcuts import assign_perm
 
-from grandchallenge.core.models import UUIDModel
+from grandchallenge.core.models import FieldChangeMixin, UUIDModel
 from grandchallenge.core.storage import copy_s3_object, public_s3_storage
 from grandchallenge.subdomains.utils import reverse
 from grandchallenge.verifications.models import Verification
@@ -60,8 +63,116 @@ _ACCELERATED_UPLOADS_CLIENT = boto3.client(
 )
 
 
-class UserUpload(UUIDModel):
+def _get_creators_key_prefix(*, creator_pk):
+    # Prefix to objects that the user has uploaded
+    # Do not change this
+    return f"uploads/{creator_pk}/"
+
+
+def _list_objects(*, prefix, max_keys, continuation_token=None):
+    kwargs = {
+        "Bucket": settings.UPLOADS_S3_BUCKET_NAME,
+        "Prefix": prefix,
+        "MaxKeys": max_keys,
+    }
+
+    if continuation_token is not None:
+        kwargs["ContinuationToken"] = continuation_token
+
+    response = _UPLOADS_CLIENT.list_objects_v2(**kwargs)
+
+    objects = response.get("Contents", [])
+
+    if response["IsTruncated"]:
+        objects += _list_objects(
+            prefix=prefix,
+            max_keys=max_keys,
+            continuation_token=response["NextContinuationToken"],
+        )
+
+    return objects
+
+
+class UserUploadQuotaManager(models.Manager):
+    def get_size_of_completed_uploads(self, *, user):
+        """
+        Get the total size of the completed uploads of a user in bytes
+
+        The first time this is called for a user the size is taken from
+        storage, after that it is kept up to date as uploads are completed
+        and deleted.
+        """
+        try:
+            return self.get(user=user).size_of_completed_uploads
+        except self.model.DoesNotExist:
+            quota, _ = self.get_or_create(
+                user=user,
+                defaults={
+                    "size_of_completed_uploads": self.model.get_size_in_storage(
+                        user_pk=user.pk
+                    )
+                },
+            )
+            return quota.size_of_completed_uploads
+
+    def add_size(self, *, user_pk, size):
+        """Add bytes to the size of the completed uploads of a user"""
+        if size:
+            self.filter(user_id=user_pk).update(
+                size_of_completed_uploads=F("size_of_completed_uploads") + size
+            )
+
+
+class UserUploadQuota(models.Model):
+    """The total size of the completed uploads of a user"""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="user_upload_quota",
+    )
+    size_of_completed_uploads = models.BigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(auto_now_add=True)
+
+    objects = UserUploadQuotaManager()
+
+    @staticmethod
+    def get_size_in_storage(*, user_pk):
+        return sum(
+            u["Size"]
+            for u in _list_objects(
+                prefix=_get_creators_key_prefix(creator_pk=user_pk),
+                max_keys=UserUpload.LIST_MAX_ITEMS,
+            )
+        )
+
+    def reconcile(self):
+        """
+        Correct the size of the completed uploads from storage
+
+        Uploads can be completed or deleted while storage is listed, so
+        the difference from the size before listing is applied, rather than
+        overwriting the sizes that were added in the meantime.
+        """
+        self.refresh_from_db(fields=("size_of_completed_uploads",))
+        size_before = self.size_of_completed_uploads
+
+        size_in_storage = self.get_size_in_storage(user_pk=self.user_id)
+
+        UserUploadQuota.objects.filter(pk=self.pk).update(
+            size_of_completed_uploads=F("size_of_completed_uploads")
+            + (size_in_storage - size_before),
+            reconciled_at=now(),
+        )
+        self.refresh_from_db(
+            fields=("size_of_completed_uploads", "reconciled_at")
+        )
+
+
+class UserUpload(FieldChangeMixin, UUIDModel):
     LIST_MAX_ITEMS = 1000
+    PRESIGNED_URL_EXPIRES_IN = 3600
 
     class StatusChoices(models.IntegerChoices):
         PENDING = 0, "Pending"
@@ -77,6 +188,11 @@ class UserUpload(UUIDModel):
         choices=StatusChoices.choices, default=StatusChoices.PENDING
     )
     s3_upload_id = models.CharField(max_length=192, blank=True)
+    size_in_storage = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        help_text="The size of the completed upload in bytes",
+    )
 
     class Meta(UUIDModel.Meta):
         pass
@@ -87,7 +203,19 @@ class UserUpload(UUIDModel):
         if adding:
             self.create_multipart_upload()
 
-        super().save(*args, **kwargs)
+        completed = self.is_completed and (
+            adding or self.has_changed("status")
+        )
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if completed:
+                UserUploadQuota.objects.add_size(
+                    user_pk=self.creator_id, size=self.size_in_storage
+                )
+
+        self._initial_state = self._current_state
 
         if adding:
             self.assign_permissions()
@@ -115,9 +243,7 @@ class UserUpload(UUIDModel):
 
     @property
     def creators_key_prefix(self):
-        # Prefix to objects that the user has uploaded
-        # Do not change this
-        return f"uploads/{self.creator.pk}/"
+        return _get_creators_key_prefix(creator_pk=self.creator.pk)
 
     @property
     def can_upload_more(self):
@@ -133,9 +259,15 @@ class UserUpload(UUIDModel):
         else:
             upload_limit = settings.UPLOADS_MAX_SIZE_UNVERIFIED
 
-        uploaded_size = self.size + self.size_of_creators_completed_uploads
+        uploaded_size = UserUploadQuota.objects.get_size_of_completed_uploads(
+            user=self.creator
+        )
 
-        return uploaded_size < upload_limit
+        if uploaded_size >= upload_limit:
+            # Avoid listing the parts
+            return False
+
+        return uploaded_size + self.size < upload_limit
 
     @property
     def size(self):
@@ -167,26 +299,10 @@ class UserUpload(UUIDModel):
     def is_completed(self):
         return self.status == self.StatusChoices.COMPLETED
 
-    def get_creators_completed_uploads(self, continuation_token=None):
-        kwargs = {
-            "Bucket": self.bucket,
-            "Prefix": self.creators_key_prefix,
-            "MaxKeys": self.LIST_MAX_ITEMS,
-        }
-
-        if continuation_token is not None:
-            kwargs["ContinuationToken"] = continuation_token
-
-        response = self._client.list_objects_v2(**kwargs)
-
-        objects = response.get("Contents", [])
-
-        if response["IsTruncated"]:
-            objects += self.get_creators_completed_uploads(
-                continuation_token=response["NextContinuationToken"]
-            )
-
-        return objects
+    def get_creators_completed_uploads(self):
+        return _list_objects(
+            prefix=self.creators_key_prefix, max_keys=self.LIST_MAX_ITEMS
+        )
 
     @property
     def api_url(self) -> str:
@@ -206,18 +322,63 @@ class UserUpload(UUIDModel):
         self.s3_upload_id = response["UploadId"]
         self.status = self.StatusChoices.INITIALIZED
 
+    def _presigned_url_cache_key(self, *, part_number, window):
+        return (
+            f"uploads.presigned_url.{self.pk}.{self.s3_upload_id}."
+            f"{part_number}.{window}"
+        )
+
     def generate_presigned_urls(self, *, part_numbers):
-        return {
-            str(part_number): self.generate_presigned_url(
-                part_number=part_number
+        """
+        Get presigned urls for uploading parts
+
+        Urls are cached for half of the time that they are valid for, so
+        that clients that ask for the same parts again get the same urls,
+        which are then valid for at least half of that time.
+        """
+        if self.status != self.StatusChoices.INITIALIZED:
+            raise RuntimeError("Upload is not initialized")
+
+        timestamp = time()
+        cache_timeout = self.PRESIGNED_URL_EXPIRES_IN // 2
+        window = int(timestamp // cache_timeout)
+
+        cache_keys = {
+            str(part_number): self._presigned_url_cache_key(
+                part_number=part_number, window=window
             )
             for part_number in part_numbers
         }
+        cached_urls = cache.get_many(cache_keys.values())
+
+        presigned_urls = {}
+        new_urls = {}
+
+        for part_number, cache_key in cache_keys.items():
+            try:
+                presigned_urls[part_number] = cached_urls[cache_key]
+            except KeyError:
+                presigned_urls[part_number] = self._generate_presigned_url(
+                    part_number=int(part_number)
+                )
+                new_urls[cache_key] = presigned_urls[part_number]
+
+        if new_urls:
+            cache.set_many(
+                new_urls,
+                # Until the end of the window
+                timeout=max((window + 1) * cache_timeout - timestamp, 1),
+            )
+
+        return presigned_urls
 
     def generate_presigned_url(self, *, part_number):
         if self.status != self.StatusChoices.INITIALIZED:
             raise RuntimeError("Upload is not initialized")
 
+        return self._generate_presigned_url(part_number=part_number)
+
+    def _generate_presigned_url(self, *, part_number):
         return self._accelerated_client.generate_presigned_url(
             "upload_part",
             Params={
@@ -226,6 +387,7 @@ class UserUpload(UUIDModel):
                 "UploadId": self.s3_upload_id,
                 "PartNumber": part_number,
             },
+            ExpiresIn=self.PRESIGNED_URL_EXPIRES_IN,
         )
 
     def list_parts(self, *, part_number_marker=0):
@@ -260,6 +422,7 @@ class UserUpload(UUIDModel):
             MultipartUpload={"Parts": parts},
         )
         self.status = self.StatusChoices.COMPLETED
+        self.size_in_storage = self.completed_size
 
     def abort_multipart_upload(self):
         if self.status != self.StatusChoices.INITIALIZED:
@@ -312,6 +475,9 @@ def delete_objects_hook(*_, instance: UserUpload, **__):
     """
     if instance.status == UserUpload.StatusChoices.COMPLETED:
         instance.delete_object()
+        UserUploadQuota.objects.add_size(
+            user_pk=instance.creator_id, size=-instance.size_in_storage
+        )
     elif instance.status == UserUpload.StatusChoices.INITIALIZED:
         instance.abort_multipart_upload()
 
@@ -79,7 +79,16 @@ class UserUploadPartsSerializer(UserUploadSerializer):
 
 class UserUploadPresignedURLsSerializer(UserUploadSerializer):
     part_numbers = ListField(
-        child=IntegerField(min_value=1, max_value=10_000), write_only=True
+        child=IntegerField(min_value=1, max_value=10_000),
+        write_only=True,
+        required=False,
+    )
+    # Alternatively, a window of consecutive part numbers
+    first_part_number = IntegerField(
+        min_value=1, max_value=10_000, write_only=True, required=False
+    )
+    num_parts = IntegerField(
+        min_value=1, max_value=1_000, write_only=True, required=False
     )
     presigned_urls = SerializerMethodField(read_only=True)
 
@@ -87,12 +96,35 @@ class UserUploadPresignedURLsSerializer(UserUploadSerializer):
         fields = (
             *UserUploadSerializer.Meta.fields,
             "part_numbers",
+            "first_part_number",
+            "num_parts",
             "presigned_urls",
         )
 
     def validate(self, data):
-        if "part_numbers" not in data:
+        window = {"first_part_number", "num_parts"}.intersection(data)
+
+        if "part_numbers" in data:
+            if window:
+                raise ValidationError(
+                    "The `part_numbers` field cannot be combined with "
+                    "`first_part_number` or `num_parts`"
+                )
+        elif len(window) == 2:
+            data["part_numbers"] = list(
+                range(
+                    data["first_part_number"],
+                    min(data["first_part_number"] + data["num_parts"], 10_001),
+                )
+            )
+        elif window:
+            raise ValidationError(
+                "Both the `first_part_number` and `num_parts` fields are "
+                "required"
+            )
+        else:
             raise ValidationError("The `part_numbers` field is required")
+
         return data
 
     def get_presigned_urls(self, obj: UserUpload) -> dict[int, str]:
@@ -1,11 +1,15 @@
+import logging
 from datetime import timedelta
 
+from botocore.exceptions import ClientError
 from celery import shared_task
 from django.conf import settings
 from django.core.paginator import Paginator
 from django.utils.timezone import now
 
-from grandchallenge.uploads.models import UserUpload
+from grandchallenge.uploads.models import UserUpload, UserUploadQuota
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-micro-short"])
@@ -24,3 +28,39 @@ def delete_old_user_uploads():
         UserUpload.objects.filter(
             pk__in=page.object_list.values_list("pk", flat=True)
         ).delete()
+
+
+@shared_task(**settings.CELERY_TASK_DECORATOR_KWARGS["acks-late-2xlarge"])
+def reconcile_user_upload_quotas():
+    """
+    Corrects the upload quotas from the objects in storage
+
+    The quotas are updated as uploads are completed and deleted, this
+    catches changes that were missed, such as objects that failed to be
+    deleted.
+    """
+    _update_completed_upload_sizes()
+
+    for quota in UserUploadQuota.objects.order_by("reconciled_at").iterator():
+        quota.reconcile()
+
+
+def _update_completed_upload_sizes():
+    """
+    Sets the sizes of completed uploads that do not have one
+
+    Uploads completed before their size was recorded would otherwise not be
+    subtracted from the quota when they are deleted.
+    """
+    uploads = UserUpload.objects.filter(
+        status=UserUpload.StatusChoices.COMPLETED, size_in_storage=0
+    )
+
+    for upload in uploads.iterator():
+        try:
+            upload.size_in_storage = upload.completed_size
+        except ClientError:
+            logger.warning(f"Could not get the size of upload {upload.pk}")
+            continue
+
+        upload.save(update_fields=["size_in_storage"])
@@ -1,6 +1,7 @@
 import pytest
 from guardian.shortcuts import get_perms
 
+from grandchallenge.algorithms.models import get_inputs_hash
 from tests.algorithms_tests.factories import AlgorithmJobFactory
 from tests.algorithms_tests.utils import TwoAlgorithms
 from tests.components_tests.factories import ComponentInterfaceValueFactory
@@ -279,3 +280,29 @@ class TestAlgorithmJobViewersGroup:
             assert "view_job" not in get_perms(group, job)
             assert "view_image" not in get_perms(group, civ_in.image)
             assert "view_image" not in get_perms(group, civ_out.image)
+
+
+@pytest.mark.django_db
+def test_inputs_hash_updated():
+    job = AlgorithmJobFactory()
+    civs = ComponentInterfaceValueFactory.create_batch(2)
+
+    job.inputs.add(*civs)
+    job.refresh_from_db()
+    assert job.inputs_hash == get_inputs_hash(civ_pks=[c.pk for c in civs])
+
+    job.inputs.remove(civs[0])
+    job.refresh_from_db()
+    assert job.inputs_hash == get_inputs_hash(civ_pks=[civs[1].pk])
+
+    civs[0].algorithms_jobs_as_input.add(job)
+    job.refresh_from_db()
+    assert job.inputs_hash == get_inputs_hash(civ_pks=[c.pk for c in civs])
+
+    civs[1].algorithms_jobs_as_input.clear()
+    job.refresh_from_db()
+    assert job.inputs_hash == get_inputs_hash(civ_pks=[civs[0].pk])
+
+    job.inputs.clear()
+    job.refresh_from_db()
+    assert job.inputs_hash == get_inputs_hash(civ_pks=[])
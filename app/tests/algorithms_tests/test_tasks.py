@@ -7,11 +7,19 @@ import pytest
 from actstream.models import Follow
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.files.base import ContentFile, File
+from guardian.core import ObjectPermissionChecker
 from requests import put
 
-from grandchallenge.algorithms.models import DEFAULT_INPUT_INTERFACE_SLUG, Job
+from grandchallenge.algorithms.models import (
+    DEFAULT_INPUT_INTERFACE_SLUG,
+    Job,
+    JobQueueEntry,
+    get_inputs_hash,
+)
 from grandchallenge.algorithms.tasks import (
+    _dispatch_algorithm_jobs,
     create_algorithm_jobs,
+    execute_algorithm_job,
     execute_algorithm_job_for_inputs,
     filter_civs_for_algorithm,
     run_algorithm_job_for_inputs,
@@ -26,6 +34,7 @@ from grandchallenge.components.models import (
 from grandchallenge.components.tasks import (
     add_image_to_component_interface_value,
 )
+from grandchallenge.evaluation.utils import get
 from grandchallenge.notifications.models import Notification
 from tests.algorithms_tests.factories import (
     AlgorithmImageFactory,
@@ -46,6 +55,64 @@ from tests.uploads_tests.factories import UserUploadFactory
 from tests.utils import get_view_for_user, recurse_callbacks
 
 
+@pytest.mark.django_db
+def test_dispatch_algorithm_jobs_shares_slots_fairly(
+    settings, django_capture_on_commit_callbacks
+):
+    settings.ALGORITHMS_MAX_ACTIVE_JOBS = 2
+
+    fan_out = AlgorithmJobFactory.create_batch(3)
+    single = AlgorithmJobFactory()
+
+    with django_capture_on_commit_callbacks():
+        for job in fan_out:
+            job.enqueue(tenant="challenge-1")
+        single.enqueue(tenant="user-1")
+
+    def admitted():
+        return {
+            e.job
+            for e in JobQueueEntry.objects.filter(admitted_at__isnull=False)
+        }
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        _dispatch_algorithm_jobs()
+
+    assert len(callbacks) == 2
+    assert admitted() == {fan_out[0], single}
+
+    # No slots are free so nothing more is admitted
+    with django_capture_on_commit_callbacks() as callbacks:
+        _dispatch_algorithm_jobs()
+
+    assert len(callbacks) == 0
+
+    single.update_status(status=Job.SUCCESS)
+    fan_out[2].update_status(status=Job.CANCELLED)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        _dispatch_algorithm_jobs()
+
+    assert len(callbacks) == 1
+    assert admitted() == {fan_out[0], fan_out[1]}
+    assert JobQueueEntry.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_execute_algorithm_job_enqueues_pending_jobs(
+    django_capture_on_commit_callbacks,
+):
+    job, queued, running = AlgorithmJobFactory.create_batch(3)
+    queued.enqueue()
+    running.update_status(status=Job.EXECUTING)
+
+    with django_capture_on_commit_callbacks():
+        for j in (job, queued, running):
+            execute_algorithm_job(job_pk=j.pk, retries=1)
+
+    assert {e.job for e in JobQueueEntry.objects.all()} == {job, queued}
+
+
 @pytest.mark.django_db
 class TestCreateAlgorithmJobs:
     @property
@@ -116,6 +183,46 @@ class TestCreateAlgorithmJobs:
         for g in groups:
             assert jobs[0].viewer_groups.filter(pk=g.pk).exists()
 
+    def test_jobs_created_in_bulk(self, django_assert_max_num_queries):
+        ai = AlgorithmImageFactory()
+        interface = ai.algorithm.inputs.get()
+        civ_sets = [
+            {
+                ComponentInterfaceValueFactory(
+                    interface=interface, image=ImageFactory()
+                )
+            }
+            for _ in range(10)
+        ]
+        viewers, logs_viewers = GroupFactory(), GroupFactory()
+
+        with django_assert_max_num_queries(30):
+            jobs = create_algorithm_jobs(
+                algorithm_image=ai,
+                civ_sets=civ_sets,
+                extra_viewer_groups=[viewers],
+                extra_logs_viewer_groups=[logs_viewers],
+            )
+
+        assert len(jobs) == 10
+        assert JobQueueEntry.objects.filter(job__in=jobs).count() == 10
+
+        for job, civ_set in zip(jobs, civ_sets, strict=True):
+            job.refresh_from_db()
+            assert {*job.inputs.all()} == civ_set
+            assert {*job.viewer_groups.all()} == {job.viewers, viewers}
+
+            checker = ObjectPermissionChecker(viewers)
+            assert checker.has_perm("view_job", job)
+            assert not checker.has_perm("view_logs", job)
+            assert checker.has_perm("view_image", get(civ_set).image)
+            assert ObjectPermissionChecker(job.viewers).has_perm(
+                "view_image", get(civ_set).image
+            )
+            assert ObjectPermissionChecker(logs_viewers).has_perm(
+                "view_logs", job
+            )
+
 
 @pytest.mark.django_db
 def test_no_jobs_workflow(django_capture_on_commit_callbacks):
@@ -648,6 +755,42 @@ class TestJobCreation:
 
         assert filtered_civ_sets == civ_sets[1:]
 
+    def test_existing_jobs_without_inputs_hash(
+        self, django_assert_max_num_queries
+    ):
+        ai = AlgorithmImageFactory()
+        cis = ComponentInterfaceFactory.create_batch(2)
+        ai.algorithm.inputs.set(cis)
+
+        civs = [ComponentInterfaceValueFactory(interface=c) for c in cis]
+
+        j = AlgorithmJobFactory(algorithm_image=ai)
+        j.inputs.set(civs)
+
+        # Jobs created before the fingerprint was stored
+        Job.objects.filter(pk=j.pk).update(inputs_hash="")
+
+        civ_sets = [
+            {*civs},
+            *(
+                {
+                    ComponentInterfaceValueFactory(interface=cis[0]),
+                    ComponentInterfaceValueFactory(interface=cis[1]),
+                }
+                for _ in range(10)
+            ),
+        ]
+
+        with django_assert_max_num_queries(5):
+            filtered_civ_sets = filter_civs_for_algorithm(
+                civ_sets=civ_sets, algorithm_image=ai
+            )
+
+        assert filtered_civ_sets == civ_sets[1:]
+
+        j.refresh_from_db()
+        assert j.inputs_hash == get_inputs_hash(civ_pks=[c.pk for c in civs])
+
 
 @pytest.mark.django_db
 def test_failed_job_notifications(
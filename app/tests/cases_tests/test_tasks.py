@@ -7,10 +7,11 @@ from celery import shared_task
 from panimg.models import ImageType, PanImgFile, PostProcessorResult
 from panimg.post_processors import DEFAULT_POST_PROCESSORS
 
-from grandchallenge.cases.models import ImageFile
+from grandchallenge.cases.models import ImageFile, RawImageUploadSession
 from grandchallenge.cases.tasks import (
     POST_PROCESSORS,
     _check_post_processor_result,
+    _handle_raw_image_files,
     import_images,
     post_process_image,
 )
@@ -174,3 +175,57 @@ def test_post_processing(
         sum(file.size_in_storage for file in ImageFile.objects.all())
         == expected_bytes
     )
+
+
+@pytest.mark.django_db
+def test_import_images_from_directories_in_parallel(
+    tmpdir_factory, settings, django_capture_on_commit_callbacks
+):
+    settings.CASES_IMPORT_PROCESSES = 2
+
+    input_directory = Path(tmpdir_factory.mktemp("temp"))
+    files = set()
+
+    for filename in ("image10x10x10.mha", "image16bit.mha"):
+        (input_directory / filename).mkdir()
+        files.add(input_directory / filename / filename)
+        shutil.copy(RESOURCE_PATH / filename, input_directory / filename)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        imported_images = import_images(input_directory=input_directory)
+
+    assert len(callbacks) == 2
+    assert imported_images.consumed_files == files
+    assert imported_images.file_errors == {}
+    assert ImageFile.objects.filter(
+        image__in=imported_images.new_images
+    ).count() == len(files)
+    assert all(
+        f.size_in_storage > 0
+        for f in ImageFile.objects.filter(image__in=imported_images.new_images)
+    )
+
+
+@pytest.mark.django_db
+def test_images_not_uploaded_for_finished_session(tmpdir_factory, mocker):
+    upload_image_files = mocker.patch(
+        "grandchallenge.cases.tasks._upload_image_files"
+    )
+
+    session = UploadSessionFactory(status=RawImageUploadSession.SUCCESS)
+
+    input_directory = Path(tmpdir_factory.mktemp("temp"))
+    shutil.copy(RESOURCE_PATH / "image10x10x10.mha", input_directory)
+
+    _handle_raw_image_files(
+        input_directory,
+        RawImageUploadSession.objects.filter(
+            pk=session.pk
+        ).select_for_update(),
+    )
+
+    upload_image_files.assert_not_called()
+    assert not ImageFile.objects.exists()
+
+    session.refresh_from_db()
+    assert session.status == RawImageUploadSession.SUCCESS
@@ -1,20 +1,28 @@
 import io
 import json
+from contextlib import nullcontext
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
+import boto3
 import botocore
 import pytest
-from botocore.stub import Stubber
+from botocore.stub import ANY, Stubber
 from dateutil.tz import tzlocal
 from django.conf import settings
+from django.core.cache import cache
 
 from grandchallenge.algorithms.models import AlgorithmImage, Job
 from grandchallenge.components.backends.amazon_sagemaker_batch import (
     AmazonSageMakerBatchExecutor,
+    _get_batch_task_logs,
+    _get_pending_batch_key,
 )
+from grandchallenge.components.backends.base import JobParams
 from grandchallenge.components.backends.exceptions import (
+    BatchNotSubmitted,
     ComponentException,
+    RetryTask,
     TaskCancelled,
 )
 from grandchallenge.components.backends.utils import LOGLINES
@@ -205,6 +213,7 @@ def test_set_duration():
     )
 
     assert executor.duration == timedelta(seconds=21)
+    assert executor.instrumentation == {"container_start": 189.0}
 
 
 @pytest.mark.parametrize("data_log", (True, False))
@@ -638,3 +647,367 @@ def test_deprovision(settings):
             )
 
         assert error.value.response["Error"]["Message"] == "Not Found"
+
+
+def _get_batched_executor(*, pk):
+    return AmazonSageMakerBatchExecutor(
+        job_id=f"algorithms-job-{pk}-00",
+        exec_image_repo_tag="",
+        memory_limit=4,
+        time_limit=60,
+        requires_gpu=False,
+    )
+
+
+def test_execute_batched(settings):
+    settings.COMPONENTS_AMAZON_ECR_REGION = "us-east-1"
+    settings.COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE = 2
+
+    pks = [uuid4(), uuid4()]
+    executors = [_get_batched_executor(pk=pk) for pk in pks]
+    pending_batch_key = _get_pending_batch_key(group=executors[0]._batch_group)
+    cache.delete(pending_batch_key)
+
+    with Stubber(executors[1]._sagemaker_client) as s:
+        s.add_response(
+            method="create_transform_job",
+            service_response={"TransformJobArn": "string"},
+            expected_params={
+                "TransformJobName": ANY,
+                "Environment": {
+                    "LOG_LEVEL": "INFO",
+                    "no_proxy": "amazonaws.com",
+                },
+                "ModelClientConfig": {
+                    "InvocationsMaxRetries": 0,
+                    "InvocationsTimeoutInSeconds": 60,
+                },
+                "ModelName": "",
+                "BatchStrategy": "SingleRecord",
+                "TransformInput": {
+                    "DataSource": {
+                        "S3DataSource": {
+                            "S3DataType": "S3Prefix",
+                            "S3Uri": ANY,
+                        }
+                    },
+                    "SplitType": "Line",
+                },
+                "TransformOutput": {
+                    "S3OutputPath": ANY,
+                    "AssembleWith": "Line",
+                },
+                "TransformResources": {
+                    "InstanceCount": 1,
+                    "InstanceType": "ml.m5.large",
+                },
+            },
+        )
+
+        # The first job waits for the batch to fill up
+        executors[0].execute(input_civs=[], input_prefixes={})
+
+        assert cache.get(pending_batch_key)["invocations"] == [
+            {
+                "pk": f"algorithms-job-{pks[0]}-00",
+                "inputs": [],
+                "output_bucket_name": "grand-challenge-components-outputs",
+                "output_prefix": f"/io/algorithms/job/{pks[0]}-00",
+            }
+        ]
+
+        executors[1].execute(input_civs=[], input_prefixes={})
+
+        s.assert_no_pending_responses()
+
+    assert cache.get(pending_batch_key) is None
+
+
+@pytest.mark.parametrize(
+    "error_code,expectation,requeued",
+    (
+        ("ThrottlingException", nullcontext(), True),
+        ("ValidationException", pytest.raises(BatchNotSubmitted), False),
+    ),
+)
+def test_submit_batch_errors(settings, error_code, expectation, requeued):
+    settings.COMPONENTS_AMAZON_ECR_REGION = "us-east-1"
+    settings.COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE = 2
+
+    pks = [uuid4(), uuid4()]
+    executors = [_get_batched_executor(pk=pk) for pk in pks]
+    pending_batch_key = _get_pending_batch_key(group=executors[0]._batch_group)
+    cache.delete(pending_batch_key)
+
+    with Stubber(executors[1]._sagemaker_client) as s:
+        s.add_client_error(
+            method="create_transform_job", service_error_code=error_code
+        )
+
+        executors[0].execute(input_civs=[], input_prefixes={})
+
+        with expectation as error:
+            executors[1].execute(input_civs=[], input_prefixes={})
+
+        s.assert_no_pending_responses()
+
+    if requeued:
+        assert len(cache.get(pending_batch_key)["invocations"]) == 2
+    else:
+        assert cache.get(pending_batch_key) is None
+        assert error.value.job_params == [
+            JobParams(
+                app_label="algorithms", model_name="job", pk=str(pk), attempt=0
+            )
+            for pk in pks
+        ]
+
+    cache.delete(pending_batch_key)
+
+
+def test_get_batched_job_events(mocker):
+    batch_id = uuid4()
+    pks = [uuid4(), uuid4()]
+    job_ids = [f"algorithms-job-{pk}-00" for pk in pks]
+    invocation_key = f"/invocations/batches/{batch_id}/invocation.jsonl"
+    executor = _get_batched_executor(pk=pks[0])
+
+    for bucket, key, lines in (
+        (
+            settings.COMPONENTS_INPUT_BUCKET_NAME,
+            invocation_key,
+            [{"pk": job_id} for job_id in job_ids],
+        ),
+        (
+            settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+            f"{invocation_key}.out",
+            [{"pk": job_ids[0], "return_code": 0}],
+        ),
+    ):
+        with io.BytesIO() as f:
+            f.write("\n".join(json.dumps(line) for line in lines).encode())
+            f.seek(0)
+            executor._s3_client.upload_fileobj(
+                Fileobj=f, Bucket=bucket, Key=key
+            )
+
+    batch_name = f"{settings.COMPONENTS_REGISTRY_PREFIX}-B-{batch_id}"
+    log_event = {"message": "hello", "timestamp": 1654683838000}
+    get_batch_task_logs = mocker.patch(
+        "grandchallenge.components.backends.amazon_sagemaker_batch._get_batch_task_logs",
+        return_value={job_ids[0]: [log_event]},
+    )
+    events = AmazonSageMakerBatchExecutor.get_batched_job_events(
+        event={
+            "TransformJobName": batch_name,
+            "TransformJobStatus": "Completed",
+        }
+    )
+
+    assert events == [
+        {
+            "TransformJobName": f"{settings.COMPONENTS_REGISTRY_PREFIX}-A-{pk}-00",
+            "TransformJobStatus": "Completed",
+            "BatchTransformJobName": batch_name,
+            "BatchSize": 2,
+            "BatchResult": result,
+            "BatchLogs": logs,
+        }
+        for pk, result, logs in zip(
+            pks,
+            [json.dumps({"pk": job_ids[0], "return_code": 0}), None],
+            [[log_event], []],
+            strict=True,
+        )
+    ]
+    get_batch_task_logs.assert_called_once_with(transform_job_name=batch_name)
+    assert [
+        AmazonSageMakerBatchExecutor.get_job_params(event=e).pk for e in events
+    ] == [str(pk) for pk in pks]
+
+    # The objects of the batch are kept until the events are sent
+    for bucket in (
+        settings.COMPONENTS_INPUT_BUCKET_NAME,
+        settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+    ):
+        assert list(
+            executor._list_objects(
+                bucket=bucket, prefix=f"/invocations/batches/{batch_id}"
+            )
+        )
+
+    AmazonSageMakerBatchExecutor.delete_batch(
+        event={"TransformJobName": batch_name}
+    )
+
+    for bucket in (
+        settings.COMPONENTS_INPUT_BUCKET_NAME,
+        settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+    ):
+        assert not list(
+            executor._list_objects(
+                bucket=bucket, prefix=f"/invocations/batches/{batch_id}"
+            )
+        )
+
+    # A batch that was already handled has no more events
+    assert (
+        AmazonSageMakerBatchExecutor.get_batched_job_events(
+            event={
+                "TransformJobName": batch_name,
+                "TransformJobStatus": "Completed",
+            }
+        )
+        == []
+    )
+
+    # Events for single jobs are not split
+    assert (
+        AmazonSageMakerBatchExecutor.get_batched_job_events(
+            event={"TransformJobName": events[0]["TransformJobName"]}
+        )
+        is None
+    )
+
+
+def test_get_batch_task_logs(settings, mocker):
+    settings.COMPONENTS_AMAZON_ECR_REGION = "us-east-1"
+    logs_client = boto3.client("logs", region_name="us-east-1")
+    mocker.patch.object(boto3, "client", return_value=logs_client)
+
+    def log_event(*, task, message):
+        return {
+            "message": json.dumps(
+                {
+                    "log": message,
+                    "source": "stdout",
+                    "internal": False,
+                    "task": task,
+                }
+            ),
+            "timestamp": 1654683838000,
+        }
+
+    with Stubber(logs_client) as logs:
+        logs.add_response(
+            method="describe_log_streams",
+            service_response={
+                "logStreams": [
+                    {"logStreamName": "localhost-B-batch/i-whatever"},
+                    {"logStreamName": "localhost-B-batch/i-whatever/data-log"},
+                ]
+            },
+            expected_params={
+                "logGroupName": "/aws/sagemaker/TransformJobs",
+                "logStreamNamePrefix": "localhost-B-batch",
+            },
+        )
+        for events, token, next_token in (
+            (
+                [
+                    log_event(task="a", message="first"),
+                    log_event(task="b", message="other"),
+                ],
+                None,
+                "f/1",
+            ),
+            (
+                [
+                    log_event(task="a", message="second"),
+                    {"message": "unstructured", "timestamp": 1654683838000},
+                ],
+                "f/1",
+                "f/2",
+            ),
+            ([], "f/2", "f/2"),
+        ):
+            logs.add_response(
+                method="get_log_events",
+                service_response={
+                    "events": events,
+                    "nextForwardToken": next_token,
+                },
+                expected_params={
+                    "logGroupName": "/aws/sagemaker/TransformJobs",
+                    "logStreamName": "localhost-B-batch/i-whatever",
+                    "startFromHead": True,
+                    **({"nextToken": token} if token else {}),
+                },
+            )
+
+        task_logs = _get_batch_task_logs(
+            transform_job_name="localhost-B-batch"
+        )
+
+        logs.assert_no_pending_responses()
+
+    assert {
+        task: [json.loads(e["message"])["log"] for e in events]
+        for task, events in task_logs.items()
+    } == {"a": ["first", "second"], "b": ["other"]}
+
+
+def test_set_batched_task_logs():
+    executor = _get_batched_executor(pk=uuid4())
+    executor._AmazonSageMakerBatchExecutor__batch_transform_job_name = "batch"
+    executor._AmazonSageMakerBatchExecutor__batch_logs = [
+        {
+            "message": json.dumps(
+                {
+                    "log": "hello from stderr",
+                    "source": "stderr",
+                    "internal": False,
+                    "task": executor._job_id,
+                }
+            ),
+            "timestamp": 1654683838000,
+        }
+    ]
+
+    # The logs are not read from the batch's stream again
+    executor._set_task_logs()
+
+    assert executor.stdout == ""
+    assert executor.stderr == "2022-06-08T10:23:58+00:00 hello from stderr"
+
+
+@pytest.mark.parametrize(
+    "batch_result,expectation",
+    (
+        ('{"return_code": 0}', nullcontext()),
+        ('{"return_code": 1}', pytest.raises(ComponentException)),
+        (None, pytest.raises(ComponentException)),
+        ("foo", pytest.raises(ComponentException)),
+    ),
+)
+def test_handle_batched_completed_job(batch_result, expectation):
+    pk = uuid4()
+    executor = _get_batched_executor(pk=pk)
+
+    executor._AmazonSageMakerBatchExecutor__batch_transform_job_name = "batch"
+    executor._AmazonSageMakerBatchExecutor__batch_result = batch_result
+
+    with expectation:
+        executor._handle_completed_job()
+
+
+def test_handle_batched_failed_job():
+    executor = _get_batched_executor(pk=uuid4())
+    executor._AmazonSageMakerBatchExecutor__batch_transform_job_name = "batch"
+
+    with pytest.raises(RetryTask):
+        executor._handle_failed_job(event={"FailureReason": "Whatever"})
+
+
+def test_batched_duration():
+    executor = _get_batched_executor(pk=uuid4())
+    executor._AmazonSageMakerBatchExecutor__batch_size = 4
+
+    executor._set_duration(
+        event={
+            "TransformStartTime": 1654683838000,
+            "TransformEndTime": 1654684027000,
+        }
+    )
+
+    assert executor.duration == timedelta(seconds=189) / 4
@@ -2,12 +2,17 @@ import os
 from zipfile import ZipInfo
 
 import pytest
+from botocore.stub import Stubber
+from django.conf import settings
 
+from grandchallenge.components.backends.docker import DockerExecutor
 from grandchallenge.components.backends.docker_client import _get_cpuset_cpus
 from grandchallenge.components.backends.utils import (
     _filter_members,
     user_error,
 )
+from grandchallenge.components.models import ComponentInterface
+from tests.components_tests.factories import ComponentInterfaceValueFactory
 
 
 @pytest.mark.parametrize(
@@ -109,3 +114,75 @@ def test_filter_members_single_file():
 def test_filter_members_single_file_nested():
     members = _filter_members([ZipInfo("foo/bar")])
     assert members == [{"src": "foo/bar", "dest": "bar"}]
+
+
+def test_delete_objects_paginated_and_batched():
+    executor = DockerExecutor(
+        job_id="algorithms-job-00000000-0000-0000-0000-000000000000",
+        exec_image_repo_tag="",
+        memory_limit=4,
+        time_limit=60,
+        requires_gpu=False,
+    )
+    bucket = settings.COMPONENTS_OUTPUT_BUCKET_NAME
+    prefix = executor._io_prefix
+    keys = [f"{prefix}/{idx}.json" for idx in range(1500)]
+
+    with Stubber(executor._s3_client) as s:
+        s.add_response(
+            method="list_objects_v2",
+            service_response={
+                "IsTruncated": True,
+                "Contents": [{"Key": key} for key in keys[:1000]],
+                "NextContinuationToken": "token",
+            },
+            expected_params={"Bucket": bucket, "Prefix": prefix},
+        )
+        s.add_response(
+            method="list_objects_v2",
+            service_response={
+                "IsTruncated": False,
+                "Contents": [{"Key": key} for key in keys[1000:]],
+            },
+            expected_params={
+                "Bucket": bucket,
+                "Prefix": prefix,
+                "ContinuationToken": "token",
+            },
+        )
+        for batch in (keys[:1000], keys[1000:]):
+            s.add_response(
+                method="delete_objects",
+                service_response={},
+                expected_params={
+                    "Bucket": bucket,
+                    "Delete": {"Objects": [{"Key": key} for key in batch]},
+                },
+            )
+
+        executor._delete_objects(bucket=bucket, prefix=prefix)
+
+
+@pytest.mark.django_db
+def test_provision_inputs_resolved_before_transfer(mocker):
+    executor = DockerExecutor(
+        job_id="algorithms-job-00000000-0000-0000-0000-000000000000",
+        exec_image_repo_tag="",
+        memory_limit=4,
+        time_limit=60,
+        requires_gpu=False,
+    )
+    civ = ComponentInterfaceValueFactory(
+        interface=ComponentInterface.objects.get(slug="results-json-file"),
+        value={"foo": "bar"},
+    )
+    provision_input = mocker.patch.object(executor, "_provision_input")
+
+    executor._provision_inputs(input_civs=[civ], input_prefixes={})
+
+    provision_input.assert_called_once_with(
+        key=f"{executor._io_prefix}/results.json",
+        src=None,
+        content=b'{"foo": "bar"}',
+    )
+    assert executor.instrumentation["provisioned_bytes"] == 14
@@ -0,0 +1,105 @@
+import pytest
+from django.core.cache import cache
+
+from grandchallenge.components.backends import docker_pool
+
+
+@pytest.mark.parametrize(
+    "pool_size,memory_limit,expected",
+    ((4, 4, 4), (4, 8, 2), (1, 4, 1), (4, 32, 0)),
+)
+def test_pool_size(settings, pool_size, memory_limit, expected):
+    settings.COMPONENTS_DOCKER_POOL_SIZE = pool_size
+    settings.COMPONENTS_DOCKER_POOL_MEMORY_LIMIT = 16
+
+    assert docker_pool.get_pool_size(memory_limit=memory_limit) == expected
+
+
+@pytest.fixture
+def fake_docker(monkeypatch):
+    running = {}
+
+    def run_container(*, name, labels, **__):
+        running[name] = labels
+
+    def remove_container(*, name):
+        running.pop(name, None)
+
+    def list_containers(*, label):
+        return [
+            {
+                "Names": name,
+                "Labels": ",".join(f"{k}={v}" for k, v in labels.items()),
+            }
+            for name, labels in running.items()
+        ]
+
+    monkeypatch.setattr(
+        docker_pool.docker_client, "run_container", run_container
+    )
+    monkeypatch.setattr(
+        docker_pool.docker_client, "remove_container", remove_container
+    )
+    monkeypatch.setattr(
+        docker_pool.docker_client, "stop_container", lambda **_: None
+    )
+    monkeypatch.setattr(
+        docker_pool.docker_client, "list_containers", list_containers
+    )
+    monkeypatch.setattr(
+        docker_pool.http_client, "await_ready", lambda **_: None
+    )
+
+    cache.clear()
+
+    return running
+
+
+def test_pooled_containers_reused(settings, fake_docker):
+    settings.COMPONENTS_DOCKER_POOL_SIZE = 2
+    settings.COMPONENTS_DOCKER_POOL_MEMORY_LIMIT = 8
+
+    kwargs = {
+        "repo_tag": "test:latest",
+        "memory_limit": 4,
+        "time_limit": 60,
+        "environment": {},
+    }
+
+    with docker_pool.pooled_container(**kwargs) as first:
+        with docker_pool.pooled_container(**kwargs) as second:
+            with docker_pool.pooled_container(**kwargs) as third:
+                assert first is not None
+                assert second is not None
+                # The pool is full so the job runs in its own container
+                assert third is None
+
+    assert set(fake_docker) == {first, second}
+
+    with docker_pool.pooled_container(**kwargs) as reused:
+        assert reused == first
+
+    with pytest.raises(RuntimeError):
+        with docker_pool.pooled_container(**kwargs) as failed:
+            raise RuntimeError
+
+    # Containers that fail are removed from the pool
+    assert set(fake_docker) == {second}
+    assert failed == first
+
+
+def test_idle_containers_evicted_for_memory(settings, fake_docker):
+    settings.COMPONENTS_DOCKER_POOL_SIZE = 2
+    settings.COMPONENTS_DOCKER_POOL_MEMORY_LIMIT = 8
+
+    with docker_pool.pooled_container(
+        repo_tag="a:latest", memory_limit=8, time_limit=60, environment={}
+    ) as a:
+        assert a is not None
+
+    with docker_pool.pooled_container(
+        repo_tag="b:latest", memory_limit=4, time_limit=60, environment={}
+    ) as b:
+        assert b is not None
+
+    assert set(fake_docker) == {b}
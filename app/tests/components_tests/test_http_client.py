@@ -0,0 +1,98 @@
+from typing import NamedTuple
+
+import pytest
+import requests
+
+from grandchallenge.components.backends import http_client
+from grandchallenge.components.backends.exceptions import ComponentException
+
+
+class FakeSession:
+    def __init__(self, *, responses):
+        self.responses = iter(responses)
+        self.requested = []
+
+    def get(self, url, **_):
+        self.requested.append(url)
+        response = next(self.responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    post = get
+
+
+class FakeResponse(NamedTuple):
+    status_code: int
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(response=self)
+
+    def json(self):
+        return {"return_code": 0}
+
+
+def test_await_ready_backs_off(monkeypatch):
+    delays = []
+    session = FakeSession(
+        responses=[
+            requests.ConnectionError(),
+            requests.ConnectionError(),
+            FakeResponse(status_code=503),
+            FakeResponse(status_code=200),
+        ]
+    )
+
+    monkeypatch.setattr(http_client, "_get_session", lambda: session)
+    monkeypatch.setattr(http_client, "sleep", delays.append)
+
+    http_client.await_ready(host="foo")
+
+    assert session.requested == ["http://foo:8080/ping"] * 4
+    assert delays == pytest.approx([0.1, 0.2, 0.4], abs=0.01)
+
+
+def test_await_ready_times_out(monkeypatch, settings):
+    settings.COMPONENTS_DOCKER_READY_TIMEOUT = 0
+    session = FakeSession(responses=[])
+
+    monkeypatch.setattr(http_client, "_get_session", lambda: session)
+
+    with pytest.raises(ComponentException):
+        http_client.await_ready(host="foo")
+
+    assert session.requested == []
+
+
+@pytest.mark.parametrize(
+    "response,message",
+    (
+        (FakeResponse(status_code=200), None),
+        (requests.ReadTimeout(), "Time limit exceeded"),
+        (
+            requests.ConnectionError(),
+            "The container could not be reached or did not respond correctly.",
+        ),
+        (
+            FakeResponse(status_code=502),
+            "The container responded with an error (status 502).",
+        ),
+    ),
+)
+def test_invoke_errors(monkeypatch, response, message):
+    session = FakeSession(responses=[response])
+
+    monkeypatch.setattr(http_client, "_get_session", lambda: session)
+
+    if message is None:
+        assert http_client.invoke(host="foo", payload={}, timeout=1) == {
+            "return_code": 0
+        }
+    else:
+        with pytest.raises(ComponentException) as error:
+            http_client.invoke(host="foo", payload={}, timeout=1)
+
+        assert str(error.value) == message
+
+    assert session.requested == ["http://foo:8080/invocations"]
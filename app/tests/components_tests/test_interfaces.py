@@ -29,3 +29,9 @@ def test_relative_path_unique():
 
     with pytest.raises(IntegrityError):
         _ = ComponentInterfaceFactory(relative_path="foo")
+
+
+@pytest.mark.django_db
+def test_predictions_json_file_saved_in_object_store():
+    interface = ComponentInterface.objects.get(slug="predictions-json-file")
+    assert interface.saved_in_object_store
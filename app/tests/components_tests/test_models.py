@@ -2,6 +2,7 @@ import json
 import uuid
 from contextlib import nullcontext
 from datetime import timedelta
+from io import BytesIO
 
 import pytest
 from django.core.exceptions import ValidationError
@@ -57,6 +58,97 @@ def test_update_started_adds_time():
     assert j.completed_at is not None
 
 
+@pytest.mark.django_db
+def test_update_status_records_transitions():
+    j = AlgorithmJobFactory()
+
+    j.update_status(status=j.PROVISIONING)
+    j.update_status(status=j.PROVISIONED)
+    j.update_status(status=j.EXECUTING)
+
+    j.refresh_from_db()
+    assert [status for status, _ in j.status_transitions] == [
+        j.PROVISIONING,
+        j.PROVISIONED,
+        j.EXECUTING,
+    ]
+    assert set(j.status_durations) == {"Provisioning", "Provisioned"}
+    assert all(duration >= 0 for duration in j.status_durations.values())
+
+
+@pytest.mark.django_db
+def test_update_status_only_updates_changed_fields():
+    j = AlgorithmJobFactory()
+    other = Job.objects.get(pk=j.pk)
+
+    other.comment = "Updated elsewhere"
+    other.save()
+
+    j.update_status(status=j.FAILURE, error_message="Oops")
+
+    j.refresh_from_db()
+    assert j.comment == "Updated elsewhere"
+    assert j.status == j.FAILURE
+    assert j.error_message == "Oops"
+    assert j.completed_at is not None
+
+
+@pytest.mark.django_db
+def test_stage_timings():
+    j = AlgorithmJobFactory()
+
+    assert j.stage_timings == {}
+    assert j.provisioning_bytes_per_second is None
+
+    now = timezone.now()
+    j.status_transitions = [
+        [j.PROVISIONING, (j.created + timedelta(seconds=10)).isoformat()],
+        [j.PROVISIONED, (j.created + timedelta(seconds=14)).isoformat()],
+        [j.EXECUTING, (j.created + timedelta(seconds=15)).isoformat()],
+        [j.EXECUTED, (j.created + timedelta(seconds=75)).isoformat()],
+        [j.PARSING, (j.created + timedelta(seconds=76)).isoformat()],
+        [j.SUCCESS, now.isoformat()],
+    ]
+    j.instrumentation = {
+        "backend": "Executor",
+        "provisioned_bytes": 400,
+        "container_start": 20,
+        "inference": 40,
+        "deprovision": 2,
+    }
+
+    assert j.stage_timings == {
+        "queue_wait": 10,
+        "provisioning": 4,
+        "parsing": pytest.approx((now - j.created).total_seconds() - 76),
+        "container_start": 20,
+        "inference": 40,
+        "deprovision": 2,
+    }
+    assert j.provisioning_bytes_per_second == 100
+
+
+@pytest.mark.django_db
+def test_update_status_records_instrumentation():
+    j = AlgorithmJobFactory()
+
+    j.update_status(
+        status=j.PROVISIONING, instrumentation={"backend": "Executor"}
+    )
+    j.update_status(
+        status=j.EXECUTED,
+        duration=timedelta(seconds=30),
+        instrumentation={"container_start": 5},
+    )
+
+    j.refresh_from_db()
+    assert j.instrumentation == {
+        "backend": "Executor",
+        "container_start": 5,
+        "inference": 30,
+    }
+
+
 @pytest.mark.django_db
 def test_duration():
     j = AlgorithmJobFactory()
@@ -1344,3 +1436,106 @@ def test_mark_desired_version():
         image.refresh_from_db()
     assert i2.is_desired_version
     assert not any([i1.is_desired_version, i3.is_desired_version])
+
+
+@pytest.mark.parametrize("streaming_min_bytes", (0, 10 * 1024 * 1024))
+@pytest.mark.parametrize(
+    "points,expectation",
+    (
+        (list(range(1500)), nullcontext()),
+        (
+            [*range(1200), "1200", *range(1201, 1500)],
+            pytest.raises(ValidationError),
+        ),
+        ([], nullcontext()),
+    ),
+)
+def test_validate_json_file_against_schema(
+    settings, streaming_min_bytes, points, expectation
+):
+    settings.COMPONENTS_JSON_STREAMING_MIN_BYTES = streaming_min_bytes
+    i = ComponentInterface(
+        kind=InterfaceKindChoices.ANY,
+        schema={
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "points": {"type": "array", "items": {"type": "integer"}},
+            },
+            "required": ["name", "points"],
+        },
+    )
+    f = BytesIO(json.dumps({"name": "foo", "points": points}).encode())
+
+    with expectation as e:
+        i.validate_json_file_against_schema(f=f)
+
+    if streaming_min_bytes == 0 and e is not None:
+        assert "Item 1200 of points is invalid" in str(e.value)
+
+
+@pytest.mark.parametrize(
+    "content",
+    (b'{"name": "foo", "points": [1, 2', b'{"name": "foo"} []', b"\xff"),
+)
+def test_validate_json_file_against_schema_invalid_json(settings, content):
+    settings.COMPONENTS_JSON_STREAMING_MIN_BYTES = 0
+    i = ComponentInterface(kind=InterfaceKindChoices.ANY)
+
+    with pytest.raises(ValidationError):
+        i.validate_json_file_against_schema(f=BytesIO(content))
+
+
+def test_validate_json_file_against_kind_array_keywords(settings):
+    settings.COMPONENTS_JSON_STREAMING_MIN_BYTES = 0
+    i = ComponentInterface(kind=InterfaceKindChoices.TWO_D_BOUNDING_BOX)
+    value = {
+        "type": "2D bounding box",
+        "corners": [[0, 0, 0]] * 1001,
+        "version": {"major": 1, "minor": 0},
+    }
+
+    with pytest.raises(ValidationError):
+        i.validate_json_file_against_schema(
+            f=BytesIO(json.dumps(value).encode())
+        )
+
+
+@pytest.mark.parametrize(
+    "kind,schema,expected",
+    (
+        (InterfaceKindChoices.ANY, {}, True),
+        (InterfaceKindChoices.TWO_D_BOUNDING_BOX, {}, False),
+        (InterfaceKindChoices.MULTIPLE_TWO_D_BOUNDING_BOXES, {}, True),
+        (InterfaceKindChoices.ANY, {"items": {"maxItems": 3}}, True),
+        (InterfaceKindChoices.ANY, {"maxItems": 3}, False),
+        (InterfaceKindChoices.ANY, {"items": [{"type": "number"}]}, False),
+        (
+            InterfaceKindChoices.ANY,
+            {"prefixItems": [{"type": "number"}]},
+            False,
+        ),
+        (
+            InterfaceKindChoices.ANY,
+            {
+                "oneOf": [
+                    {"items": {"type": "number"}},
+                    {"items": {"type": "string"}},
+                ]
+            },
+            False,
+        ),
+        (
+            InterfaceKindChoices.ANY,
+            {
+                "properties": {"a": {"$ref": "#/definitions/a"}},
+                "definitions": {"a": {"minItems": 1}},
+            },
+            False,
+        ),
+    ),
+)
+def test_schema_validates_in_parts(kind, schema, expected):
+    i = ComponentInterface(kind=kind, schema=schema)
+
+    assert i._schema_validates_in_parts is expected
@@ -1,14 +1,25 @@
 import json
+from datetime import timedelta
 
 import pytest
 from celery.exceptions import MaxRetriesExceededError
+from django.core.cache import cache
+from django.utils.timezone import now
 
-from grandchallenge.algorithms.models import AlgorithmImage
+from grandchallenge.algorithms.models import AlgorithmImage, Job
+from grandchallenge.components.backends.amazon_sagemaker_batch import (
+    _get_pending_batch_key,
+)
+from grandchallenge.components.backends.base import JobParams
+from grandchallenge.components.backends.exceptions import BatchNotSubmitted
 from grandchallenge.components.tasks import (
+    _fail_batched_jobs,
     _retry,
     civ_value_to_file,
     encode_b64j,
     execute_job,
+    fail_lost_sagemaker_batch_jobs,
+    provision_job,
     remove_inactive_container_images,
     upload_to_registry_and_sagemaker,
     validate_docker_image,
@@ -16,6 +27,7 @@ from grandchallenge.components.tasks import (
 from tests.algorithms_tests.factories import (
     AlgorithmFactory,
     AlgorithmImageFactory,
+    AlgorithmJobFactory,
 )
 from tests.components_tests.factories import ComponentInterfaceValueFactory
 from tests.evaluation_tests.factories import MethodFactory
@@ -222,3 +234,126 @@ def test_upload_to_registry_and_sagemaker(
     image = AlgorithmImage.objects.get(pk=image.pk)
     assert image.is_in_registry
     assert image.is_desired_version
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("pipeline", (False, True))
+def test_provision_job_pipeline(
+    settings, mocker, django_capture_on_commit_callbacks, pipeline
+):
+    settings.COMPONENTS_JOB_PIPELINE = pipeline
+
+    job = AlgorithmJobFactory()
+    job.algorithm_image.can_execute = True
+
+    executor = mocker.Mock(
+        IS_EVENT_DRIVEN=False,
+        stdout="",
+        stderr="",
+        duration=None,
+        compute_cost_euro_millicents=None,
+        instrumentation={},
+    )
+    executor.get_outputs.return_value = []
+    mocker.patch.object(type(job), "get_executor", return_value=executor)
+    mocker.patch(
+        "grandchallenge.components.tasks.get_model_instance",
+        return_value=job,
+    )
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        provision_job(**job.signature_kwargs["kwargs"])
+
+    job.refresh_from_db()
+
+    if pipeline:
+        assert job.status == job.SUCCESS
+        assert [status for status, _ in job.status_transitions] == [
+            job.PROVISIONING,
+            job.PROVISIONED,
+            job.EXECUTING,
+            job.EXECUTED,
+            job.PARSING,
+            job.SUCCESS,
+        ]
+        executor.execute.assert_called_once()
+        executor.get_outputs.assert_called_once()
+    else:
+        assert job.status == job.PROVISIONED
+        executor.execute.assert_not_called()
+
+    # Either the execute task or the deprovisioning is scheduled
+    assert len(callbacks) == 1
+
+
+@pytest.mark.django_db
+def test_fail_batched_jobs():
+    executing_job, succeeded_job = AlgorithmJobFactory.create_batch(2)
+    executing_job.update_status(status=Job.EXECUTING)
+    succeeded_job.update_status(status=Job.SUCCESS)
+
+    _fail_batched_jobs(
+        error=BatchNotSubmitted(
+            job_params=[
+                JobParams(
+                    app_label="algorithms",
+                    model_name="job",
+                    pk=str(job.pk),
+                    attempt=job.attempt,
+                )
+                for job in (executing_job, succeeded_job)
+            ]
+        )
+    )
+
+    executing_job.refresh_from_db()
+    succeeded_job.refresh_from_db()
+
+    assert executing_job.status == Job.FAILURE
+    assert executing_job.error_message == "An unexpected error occurred"
+    assert succeeded_job.status == Job.SUCCESS
+
+
+@pytest.mark.django_db
+def test_fail_lost_sagemaker_batch_jobs(settings):
+    settings.COMPONENTS_AMAZON_SAGEMAKER_BATCH_SIZE = 2
+    settings.COMPONENTS_AMAZON_SAGEMAKER_BATCH_WAIT = 60
+
+    lost_job, pending_job, recent_job = AlgorithmJobFactory.create_batch(
+        3, time_limit=60
+    )
+
+    for job, started_at in (
+        (lost_job, now() - timedelta(hours=2)),
+        (pending_job, now() - timedelta(hours=2)),
+        (recent_job, now() - timedelta(minutes=10)),
+    ):
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.EXECUTING,
+            started_at=started_at,
+            instrumentation={
+                "backend": "grandchallenge.components.backends.amazon_sagemaker_batch.AmazonSageMakerBatchExecutor"
+            },
+        )
+
+    cache.set(
+        _get_pending_batch_key(group="test"),
+        {
+            "executor_kwargs": {},
+            "invocations": [
+                {"pk": f"algorithms-job-{pending_job.pk}-00"},
+            ],
+        },
+    )
+
+    try:
+        fail_lost_sagemaker_batch_jobs()
+    finally:
+        cache.delete(_get_pending_batch_key(group="test"))
+
+    for job in (lost_job, pending_job, recent_job):
+        job.refresh_from_db()
+
+    assert lost_job.status == Job.FAILURE
+    assert pending_job.status == Job.EXECUTING
+    assert recent_job.status == Job.EXECUTING
@@ -1,8 +1,13 @@
 import json
+from datetime import timedelta
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
 
+from grandchallenge.components.instrumentation import CACHE_KEY
+from tests.algorithms_tests.factories import AlgorithmJobFactory
 from tests.components_tests.factories import (
     ComponentInterfaceFactory,
     ComponentInterfaceValueFactory,
@@ -114,3 +119,90 @@ def test_component_interface_autocomplete(client):
     assert str(ci_img.id) not in ids
     assert str(ci_img_2.id) not in ids
     assert str(ci_json.id) in ids
+
+
+def _buckets(**counts):
+    return {
+        **{
+            str(bound): 0
+            for bound in (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+        },
+        "+Inf": 0,
+        **counts,
+    }
+
+
+@pytest.mark.django_db
+def test_stage_timings(client):
+    cache.delete(CACHE_KEY)
+
+    job = AlgorithmJobFactory(
+        completed_at=now(),
+        instrumentation={"backend": "Executor", "inference": 42},
+    )
+    job.status_transitions = [
+        [job.PROVISIONING, (job.created + timedelta(seconds=3)).isoformat()],
+        [job.PROVISIONED, (job.created + timedelta(seconds=5)).isoformat()],
+    ]
+    job.save()
+
+    def _get_view(user, **kwargs):
+        return get_view_for_user(
+            client=client,
+            viewname="api:components-stage-timings",
+            user=user,
+            **kwargs,
+        )
+
+    response = _get_view(user=UserFactory())
+    assert response.status_code == 403
+
+    staff = UserFactory(is_staff=True)
+
+    response = _get_view(user=staff)
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "model": "algorithms.job",
+            "backend": "Executor",
+            "image": str(job.algorithm_image.pk),
+            "stages": {
+                "queue_wait": {
+                    "buckets": _buckets(**{"5": 1}),
+                    "sum": 3.0,
+                    "count": 1,
+                },
+                "provisioning": {
+                    "buckets": _buckets(**{"5": 1}),
+                    "sum": 2.0,
+                    "count": 1,
+                },
+                "inference": {
+                    "buckets": _buckets(**{"60": 1}),
+                    "sum": 42.0,
+                    "count": 1,
+                },
+            },
+            "provisioning_bytes_per_second": None,
+        }
+    ]
+
+    response = _get_view(user=staff, data={"format": "prometheus"})
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/plain; charset=utf-8"
+
+    labels = (
+        'model="algorithms.job",backend="Executor",image="'
+        + str(job.algorithm_image.pk)
+        + '",stage="inference"'
+    )
+    content = response.content.decode()
+    assert (
+        f'grandchallenge_job_stage_seconds_bucket{{{labels},le="30"}} 0'
+        in content
+    )
+    assert (
+        f'grandchallenge_job_stage_seconds_bucket{{{labels},le="60"}} 1'
+        in content
+    )
+    assert f"grandchallenge_job_stage_seconds_count{{{labels}}} 1" in content
@@ -0,0 +1,84 @@
+import json
+from io import BytesIO
+from json import JSONDecodeError
+
+import pytest
+
+from grandchallenge.core.utils.json_stream import (
+    JSONStreamEvent,
+    JSONStreamReader,
+)
+
+
+@pytest.mark.parametrize("chunk_size", (1, 3, 1024))
+def test_object_events(chunk_size):
+    document = {
+        "a": [1, {"b": "ü"}, [2.5e10]],
+        "c": {"d": None},
+        "e": 123456789,
+        "f": [],
+    }
+    f = BytesIO(json.dumps(document).encode("utf-8"))
+
+    assert list(JSONStreamReader(f=f, chunk_size=chunk_size)) == [
+        JSONStreamEvent(kind="object", key=None, value=None),
+        JSONStreamEvent(kind="array", key="a", value=None),
+        JSONStreamEvent(kind="item", key="a", value=1),
+        JSONStreamEvent(kind="item", key="a", value={"b": "ü"}),
+        JSONStreamEvent(kind="item", key="a", value=[2.5e10]),
+        JSONStreamEvent(kind="value", key="c", value={"d": None}),
+        JSONStreamEvent(kind="value", key="e", value=123456789),
+        JSONStreamEvent(kind="array", key="f", value=None),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", (1, 1024))
+def test_array_events(chunk_size):
+    f = BytesIO(b' [ 1 , true ,\n"foo" ] ')
+
+    assert list(JSONStreamReader(f=f, chunk_size=chunk_size)) == [
+        JSONStreamEvent(kind="array", key=None, value=None),
+        JSONStreamEvent(kind="item", key=None, value=1),
+        JSONStreamEvent(kind="item", key=None, value=True),
+        JSONStreamEvent(kind="item", key=None, value="foo"),
+    ]
+
+
+@pytest.mark.parametrize("content", (b"12345", b'"foo"', b"null"))
+def test_value_events(content):
+    assert list(JSONStreamReader(f=BytesIO(content), chunk_size=2)) == [
+        JSONStreamEvent(kind="value", key=None, value=json.loads(content))
+    ]
+
+
+@pytest.mark.parametrize(
+    "content",
+    (b"", b"[1, 2", b"[1 2]", b'{"a": 1,}', b"{1: 2}", b"[1] [2]", b"[1,]"),
+)
+def test_invalid_json(content):
+    with pytest.raises(JSONDecodeError):
+        list(JSONStreamReader(f=BytesIO(content), chunk_size=2))
+
+
+def test_max_item_size():
+    f = BytesIO(json.dumps([1, "a" * 100]).encode("utf-8"))
+    reader = iter(JSONStreamReader(f=f, chunk_size=8, max_item_size=50))
+
+    assert next(reader) == JSONStreamEvent(kind="array", key=None, value=None)
+    assert next(reader) == JSONStreamEvent(kind="item", key=None, value=1)
+
+    with pytest.raises(ValueError) as e:
+        next(reader)
+
+    assert "Items larger than 50 characters" in str(e.value)
+
+
+def test_numbers_split_at_chunk_boundaries():
+    content = b'{"values": [1.5, -2.25e-10, 3E+5, 4e05, 0, -0.5, 6, 7.0]}'
+    expected = [1.5, -2.25e-10, 3e5, 4e5, 0, -0.5, 6, 7.0]
+
+    # Every number is split at every offset by one of the chunk sizes
+    for chunk_size in range(1, len(content) + 1):
+        events = JSONStreamReader(f=BytesIO(content), chunk_size=chunk_size)
+
+        assert [e.value for e in events if e.kind == "item"] == expected
@@ -0,0 +1,91 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from grandchallenge.components.models import ComponentInterface
+from tests.components_tests.factories import ComponentInterfaceValueFactory
+from tests.evaluation_tests.factories import EvaluationFactory, PhaseFactory
+from tests.factories import ChallengeFactory
+
+
+@pytest.fixture
+def evaluations_with_metrics():
+    challenge = ChallengeFactory(short_name="foo")
+    p1, p2 = PhaseFactory.create_batch(2, challenge=challenge)
+
+    evaluations = [
+        EvaluationFactory(submission__phase=p1, method__phase=p1),
+        EvaluationFactory(submission__phase=p2, method__phase=p2),
+    ]
+
+    for idx, e in enumerate(evaluations):
+        e.outputs.add(
+            ComponentInterfaceValueFactory(
+                interface=ComponentInterface.objects.get(
+                    slug="metrics-json-file"
+                ),
+                value={"acc": idx},
+            )
+        )
+
+    return evaluations
+
+
+@pytest.mark.django_db
+def test_export_results_jsonl(evaluations_with_metrics, tmp_path):
+    output = tmp_path / "results.jsonl"
+
+    call_command("export_results", "FOO", "--output", str(output))
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+
+    assert [row["pk"] for row in rows] == [
+        str(e.pk) for e in evaluations_with_metrics
+    ]
+    assert [row["metrics"] for row in rows] == [{"acc": 0}, {"acc": 1}]
+
+
+@pytest.mark.django_db
+def test_export_results_csv_phase_filter(evaluations_with_metrics, tmp_path):
+    output = tmp_path / "results.csv"
+    evaluation = evaluations_with_metrics[1]
+
+    call_command(
+        "export_results",
+        "foo",
+        "--format",
+        "csv",
+        "--phase",
+        evaluation.submission.phase.slug,
+        "--output",
+        str(output),
+    )
+
+    with open(output, newline="") as f:
+        rows = [*csv.DictReader(f)]
+
+    assert len(rows) == 1
+    assert rows[0]["pk"] == str(evaluation.pk)
+    assert json.loads(rows[0]["metrics"]) == {"acc": 1}
+
+
+@pytest.mark.django_db
+def test_export_results_stdout(evaluations_with_metrics):
+    stdout = StringIO()
+
+    call_command("export_results", "foo", stdout=stdout)
+
+    rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    assert [row["pk"] for row in rows] == [
+        str(e.pk) for e in evaluations_with_metrics
+    ]
+
+
+@pytest.mark.django_db
+def test_export_results_unknown_challenge():
+    with pytest.raises(CommandError):
+        call_command("export_results", "unknown")
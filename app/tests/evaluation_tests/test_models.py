@@ -8,7 +8,11 @@ from django.utils.timezone import now
 
 from grandchallenge.algorithms.models import Job
 from grandchallenge.components.models import ComponentInterface
-from grandchallenge.evaluation.models import CombinedLeaderboard, Evaluation
+from grandchallenge.evaluation.models import (
+    CombinedLeaderboard,
+    Evaluation,
+    EvaluationMetric,
+)
 from grandchallenge.evaluation.tasks import (
     calculate_ranks,
     create_evaluation,
@@ -653,3 +657,62 @@ def test_count_valid_archive_items():
     ai7.values.set([cciv1, cciv2])
 
     assert {*phase.valid_archive_items} == {ai1, ai2, ai6, ai7}
+
+
+@pytest.mark.django_db
+def test_evaluation_metrics_materialised_on_outputs_changed():
+    phase = PhaseFactory(
+        score_jsonpath="acc.mean",
+        extra_results_columns=[
+            {"path": "dice", "title": "Dice", "order": "asc"},
+            {"path": "label", "title": "Label", "order": "asc"},
+        ],
+    )
+    evaluation = EvaluationFactory(submission__phase=phase)
+
+    civ = ComponentInterfaceValueFactory(
+        interface=ComponentInterface.objects.get(slug="metrics-json-file"),
+        value={"acc": {"mean": 0.5}, "dice": 1, "label": "foo"},
+    )
+    evaluation.outputs.add(civ)
+
+    assert {
+        m.path: (m.value, m.other_value)
+        for m in EvaluationMetric.objects.filter(evaluation=evaluation)
+    } == {
+        "acc.mean": (0.5, None),
+        "dice": (1.0, None),
+        "label": (None, "foo"),
+    }
+
+    evaluation.outputs.remove(civ)
+
+    assert {
+        m.path: (m.value, m.other_value)
+        for m in EvaluationMetric.objects.filter(evaluation=evaluation)
+    } == {
+        "acc.mean": (None, None),
+        "dice": (None, None),
+        "label": (None, None),
+    }
+
+
+@pytest.mark.django_db
+def test_evaluation_status_updates_skip_permissions(
+    mocker, django_capture_on_commit_callbacks
+):
+    evaluation = EvaluationFactory()
+    assign_permissions = mocker.patch.object(Evaluation, "assign_permissions")
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        evaluation.update_status(status=Evaluation.EXECUTING)
+
+    assign_permissions.assert_not_called()
+    assert len(callbacks) == 0
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        evaluation.update_status(status=Evaluation.SUCCESS)
+
+    assign_permissions.assert_not_called()
+    # The ranks are calculated and the job is deprovisioned
+    assert len(callbacks) == 2
@@ -1,4 +1,6 @@
+import json
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 import requests
@@ -16,7 +18,11 @@ from grandchallenge.components.tasks import (
     validate_docker_image,
 )
 from grandchallenge.evaluation.models import Evaluation, Method
-from grandchallenge.evaluation.tasks import set_evaluation_inputs
+from grandchallenge.evaluation.tasks import (
+    _set_outstanding_algorithm_jobs,
+    handle_successful_job,
+    set_evaluation_inputs,
+)
 from grandchallenge.notifications.models import Notification
 from grandchallenge.profiles.templatetags.profiles import user_profile_link
 from tests.algorithms_tests.factories import (
@@ -240,7 +246,9 @@ class TestSetEvaluationInputs(TestCase):
 
         jobs = []
         for inpt, output in zip(input_civs, output_civs, strict=True):
-            j = AlgorithmJobFactory(status=Job.SUCCESS, algorithm_image=alg)
+            j = AlgorithmJobFactory(
+                status=Job.SUCCESS, algorithm_image=alg, creator=None
+            )
             j.inputs.set([inpt])
             j.outputs.set([output])
             jobs.append(j)
@@ -250,6 +258,7 @@ class TestSetEvaluationInputs(TestCase):
         )
         self.jobs = jobs
         self.output_civs = output_civs
+        self.interface = interface
 
     def test_set_evaluation_inputs(self):
         set_evaluation_inputs(evaluation_pk=self.evaluation.pk)
@@ -263,6 +272,81 @@ class TestSetEvaluationInputs(TestCase):
             for alg, civ in zip(self.jobs, self.output_civs, strict=True)
         }
 
+    def test_predictions_file(self):
+        set_evaluation_inputs(evaluation_pk=self.evaluation.pk)
+
+        predictions = self.evaluation.inputs.get(
+            interface__slug="predictions-json-file"
+        )
+
+        with predictions.file.open("r") as f:
+            jobs = json.loads(f.read())
+
+        assert {j["pk"] for j in jobs} == {str(j.pk) for j in self.jobs}
+
+    def test_set_evaluation_inputs_when_no_jobs_outstanding(self):
+        Evaluation.objects.filter(pk=self.evaluation.pk).update(
+            outstanding_algorithm_jobs=2
+        )
+
+        with patch.object(set_evaluation_inputs, "apply_async") as task:
+            handle_successful_job(evaluation_pk=self.evaluation.pk)
+
+            self.evaluation.refresh_from_db()
+            assert self.evaluation.outstanding_algorithm_jobs == 1
+            task.assert_not_called()
+
+            handle_successful_job(evaluation_pk=self.evaluation.pk)
+
+            self.evaluation.refresh_from_db()
+            assert self.evaluation.outstanding_algorithm_jobs == 0
+            task.assert_called_once_with(
+                kwargs={"evaluation_pk": self.evaluation.pk}
+            )
+
+    def test_jobs_of_other_phases_not_outstanding(self):
+        # Another phase uses the same algorithm image for a different archive
+        other_submission = SubmissionFactory(
+            algorithm_image=self.evaluation.submission.algorithm_image
+        )
+        other_submission.phase.archive = ArchiveFactory()
+        other_submission.phase.save()
+        other_submission.phase.algorithm_inputs.set([self.interface])
+
+        other_item = ArchiveItemFactory()
+        other_submission.phase.archive.items.set([other_item])
+        other_civ = ComponentInterfaceValueFactory(interface=self.interface)
+        other_item.values.set([other_civ])
+
+        other_job = AlgorithmJobFactory(
+            status=Job.PENDING,
+            algorithm_image=self.evaluation.submission.algorithm_image,
+            creator=None,
+        )
+        other_job.inputs.set([other_civ])
+
+        # One of the jobs of this phase is still running
+        Job.objects.filter(pk=self.jobs[0].pk).update(status=Job.EXECUTING)
+
+        assert _set_outstanding_algorithm_jobs(evaluation=self.evaluation) == 1
+
+        Job.objects.filter(pk=self.jobs[0].pk).update(status=Job.SUCCESS)
+
+        assert _set_outstanding_algorithm_jobs(evaluation=self.evaluation) == 0
+
+        set_evaluation_inputs(evaluation_pk=self.evaluation.pk)
+
+        self.evaluation.refresh_from_db()
+        assert self.evaluation.status == self.evaluation.PENDING
+
+    def test_jobs_not_counted_until_created(self):
+        with patch.object(set_evaluation_inputs, "apply_async") as task:
+            handle_successful_job(evaluation_pk=self.evaluation.pk)
+
+        self.evaluation.refresh_from_db()
+        assert self.evaluation.outstanding_algorithm_jobs is None
+        task.assert_not_called()
+
 
 @pytest.mark.django_db
 def test_non_zip_submission_failure(
@@ -1,11 +1,26 @@
+from functools import partial
+
+import numpy as np
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from grandchallenge.components.models import (
     ComponentInterface,
     ComponentInterfaceValue,
 )
-from grandchallenge.evaluation.models import Evaluation, Phase
+from grandchallenge.evaluation.models import (
+    Evaluation,
+    LeaderboardSnapshotPosition,
+    Phase,
+)
 from grandchallenge.evaluation.tasks import calculate_ranks
+from grandchallenge.evaluation.utils import (
+    Metric,
+    MetricValues,
+    get_metric_values,
+    rank_results,
+)
 from tests.evaluation_tests.factories import EvaluationFactory, PhaseFactory
 from tests.factories import UserFactory
 
@@ -126,7 +141,7 @@ def test_calculate_ranks(django_assert_max_num_queries):
                 ]
                 phase.save()
 
-                with django_assert_max_num_queries(9):
+                with django_assert_max_num_queries(13):
                     calculate_ranks(phase_pk=phase.pk)
 
                 assert_ranks(
@@ -135,6 +150,19 @@ def test_calculate_ranks(django_assert_max_num_queries):
                     expected[a_order][score_method][b_order]["rank_scores"],
                 )
 
+                # The snapshot of today matches the updated positions
+                assert {
+                    p.evaluation_id: (p.rank, p.rank_score)
+                    for p in LeaderboardSnapshotPosition.objects.filter(
+                        snapshot__phase=phase
+                    )
+                } == {
+                    e.pk: (e.rank, e.rank_score)
+                    for e in Evaluation.objects.filter(
+                        submission__phase=phase, rank__gt=0
+                    )
+                }
+
 
 @pytest.mark.django_db
 def test_results_display():
@@ -249,6 +277,123 @@ def test_null_results():
     assert_ranks(queryset, expected_ranks)
 
 
+@pytest.mark.parametrize(
+    "columns,score_method,expected_ranks,expected_rank_scores",
+    (
+        (
+            (np.array([0.1, 0.3, 0.3, 0.2]),),
+            lambda x: x[:, 0],
+            [4, 1, 1, 3],
+            [4.0, 1.0, 1.0, 3.0],
+        ),
+        (
+            (np.array([0.1, 0.3, 0.3, 0.2]), np.array([4.0, 1.0, 2.0, 3.0])),
+            partial(np.mean, axis=1),
+            [4, 1, 2, 3],
+            [4.0, 1.5, 2.0, 2.5],
+        ),
+        (
+            (np.array(["b", "a", "b", "c"], dtype=object),),
+            lambda x: x[:, 0],
+            [2, 4, 2, 1],
+            [2.0, 4.0, 2.0, 1.0],
+        ),
+    ),
+)
+def test_rank_results(
+    columns, score_method, expected_ranks, expected_rank_scores
+):
+    metric_values = MetricValues(
+        pks=(1, 2, 3, 4),
+        columns=columns,
+        metrics=tuple(
+            Metric(path=str(idx), reverse=True) for idx in range(len(columns))
+        ),
+    )
+
+    positions = rank_results(
+        metric_values=metric_values, score_method=score_method
+    )
+
+    assert [positions.ranks[pk] for pk in (1, 2, 3, 4)] == expected_ranks
+    assert [
+        positions.rank_scores[pk] for pk in (1, 2, 3, 4)
+    ] == expected_rank_scores
+
+
+def test_get_metric_values():
+    metric_values = get_metric_values(
+        values=[
+            (1, "a", 0.1),
+            (1, "b", 1.0),
+            (2, "a", 0.2),
+            (2, "b", None),
+            (3, "b", 3.0),
+            (3, "a", 0.3),
+            (4, "a", 0.4),
+            (4, "c", 4.0),
+            (5, "a", 0.5),
+            (5, "b", "x"),
+        ],
+        metrics=(
+            Metric(path="a", reverse=True),
+            Metric(path="b", reverse=False),
+        ),
+    )
+
+    assert metric_values.pks == (1, 3, 5)
+    assert [c.tolist() for c in metric_values.columns] == [
+        [0.1, 0.3, 0.5],
+        [1.0, 3.0, "x"],
+    ]
+    assert metric_values.columns[0].dtype == np.float64
+    assert metric_values.columns[1].dtype == object
+
+
+def test_metric_values_filter():
+    metric_values = MetricValues(
+        pks=(1, 2, 3),
+        columns=(np.array([0.1, 0.2, 0.3]),),
+        metrics=(Metric(path="a", reverse=True),),
+    )
+
+    filtered = metric_values.filter(pks={1, 3})
+
+    assert filtered.pks == (1, 3)
+    assert filtered.columns[0].tolist() == [0.1, 0.3]
+
+
+@pytest.mark.django_db
+def test_calculate_ranks_only_updates_changed_evaluations():
+    phase = PhaseFactory(score_jsonpath="a")
+
+    queryset = [
+        EvaluationFactory(submission__phase=phase, status=Evaluation.SUCCESS)
+        for _ in range(3)
+    ]
+
+    for e, r in zip(queryset, [0.1, 0.3, 0.2], strict=True):
+        e.outputs.add(
+            ComponentInterfaceValue.objects.create(
+                interface=ComponentInterface.objects.get(
+                    slug="metrics-json-file"
+                ),
+                value={"a": r},
+            )
+        )
+
+    calculate_ranks(phase_pk=phase.pk)
+    assert_ranks(queryset, [3, 1, 2])
+
+    with CaptureQueriesContext(connection) as context:
+        calculate_ranks(phase_pk=phase.pk)
+
+    assert not [
+        q for q in context.captured_queries if q["sql"].startswith("UPDATE")
+    ]
+    assert_ranks(queryset, [3, 1, 2])
+
+
 def assert_ranks(queryset, expected_ranks, expected_rank_scores=None):
     for r in queryset:
         r.refresh_from_db()
@@ -7,6 +7,7 @@ from grandchallenge.core.validators import (
     ExtensionValidator,
     JSONValidator,
     MimeTypeValidator,
+    get_json_validator,
 )
 
 
@@ -75,3 +76,28 @@ def test_json_validator():
         schema={"type": "object", "properties": {"name": {"type": "string"}}}
     )
     assert json_validator is not JSONValidator(schema=schema)
+
+
+def test_json_validator_validate_many():
+    schema = {"type": "object", "properties": {"price": {"type": "number"}}}
+
+    json_validator = JSONValidator(schema=schema)
+
+    assert json_validator.validate_many([{"price": 1}, {"price": 2}]) is None
+
+    with pytest.raises(ValidationError) as e:
+        json_validator.validate_many(
+            [{"price": "invalid"}, {"price": 1}, {"price": "invalid"}]
+        )
+
+    assert len(e.value.messages) == 2
+    assert e.value.messages[0].startswith("Item 0 ")
+    assert e.value.messages[1].startswith("Item 2 ")
+
+
+def test_compiled_json_validators_are_shared():
+    schema = {"type": "object", "properties": {"price": {"type": "number"}}}
+
+    assert get_json_validator(schema=schema) is get_json_validator(
+        schema={"properties": {"price": {"type": "number"}}, "type": "object"}
+    )
@@ -11,13 +11,24 @@ from factory.django import ImageField
 from guardian.shortcuts import assign_perm, remove_perm
 
 from grandchallenge.algorithms.models import Algorithm
-from grandchallenge.evaluation.models import CombinedLeaderboard, Evaluation
-from grandchallenge.evaluation.tasks import update_combined_leaderboard
+from grandchallenge.components.models import ComponentInterface
+from grandchallenge.evaluation.models import (
+    CombinedLeaderboard,
+    Evaluation,
+    LeaderboardSnapshot,
+)
+from grandchallenge.evaluation.tasks import (
+    calculate_ranks,
+    update_combined_leaderboard,
+)
 from grandchallenge.evaluation.utils import SubmissionKindChoices
 from grandchallenge.workstations.models import Workstation
 from tests.algorithms_tests.factories import AlgorithmFactory
 from tests.archives_tests.factories import ArchiveFactory
-from tests.components_tests.factories import ComponentInterfaceFactory
+from tests.components_tests.factories import (
+    ComponentInterfaceFactory,
+    ComponentInterfaceValueFactory,
+)
 from tests.evaluation_tests.factories import (
     CombinedLeaderboardFactory,
     EvaluationFactory,
@@ -1138,3 +1149,72 @@ def test_update_view_permissions(client):
 
     # Only phases for this challenge
     assert {*response.context["form"].fields["phases"].queryset} == {ph1}
+
+
+@pytest.mark.django_db
+def test_leaderboard_served_from_snapshot(client):
+    phase = PhaseFactory(challenge__hidden=False, score_jsonpath="a")
+    e1, e2 = EvaluationFactory.create_batch(
+        2,
+        submission__phase=phase,
+        method__phase=phase,
+        status=Evaluation.SUCCESS,
+    )
+
+    for e, value in ((e1, 0.1), (e2, 0.2)):
+        e.outputs.add(
+            ComponentInterfaceValueFactory(
+                interface=ComponentInterface.objects.get(
+                    slug="metrics-json-file"
+                ),
+                value={"a": value},
+            )
+        )
+
+    calculate_ranks(phase_pk=phase.pk)
+
+    snapshot = LeaderboardSnapshot.objects.get(phase=phase)
+    assert {
+        p.evaluation_id: (p.rank, p.rank_per_metric)
+        for p in snapshot.positions.all()
+    } == {e1.pk: (2, {"a": 2}), e2.pk: (1, {"a": 1})}
+
+    # Move the snapshot to yesterday, and change the current positions
+    yesterday = timezone.localdate() - timedelta(days=1)
+    snapshot.date = yesterday
+    snapshot.save()
+    Evaluation.objects.filter(pk=e1.pk).update(rank=1)
+    Evaluation.objects.filter(pk=e2.pk).update(rank=2)
+
+    def get_leaderboard_rows(date, length=10, start=0):
+        response = get_view_for_user(
+            viewname="evaluation:leaderboard",
+            reverse_kwargs={
+                "challenge_short_name": phase.challenge.short_name,
+                "slug": phase.slug,
+            },
+            client=client,
+            data={
+                "date": date.isoformat(),
+                "length": length,
+                "start": start,
+                "draw": 1,
+                "order[0][dir]": "asc",
+                "order[0][column]": 0,
+            },
+            **{"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"},
+        )
+        assert response.status_code == 200
+        return response.json()["data"]
+
+    rows = get_leaderboard_rows(date=yesterday)
+    assert [row[0].strip() for row in rows] == ["1st", "2nd"]
+    assert e2.submission.creator.username in rows[0][1]
+
+    rows = get_leaderboard_rows(date=yesterday, length=1, start=1)
+    assert [row[0].strip() for row in rows] == ["2nd"]
+    assert e1.submission.creator.username in rows[0][1]
+
+    # Before the first snapshot only the older evaluations are shown
+    rows = get_leaderboard_rows(date=yesterday - timedelta(days=1))
+    assert rows == []
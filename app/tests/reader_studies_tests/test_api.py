@@ -121,6 +121,147 @@ def test_answer_create(client):
     assert answer.answer is True
 
 
+@pytest.mark.django_db
+def test_answer_bulk_create(client):
+    rs = ReaderStudyFactory()
+    ds1, ds2 = DisplaySetFactory.create_batch(2, reader_study=rs)
+
+    reader, editor = UserFactory(), UserFactory()
+    rs.add_reader(reader)
+    rs.add_editor(editor)
+
+    q1 = QuestionFactory(reader_study=rs, answer_type=Question.AnswerType.BOOL)
+    q2 = QuestionFactory(reader_study=rs, answer_type=Question.AnswerType.BOOL)
+
+    AnswerFactory(
+        question=q1,
+        creator=editor,
+        answer=True,
+        display_set=ds1,
+        is_ground_truth=True,
+    )
+
+    response = get_view_for_user(
+        viewname="api:reader-studies-answer-bulk",
+        user=reader,
+        client=client,
+        method=client.post,
+        data=[
+            {
+                "question": str(q.pk),
+                "display_set": str(ds.pk),
+                "answer": True,
+                "last_edit_duration": "00:00:10",
+            }
+            for ds in (ds1, ds2)
+            for q in (q1, q2)
+        ],
+        content_type="application/json",
+    )
+    assert response.status_code == 201
+    assert len(response.json()) == 4
+
+    answers = Answer.objects.filter(creator=reader)
+    assert answers.count() == 4
+    assert {(a.question, a.display_set) for a in answers} == {
+        (q1, ds1),
+        (q2, ds1),
+        (q1, ds2),
+        (q2, ds2),
+    }
+    assert rs.get_progress_for_user(reader) == {
+        "questions": 100.0,
+        "hangings": 100.0,
+        "diff": 0.0,
+    }
+
+    scored = answers.get(question=q1, display_set=ds1)
+    assert scored.score == 1.0
+    assert scored.total_edit_duration == scored.last_edit_duration
+    assert scored.history.count() == 1
+    assert {
+        *answers.exclude(pk=scored.pk).values_list("score", flat=True)
+    } == {None}
+
+    for answer in answers:
+        assert reader.has_perm("view_answer", answer)
+        assert reader.has_perm("change_answer", answer)
+        assert editor.has_perm("view_answer", answer)
+        assert editor.has_perm("delete_answer", answer)
+
+
+@pytest.mark.django_db
+def test_answer_bulk_create_is_validated(client):
+    rs = ReaderStudyFactory()
+    ds = DisplaySetFactory(reader_study=rs)
+
+    reader = UserFactory()
+    rs.add_reader(reader)
+
+    q1 = QuestionFactory(reader_study=rs, answer_type=Question.AnswerType.BOOL)
+    q2 = QuestionFactory(reader_study=rs, answer_type=Question.AnswerType.BOOL)
+    q3 = QuestionFactory(reader_study=rs, answer_type=Question.AnswerType.BOOL)
+
+    AnswerFactory(question=q1, creator=reader, answer=True, display_set=ds)
+
+    def _post(data):
+        return get_view_for_user(
+            viewname="api:reader-studies-answer-bulk",
+            user=reader,
+            client=client,
+            method=client.post,
+            data=data,
+            content_type="application/json",
+        )
+
+    response = _post(
+        [
+            {
+                "question": str(q1.pk),
+                "display_set": str(ds.pk),
+                "answer": True,
+            },
+            {"question": str(q2.pk), "display_set": str(ds.pk), "answer": 1},
+            {
+                "question": str(q3.pk),
+                "display_set": str(ds.pk),
+                "answer": True,
+            },
+            {
+                "question": str(q3.pk),
+                "display_set": str(ds.pk),
+                "answer": True,
+            },
+        ]
+    )
+    assert response.status_code == 400
+    errors = response.json()["non_field_errors"]
+    assert len(errors) == 3
+    assert errors[0].startswith("Answer 0: User")
+    assert errors[1].startswith(
+        "Answer 1: Your answer is not the correct type"
+    )
+    assert errors[2].startswith("Answer 3: User")
+
+    other_ds = DisplaySetFactory()
+    response = _post(
+        [
+            {
+                "question": str(q2.pk),
+                "display_set": str(other_ds.pk),
+                "answer": True,
+            },
+        ]
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "non_field_errors": ["Answer 0: Display set not found."]
+    }
+
+    assert _post([]).status_code == 400
+    assert Answer.objects.filter(creator=reader).count() == 1
+
+
 @pytest.mark.django_db
 def test_answer_update(client):
     im = ImageFactory()
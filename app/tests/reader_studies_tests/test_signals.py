@@ -3,7 +3,10 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 
 from grandchallenge.components.models import InterfaceKind
-from grandchallenge.reader_studies.models import Question
+from grandchallenge.reader_studies.models import (
+    DisplaySetAnswerCount,
+    Question,
+)
 from tests.components_tests.factories import (
     ComponentInterfaceFactory,
     ComponentInterfaceValueFactory,
@@ -220,3 +223,47 @@ def test_changing_reader_study_updates_permissions(
         rs.editors_group: {"view_image"},
         rs.readers_group: {"view_image"},
     }
+
+
+@pytest.mark.django_db
+def test_display_set_answer_count():
+    rs = ReaderStudyFactory()
+    ds = DisplaySetFactory(reader_study=rs)
+    q1, q2 = QuestionFactory.create_batch(2, reader_study=rs)
+    reader = UserFactory()
+
+    AnswerFactory(
+        question=q1, display_set=ds, creator=reader, is_ground_truth=True
+    )
+    assert not DisplaySetAnswerCount.objects.exists()
+
+    a1 = AnswerFactory(question=q1, display_set=ds, creator=reader)
+    a2 = AnswerFactory(question=q2, creator=reader)
+    assert DisplaySetAnswerCount.objects.get().answer_count == 1
+
+    a2.display_set = ds
+    a2.save()
+    a2.save()
+
+    count = DisplaySetAnswerCount.objects.get()
+    assert count.reader == reader
+    assert count.display_set == ds
+    assert count.reader_study == rs
+    assert count.answer_count == 2
+
+    a1.delete()
+
+    count.refresh_from_db()
+    assert count.answer_count == 1
+
+
+@pytest.mark.django_db
+def test_display_set_answer_count_is_not_negative():
+    answer = AnswerFactory(display_set=DisplaySetFactory())
+    count = DisplaySetAnswerCount.objects.get()
+
+    DisplaySetAnswerCount.objects.filter(pk=count.pk).update(answer_count=0)
+    answer.delete()
+
+    count.refresh_from_db()
+    assert count.answer_count == 0
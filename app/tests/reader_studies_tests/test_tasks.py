@@ -5,15 +5,19 @@ from grandchallenge.components.models import (
     ComponentInterface,
     ComponentInterfaceValue,
 )
+from grandchallenge.reader_studies.models import Answer, DisplaySetAnswerCount
 from grandchallenge.reader_studies.tasks import (
     add_image_to_display_set,
     create_display_sets_for_upload_session,
+    reconcile_display_set_answer_counts,
 )
 from tests.cases_tests.factories import RawImageUploadSessionFactory
 from tests.components_tests.factories import ComponentInterfaceFactory
-from tests.factories import ImageFactory
+from tests.factories import ImageFactory, UserFactory
 from tests.reader_studies_tests.factories import (
+    AnswerFactory,
     DisplaySetFactory,
+    QuestionFactory,
     ReaderStudyFactory,
 )
 
@@ -87,3 +91,33 @@ def test_add_image_to_display_set(settings):
         interface_pk=ci.pk,
     )
     assert ComponentInterfaceValue.objects.filter(interface=ci).count() == 1
+
+
+@pytest.mark.django_db
+def test_reconcile_display_set_answer_counts():
+    rs = ReaderStudyFactory()
+    ds1, ds2, ds3 = DisplaySetFactory.create_batch(3, reader_study=rs)
+    q1, q2 = QuestionFactory.create_batch(2, reader_study=rs)
+    reader = UserFactory()
+
+    for q in (q1, q2):
+        AnswerFactory(question=q, display_set=ds1, creator=reader)
+    AnswerFactory(question=q1, display_set=ds2, creator=reader)
+    AnswerFactory(
+        question=q2, display_set=ds2, creator=reader, is_ground_truth=True
+    )
+    stale = AnswerFactory(question=q1, display_set=ds3, creator=reader)
+
+    # Miss some updates of the counts
+    DisplaySetAnswerCount.objects.filter(display_set=ds1).update(
+        answer_count=5
+    )
+    DisplaySetAnswerCount.objects.filter(display_set=ds2).delete()
+    Answer.objects.filter(pk=stale.pk).update(display_set=None)
+
+    reconcile_display_set_answer_counts()
+
+    assert {
+        c.display_set: c.answer_count
+        for c in DisplaySetAnswerCount.objects.filter(reader=reader)
+    } == {ds1: 2, ds2: 1, ds3: 0}
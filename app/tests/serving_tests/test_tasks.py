@@ -0,0 +1,98 @@
+import pytest
+from django.core.cache import cache
+
+from grandchallenge.serving.models import Download
+from grandchallenge.serving.tasks import (
+    DOWNLOAD_COUNT_KEY_PREFIX,
+    download_count_key,
+    flush_download_counts,
+)
+from grandchallenge.serving.views import _create_download
+from tests.factories import ImageFactory, UserFactory
+
+
+@pytest.mark.django_db
+def test_download_counts_flushed_in_bulk(django_assert_max_num_queries):
+    cache.clear()
+
+    u1, u2 = UserFactory.create_batch(2)
+    i1, i2 = ImageFactory.create_batch(2)
+
+    for _ in range(3):
+        _create_download(creator=u1, image=i1)
+    _create_download(creator=u2, image=i1)
+    _create_download(creator=u1, image=i2)
+
+    assert not Download.objects.exists()
+
+    flush_download_counts()
+
+    assert {(d.creator, d.image): d.count for d in Download.objects.all()} == {
+        (u1, i1): 3,
+        (u2, i1): 1,
+        (u1, i2): 1,
+    }
+
+    _create_download(creator=u1, image=i1)
+    _create_download(creator=u1, image=i1)
+
+    with django_assert_max_num_queries(6):
+        flush_download_counts()
+
+    assert Download.objects.get(creator=u1, image=i1).count == 5
+    assert Download.objects.count() == 3
+
+    # Nothing buffered so nothing should change
+    flush_download_counts()
+
+    assert Download.objects.get(creator=u1, image=i1).count == 5
+
+
+@pytest.mark.django_db
+def test_download_count_expiry_refreshed():
+    cache.clear()
+
+    user, image = UserFactory(), ImageFactory()
+    key = download_count_key(creator_pk=user.pk, field="image", pk=image.pk)
+
+    _create_download(creator=user, image=image)
+    cache.expire(key, timeout=5)
+    _create_download(creator=user, image=image)
+
+    assert cache.ttl(key) > 5
+    assert cache.get(key) == 2
+
+
+@pytest.mark.django_db
+def test_download_counts_flushed_when_key_expires(mocker):
+    cache.clear()
+
+    user, image = UserFactory(), ImageFactory()
+    _create_download(creator=user, image=image)
+
+    mocker.patch.object(cache, "decr", side_effect=ValueError)
+
+    flush_download_counts()
+
+    assert Download.objects.get(creator=user, image=image).count == 1
+
+
+@pytest.mark.django_db
+def test_download_counts_of_deleted_objects_dropped():
+    cache.clear()
+
+    user, image, deleted_image = UserFactory(), *ImageFactory.create_batch(2)
+    _create_download(creator=user, image=image)
+    _create_download(creator=user, image=deleted_image)
+    deleted_image.delete()
+
+    flush_download_counts()
+
+    assert {(d.creator, d.image): d.count for d in Download.objects.all()} == {
+        (user, image): 1
+    }
+    # The counts that cannot be written are not put back
+    assert not any(
+        cache.get(key)
+        for key in cache.iter_keys(f"{DOWNLOAD_COUNT_KEY_PREFIX}.*")
+    )
@@ -2,8 +2,11 @@ import json
 from pathlib import Path
 
 import pytest
+from django.contrib.auth.models import Group
 from django.core.files.base import ContentFile
 from django.core.files.images import ImageFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from guardian.shortcuts import assign_perm
 
 from grandchallenge.components.models import (
@@ -93,6 +96,56 @@ def test_image_response(client, settings, cloudfront, tmpdir):
         assert "Expires" in redirect
 
 
+@pytest.mark.django_db
+def test_image_permission_cached(client):
+    image_file = ImageFileFactory()
+    user = UserFactory()
+    group = Group.objects.create(name="viewers")
+
+    assign_perm("view_image", group, image_file.image)
+    user.groups.add(group)
+
+    response = get_view_for_user(
+        url=image_file.file.url, client=client, user=user
+    )
+    assert response.status_code == 302
+
+    with CaptureQueriesContext(connection) as context:
+        response = get_view_for_user(
+            url=image_file.file.url, client=client, user=user
+        )
+    assert response.status_code == 302
+
+    assert not any(
+        "cases_image" in query["sql"] or "guardian" in query["sql"]
+        for query in context.captured_queries
+    )
+
+    user.groups.remove(group)
+
+    response = get_view_for_user(
+        url=image_file.file.url, client=client, user=user
+    )
+    assert response.status_code == 403
+
+    user.groups.add(group)
+    assign_perm("view_image", group, image_file.image)
+
+    response = get_view_for_user(
+        url=image_file.file.url, client=client, user=user
+    )
+    assert response.status_code == 302
+
+    # Permissions of the image are updated from its archives, jobs and
+    # reader studies, of which there are none
+    image_file.image.update_viewer_groups_permissions()
+
+    response = get_view_for_user(
+        url=image_file.file.url, client=client, user=user
+    )
+    assert response.status_code == 403
+
+
 @pytest.mark.django_db
 def test_submission_download(client, two_challenge_sets):
     """Only the challenge admin should be able to download submissions."""
@@ -4,9 +4,11 @@ import pytest
 from django.conf import settings
 from requests import put
 
-from grandchallenge.uploads.models import UserUpload
+from grandchallenge.uploads.models import UserUpload, UserUploadQuota
 from tests.algorithms_tests.factories import AlgorithmImageFactory
+from tests.cases_tests import RESOURCE_PATH
 from tests.factories import UserFactory
+from tests.uploads_tests.factories import create_upload_from_file
 from tests.verification_tests.factories import VerificationFactory
 
 
@@ -69,6 +71,23 @@ def test_generate_presigned_urls():
     )
 
 
+def test_generate_presigned_urls_cached():
+    upload = UserUpload(creator=UserFactory.build())
+    upload.create_multipart_upload()
+
+    presigned_urls = upload.generate_presigned_urls(part_numbers=[1, 2])
+
+    assert upload.generate_presigned_urls(part_numbers=[2, 3]) == {
+        "2": presigned_urls["2"],
+        "3": upload.generate_presigned_urls(part_numbers=[3])["3"],
+    }
+
+    upload.abort_multipart_upload()
+
+    with pytest.raises(RuntimeError):
+        upload.generate_presigned_urls(part_numbers=[1])
+
+
 def test_abort_multipart_upload():
     upload = UserUpload(creator=UserFactory.build())
     upload.create_multipart_upload()
@@ -296,6 +315,37 @@ def test_can_upload_more_other_objects(settings):
     upload.complete_multipart_upload(
         parts=[{"ETag": response.headers["ETag"], "PartNumber": 1}]
     )
+    upload.save()
 
     assert upload.can_upload_more is False
     assert new_upload.can_upload_more is False
+
+
+@pytest.mark.django_db
+def test_user_upload_quota():
+    user = UserFactory()
+    # The quota is created from the objects in storage
+    initial_size = UserUploadQuota.objects.get_size_of_completed_uploads(
+        user=user
+    )
+
+    assert initial_size == UserUploadQuota.get_size_in_storage(user_pk=user.pk)
+
+    upload = create_upload_from_file(
+        file_path=RESOURCE_PATH / "image10x10x10.mha", creator=user
+    )
+    # Saving again does not count the upload twice
+    upload.save()
+
+    assert upload.size_in_storage > 0
+    assert (
+        UserUploadQuota.objects.get_size_of_completed_uploads(user=user)
+        == initial_size + upload.size_in_storage
+    )
+
+    upload.delete()
+
+    assert (
+        UserUploadQuota.objects.get_size_of_completed_uploads(user=user)
+        == initial_size
+    )
@@ -3,9 +3,17 @@ from datetime import timedelta
 import pytest
 from django.core.exceptions import ObjectDoesNotExist
 
-from grandchallenge.uploads.models import UserUpload
-from grandchallenge.uploads.tasks import delete_old_user_uploads
-from tests.uploads_tests.factories import UserUploadFactory
+from grandchallenge.uploads.models import UserUpload, UserUploadQuota
+from grandchallenge.uploads.tasks import (
+    delete_old_user_uploads,
+    reconcile_user_upload_quotas,
+)
+from tests.cases_tests import RESOURCE_PATH
+from tests.factories import UserFactory
+from tests.uploads_tests.factories import (
+    UserUploadFactory,
+    create_upload_from_file,
+)
 
 
 @pytest.mark.django_db
@@ -27,3 +35,60 @@ def test_uploads_removed():
             old_upload.refresh_from_db()
 
     new_upload.refresh_from_db()
+
+
+@pytest.mark.django_db
+def test_reconcile_user_upload_quotas():
+    user = UserFactory()
+    upload = create_upload_from_file(
+        file_path=RESOURCE_PATH / "image10x10x10.mha", creator=user
+    )
+    quota = UserUploadQuota.objects.create(
+        user=user, size_of_completed_uploads=1
+    )
+
+    reconcile_user_upload_quotas()
+
+    quota.refresh_from_db()
+    assert quota.size_of_completed_uploads >= upload.size_in_storage
+    assert (
+        quota.size_of_completed_uploads
+        == UserUploadQuota.get_size_in_storage(user_pk=user.pk)
+    )
+
+
+@pytest.mark.django_db
+def test_reconcile_keeps_sizes_added_while_listing(mocker):
+    user = UserFactory()
+    quota = UserUploadQuota.objects.create(
+        user=user, size_of_completed_uploads=1
+    )
+
+    def get_size_in_storage(*, user_pk):
+        # An upload is completed while storage is listed
+        UserUploadQuota.objects.add_size(user_pk=user_pk, size=5)
+        return 10
+
+    mocker.patch.object(
+        UserUploadQuota, "get_size_in_storage", side_effect=get_size_in_storage
+    )
+
+    quota.reconcile()
+
+    assert quota.size_of_completed_uploads == 15
+    quota.refresh_from_db()
+    assert quota.size_of_completed_uploads == 15
+
+
+@pytest.mark.django_db
+def test_reconcile_sets_missing_upload_sizes():
+    upload = create_upload_from_file(
+        file_path=RESOURCE_PATH / "image10x10x10.mha", creator=UserFactory()
+    )
+    expected_size = upload.size_in_storage
+    UserUpload.objects.filter(pk=upload.pk).update(size_in_storage=0)
+
+    reconcile_user_upload_quotas()
+
+    upload.refresh_from_db()
+    assert upload.size_in_storage == expected_size > 0
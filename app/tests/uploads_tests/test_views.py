@@ -174,6 +174,61 @@ def test_prepare_upload_parts(client):
     assert set(presigned_urls.keys()) == {"35", "42", "128"}
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "data,expected_part_numbers",
+    (
+        ({"first_part_number": 5, "num_parts": 3}, {"5", "6", "7"}),
+        ({"first_part_number": 9_999, "num_parts": 5}, {"9999", "10000"}),
+    ),
+)
+def test_prepare_upload_parts_window(client, data, expected_part_numbers):
+    u = UserFactory()
+    upload = UserUpload.objects.create(creator=u)
+
+    response = get_view_for_user(
+        client=client,
+        viewname="api:upload-generate-presigned-urls",
+        reverse_kwargs={"pk": upload.pk, "s3_upload_id": upload.s3_upload_id},
+        method=client.patch,
+        data=data,
+        content_type="application/json",
+        user=u,
+    )
+
+    assert response.status_code == 200
+    assert (
+        set(response.json()["presigned_urls"].keys()) == expected_part_numbers
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "data",
+    (
+        {},
+        {"first_part_number": 5},
+        {"part_numbers": [1], "num_parts": 3},
+        {"first_part_number": 1, "num_parts": 1001},
+    ),
+)
+def test_prepare_upload_parts_invalid(client, data):
+    u = UserFactory()
+    upload = UserUpload.objects.create(creator=u)
+
+    response = get_view_for_user(
+        client=client,
+        viewname="api:upload-generate-presigned-urls",
+        reverse_kwargs={"pk": upload.pk, "s3_upload_id": upload.s3_upload_id},
+        method=client.patch,
+        data=data,
+        content_type="application/json",
+        user=u,
+    )
+
+    assert response.status_code == 400
+
+
 @pytest.mark.django_db
 def test_abort_multipart_upload(client):
     # https://uppy.io/docs/aws-s3-multipart/#abortMultipartUpload-file-uploadId-key